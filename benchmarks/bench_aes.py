@@ -0,0 +1,43 @@
+"""
+Reports the throughput (MB/s) of the pure Python AES of hybrid_crypto.aes:
+single blocks, CTR mode over a whole buffer and streamed CTR mode, for
+128 and 256 bit keys.
+
+Run from the repository root with:  python benchmarks/bench_aes.py [kilobytes]
+"""
+
+import os
+import sys
+from time import perf_counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hybrid_crypto.aes import AES
+
+
+def main(kilobytes=1024):
+    data = os.urandom(kilobytes * 1024)
+    iv = os.urandom(16)
+    for key_bytes in (16, 32):
+        aes = AES(os.urandom(key_bytes))
+        print("AES-{}:".format(8 * key_bytes))
+
+        blocks = [data[i:i + 16] for i in range(0, min(len(data), 1 << 16), 16)]
+        start = perf_counter()
+        for block in blocks:
+            aes.encrypt_block(block)
+        print("  encrypt_block:   {:8.3f} MB/s".format(16 * len(blocks) / (perf_counter() - start) / 1e6))
+
+        start = perf_counter()
+        cipher = aes.ctr(data, iv)
+        print("  ctr:             {:8.3f} MB/s".format(len(data) / (perf_counter() - start) / 1e6))
+
+        start = perf_counter()
+        pieces = [data[i:i + 4096] for i in range(0, len(data), 4096)]
+        assert b''.join(aes.ctr_stream(pieces, iv)) == cipher
+        print("  ctr_stream:      {:8.3f} MB/s".format(len(data) / (perf_counter() - start) / 1e6))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
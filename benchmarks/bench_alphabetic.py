@@ -0,0 +1,64 @@
+"""
+Reports the throughput (MB/s) of hybrid_crypto.alphabetic on the
+message_*.txt corpus: extraction with and without recording the layout,
+and rebuilding, against the character by character isalpha filter.
+
+Run from the repository root with:  python benchmarks/bench_alphabetic.py [copies]
+"""
+
+import glob
+import io
+import os
+import sys
+from time import perf_counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hybrid_crypto import alphabetic
+
+
+def python_extract(text):
+    '''
+    The character by character version, for comparison.
+    '''
+    result = ''
+    for char in text:
+        if char.isascii() and char.isalpha():
+            result += char
+    return result
+
+
+def main(copies=20):
+    file_names = sorted(glob.glob(os.path.join(ROOT, 'message_*.txt')))
+    raw = b''.join(open(file_name, 'rb').read() for file_name in file_names)
+    print("Corpus: {} bytes".format(len(raw)))
+
+    text = raw.decode('utf-8', errors='ignore')
+    start = perf_counter()
+    expected = python_extract(text)
+    print("per-character Python: {:10.2f} MB/s".format(len(raw) / (perf_counter() - start) / 1e6))
+    assert alphabetic.extract_text(text) == expected
+
+    data = io.BytesIO(raw * copies)
+    size = len(raw) * copies
+    start = perf_counter()
+    for letters in alphabetic.extract_stream(data):
+        pass
+    print("extract_stream:       {:10.2f} MB/s".format(size / (perf_counter() - start) / 1e6))
+
+    data.seek(0)
+    layout = io.BytesIO()
+    start = perf_counter()
+    chunks = list(alphabetic.extract_stream(data, case='upper', layout=layout))
+    print("  with layout:        {:10.2f} MB/s".format(size / (perf_counter() - start) / 1e6))
+
+    layout.seek(0)
+    start = perf_counter()
+    rebuilt = b''.join(alphabetic.rebuild_stream(chunks, layout))
+    print("rebuild_stream:       {:10.2f} MB/s".format(size / (perf_counter() - start) / 1e6))
+    assert rebuilt == raw * copies
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,59 @@
+"""
+Reports the throughput (MB of letters per second) of the random 2-gram
+encoding of hybrid_crypto.bigram on the message_*.txt corpus, against a
+dictionary lookup with one SystemRandom choice per letter.
+
+Run from the repository root with:  python benchmarks/bench_bigram.py [copies]
+"""
+
+from glob import glob
+import os
+import sys
+from random import SystemRandom
+from time import perf_counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hybrid_crypto import bigram
+from hybrid_crypto.alphabetic import extract_file
+
+
+def python_encode(text, sets):
+    '''
+    The per-letter version, for comparison: sets maps each letter to the
+    list of its 2-grams.
+    '''
+    choose = SystemRandom().choice
+    return ''.join(choose(sets[char]) for char in text)
+
+
+def main(copies=20):
+    letters = b''.join(b''.join(extract_file(file_name, case='lower'))
+                       for file_name in sorted(glob(os.path.join(ROOT, 'message_*.txt'))))
+    table = bigram.make_encoding()
+    key = bigram.encoding_to_key(table)
+    sets = {}
+    for code, char in enumerate(key):
+        if char != '-':
+            sets.setdefault(char, []).append(chr(97 + code // 26) + chr(97 + code % 26))
+    print("Corpus: {} letters, {} 2-grams".format(len(letters), bigram.NUM_BIGRAMS))
+
+    text = letters.decode('ascii')
+    start = perf_counter()
+    encoded = python_encode(text, sets)
+    print("per-letter Python:    {:10.2f} MB/s".format(len(text) / (perf_counter() - start) / 1e6))
+    assert bigram.bigram_decode(encoded, table) == text
+
+    data = bigram.letters_to_indices(letters * copies)
+    start = perf_counter()
+    encoded = bigram.encode_array(data, table)
+    print("encode_array:         {:10.2f} MB/s".format(len(data) / (perf_counter() - start) / 1e6))
+    start = perf_counter()
+    decoded = bigram.decode_array(encoded, table)
+    print("decode_array:         {:10.2f} MB/s".format(len(data) / (perf_counter() - start) / 1e6))
+    assert (decoded == data).all()
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,54 @@
+"""
+Compares the lecture convert_to_integer / convert_to_text with the
+bytes based versions in hybrid_crypto.codec on the message_*.txt files.
+
+Run from the repository root with:  python benchmarks/bench_codec.py
+"""
+
+import glob
+import os
+import sys
+from timeit import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'diffie_hellman'))
+
+import cryptography_lecture_functions as lecture
+from hybrid_crypto import codec
+
+
+def best_time(func, repeats=3):
+    '''
+    Returns the best of repeats timings (in seconds) of a single call of func.
+    '''
+    return min(timeit(func, number=1) for i in range(repeats))
+
+
+def main():
+    print("{:32s}{:>8s}{:>14s}{:>14s}{:>10s}".format(
+        "message", "chars", "lecture (s)", "codec (s)", "speedup"))
+    for file_name in sorted(glob.glob(os.path.join(ROOT, 'message_*.txt'))):
+        with open(file_name, 'r', encoding='utf-8-sig') as f:
+            text = f.read()
+        # The lecture functions only round trip characters with order below 256
+        text = text.encode('latin-1', 'replace').decode('latin-1')
+
+        number = codec.convert_to_integer(text)
+        assert number == lecture.convert_to_integer(text)
+        assert lecture.convert_to_text(number) == codec.convert_to_text(number) == text
+
+        old = best_time(lambda: lecture.convert_to_text(lecture.convert_to_integer(text)))
+        new = best_time(lambda: codec.convert_to_text(codec.convert_to_integer(text)))
+        print("{:32s}{:8d}{:14.4f}{:14.6f}{:10.0f}".format(
+            os.path.basename(file_name), len(text), old, new, old / new))
+
+    # Streaming a whole file, block by block
+    file_name = os.path.join(ROOT, 'message_heart_of_darkness.txt')
+    streamed = best_time(lambda: b''.join(codec.decode_stream(codec.encode_file(file_name))))
+    print("\nStreaming {} in {}-byte blocks: {:.6f} s".format(
+        os.path.basename(file_name), codec.DEFAULT_BLOCK_SIZE, streamed))
+
+
+if __name__ == '__main__':
+    main()
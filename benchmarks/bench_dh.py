@@ -0,0 +1,48 @@
+"""
+Reports Diffie-Hellman keypairs per second with hybrid_crypto.dh.DHGroup
+(for several table sizes) against plain pow(g, a, p).
+
+The timing does not depend on p being a safe prime, so a random prime p
+with g = 2 is used to avoid the slow search for a large safe prime.
+
+Run from the repository root with:  python benchmarks/bench_dh.py [num_keys]
+"""
+
+import os
+import sys
+from random import SystemRandom
+from time import perf_counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hybrid_crypto.dh import DHGroup
+from hybrid_crypto.primes import random_prime
+
+
+def main(num_keys=200, bit_lengths=(1024, 2048), window_sizes=(4, 6, 8)):
+    print("{:>8s}{:>10s}{:>14s}{:>14s}{:>12s}".format(
+        "p bits", "window", "table size", "keypairs/s", "vs pow"))
+    for bit_length in bit_lengths:
+        p = random_prime(bit_length)
+        g = 2
+        secrets = [SystemRandom().randrange(2, p - 1) for i in range(num_keys)]
+
+        start = perf_counter()
+        expected = [pow(g, a, p) for a in secrets]
+        pow_rate = num_keys / (perf_counter() - start)
+        print("{:8d}{:>10s}{:>14s}{:14.1f}{:12.2f}".format(bit_length, "pow", "-", pow_rate, 1.0))
+
+        for w in window_sizes:
+            start = perf_counter()
+            group = DHGroup(p, g, window_bits=w)
+            setup = perf_counter() - start
+            start = perf_counter()
+            assert [group.power(a) for a in secrets] == expected
+            rate = num_keys / (perf_counter() - start)
+            print("{:8d}{:10d}{:14d}{:14.1f}{:12.2f}   (table built in {:.2f} s)".format(
+                bit_length, w, group.table_size(), rate, rate / pow_rate, setup))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,89 @@
+"""
+Checks and times hybrid_crypto.exponent_audit on a key store of
+moduli made from a pool of primes:
+
+  * keys with e = 65537 and keys with a random full size e (so a full
+    size d) must not be reported, keys with d < N**(1/4) / 3 must be
+    reported with the right p, q and d;
+  * a message sent with e = 3 to three keys, and a short message sent
+    with e = 3 to one key, must be recovered; a message sent to only two
+    keys and different (padded) messages sent to three keys must not.
+
+Run from the repository root with:  python benchmarks/bench_exponent_audit.py [num_primes] [bit_length] [workers]
+"""
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from math import gcd, isqrt
+from random import Random
+from time import perf_counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hybrid_crypto.exponent_audit import wiener_audit, broadcast_audit
+from hybrid_crypto.primes import random_prime
+
+NUM_WEAK = 20                   # Keys with a small d
+NUM_LARGE_E = 200               # Keys with a random full size e
+
+
+def weak_key(rng, p, q):
+    '''
+    Returns (N, e, d) with d < N**(1/4) / 3, e = d^(-1) mod (p-1)(q-1).
+    '''
+    N = p * q
+    phi = (p - 1) * (q - 1)
+    while True:
+        d = rng.randrange(3, isqrt(isqrt(N)) // 3) | 1
+        if gcd(d, phi) == 1:
+            return (N, pow(d, -1, phi), d)
+
+
+def main(num_primes=150, bit_length=512, workers=2):
+    rng = Random(2023)
+    primes = [random_prime(bit_length) for i in range(num_primes)]
+    keys = [(p * q, 65537) for i, p in enumerate(primes) for q in primes[i + 1:]]
+    expected = {}
+    for i in range(NUM_LARGE_E):
+        (p, q) = rng.sample(primes, 2)
+        phi = (p - 1) * (q - 1)
+        e = rng.randrange(3, phi) | 1
+        while gcd(e, phi) != 1:
+            e += 2
+        keys.append((p * q, e))
+    for i in range(NUM_WEAK):
+        (p, q) = rng.sample(primes, 2)
+        (N, e, d) = weak_key(rng, p, q)
+        expected[len(keys)] = (min(p, q), max(p, q), d)
+        keys.append((N, e))
+
+    start = perf_counter()
+    findings = wiener_audit(keys)
+    elapsed = perf_counter() - start
+    assert {index: (min(p, q), max(p, q), d) for (index, N, e, p, q, d) in findings} == expected
+    print("wiener_audit: {} keys ({} with a large e), {} broken in {:.2f} s".format(
+        len(keys), NUM_LARGE_E + NUM_WEAK, len(findings), elapsed))
+    with ProcessPoolExecutor(workers) as executor:
+        start = perf_counter()
+        assert wiener_audit(keys, executor) == findings
+        print("wiener_audit with {} workers: {:.2f} s".format(workers, perf_counter() - start))
+
+    moduli = [p * q for (p, q) in zip(primes[0::2], primes[1::2])]
+    m = rng.getrandbits(2 * bit_length - 8)
+    short = rng.getrandbits(bit_length // 2)
+    records = [('broadcast', N, 3, pow(m, 3, N)) for N in moduli[:3]]
+    records += [('two keys', N, 3, pow(m + 1, 3, N)) for N in moduli[:2]]
+    records += [('padded', N, 3, pow(m + rng.getrandbits(64), 3, N)) for N in moduli[:3]]
+    records += [('short', moduli[3], 3, pow(short, 3, moduli[3]))]
+    records += [('e = 65537', N, 65537, pow(m, 65537, N)) for N in moduli[:3]]
+    start = perf_counter()
+    found = broadcast_audit(records)
+    assert sorted(found) == [('broadcast', 3, m, 3), ('short', 3, short, 1)], found
+    print("broadcast_audit: {} ciphertexts, {} messages recovered in {:.4f} s".format(
+        len(records), len(found), perf_counter() - start))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:4]])
@@ -0,0 +1,60 @@
+"""
+Times hybrid_crypto.factor.factorize on random semiprimes p*q of 40 to
+100 bits, and the lecture decompose (trial division) where it is still
+practical.
+
+Run from the repository root with:  python benchmarks/bench_factor.py [num_per_size]
+"""
+
+import os
+import sys
+from time import perf_counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'lectures_2023'))
+
+import number_theory_lecture_functions as lecture
+from hybrid_crypto.factor import factorize
+from hybrid_crypto.primes import random_prime
+
+LECTURE_MAX_BITS = 48           # Trial division beyond this takes too long
+
+
+def lecture_decompose(n):
+    '''
+    The lecture decompose by trial division (bypassing factorize).
+    '''
+    factors = {}
+    while n > 1:
+        p = lecture.smallest_factor(n)
+        factors[p] = factors.get(p, 0) + 1
+        n //= p
+    return factors
+
+
+def main(num_per_size=5, bit_lengths=(40, 48, 56, 64, 72, 80, 90, 100)):
+    print("{:>6s}{:>16s}{:>16s}".format("bits", "factorize (s)", "lecture (s)"))
+    for bits in bit_lengths:
+        semiprimes = []
+        for i in range(num_per_size):
+            p = random_prime(bits // 2)
+            q = random_prime(bits - bits // 2)
+            semiprimes.append((p * q, {p: 1, q: 1} if p != q else {p: 2}))
+
+        start = perf_counter()
+        for n, expected in semiprimes:
+            assert factorize(n) == expected, n
+        new = (perf_counter() - start) / num_per_size
+
+        old = float('nan')
+        if bits <= LECTURE_MAX_BITS:
+            start = perf_counter()
+            for n, expected in semiprimes:
+                assert lecture_decompose(n) == expected, n
+            old = (perf_counter() - start) / num_per_size
+        print("{:6d}{:16.5f}{:16.5f}".format(bits, new, old))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,67 @@
+"""
+Times hybrid_crypto.hybrid.HybridCipher: encrypting the message_*.txt
+files of the repository (one RSA encryption each) and encrypting and
+decrypting a large file of letters, with and without the 2-gram layer.
+First checks that derive_session still gives the key and encoding it
+gave when the seed format was fixed (files written then must still
+decrypt), and that the decrypted large file matches the letters.
+
+Run from the repository root with:  python benchmarks/bench_hybrid.py [megabytes]
+"""
+
+import os
+import sys
+import tempfile
+from hashlib import sha256
+from time import perf_counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hybrid_crypto.alphabetic import extract_file
+from hybrid_crypto.bigram import encoding_to_key
+from hybrid_crypto.hybrid import HybridCipher, derive_session
+
+# derive_session(bytes(range(32)), 16, 650): the key and the start of the
+# SHA-256 of encoding_to_key of the encoding
+SEED_VECTOR = ('qgpsspbeoaifhquk', 'd2c97bf9ae1a080a')
+
+
+def main(megabytes=32):
+    (key, encoding) = derive_session(bytes(range(32)), 16, 650)
+    assert (key, sha256(encoding_to_key(encoding).encode()).hexdigest()[:16]) == SEED_VECTOR
+    with tempfile.TemporaryDirectory() as work_dir:
+        for bigram_size in (0, 650):
+            alice = HybridCipher.generate(1024, bigram_size=bigram_size)
+            bob = alice.public()
+            print(alice)
+
+            start = perf_counter()
+            names = bob.encrypt_directory(ROOT, work_dir)
+            print("  directory of {} files:  {:8.3f} s".format(len(names), perf_counter() - start))
+
+            letters = b''.join(
+                b''.join(extract_file(os.path.join(ROOT, os.path.basename(name)[:-3])))
+                for name in names)
+            plain_name = os.path.join(work_dir, 'plain.txt')
+            with open(plain_name, 'wb') as f:
+                for i in range(megabytes * 10**6 // len(letters) + 1):
+                    f.write(letters)
+            size = os.path.getsize(plain_name)
+            cipher_name = os.path.join(work_dir, 'plain.hc')
+            start = perf_counter()
+            bob.encrypt_file(plain_name, cipher_name)
+            print("  encrypt_file:          {:8.2f} MB/s".format(
+                size / (perf_counter() - start) / 1e6))
+            start = perf_counter()
+            alice.decrypt_file(cipher_name, plain_name + '.out')
+            print("  decrypt_file:          {:8.2f} MB/s".format(
+                size / (perf_counter() - start) / 1e6))
+            with open(plain_name, 'rb') as f, open(plain_name + '.out', 'rb') as g:
+                assert g.read() == (f.read().lower() if bigram_size else f.read())
+            for name in names + [plain_name, cipher_name, plain_name + '.out']:
+                os.remove(name)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,70 @@
+"""
+Measures the cost of hybrid_crypto.instrument: the time to search the
+same windows for primes with no listener (before any listener was
+registered and after the last one was removed, which must be the same)
+and inside instrumented(). Then checks that random_prime with a process
+pool works inside instrumented() (the probes cannot be pickled, so the
+workers must get the uninstrumented search_window), that a window
+starting at the last odd number of bit_length bits counts one candidate,
+and prints the report of a few rsa_private_key calls, which must count a
+powmod for every Miller-Rabin round.
+
+Run from the repository root with:  python benchmarks/bench_instrument.py [bit_length] [keys] [workers]
+"""
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from random import Random
+from time import perf_counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hybrid_crypto import instrument, primes
+from hybrid_crypto.primality import is_prime
+
+
+def search(starts, bit_length):
+    '''
+    Returns the time in seconds to call primes.search_window on each start.
+    '''
+    start = perf_counter()
+    for s in starts:
+        primes.search_window(s, bit_length)
+    return perf_counter() - start
+
+
+def main(bit_length=1024, keys=4, workers=2):
+    rng = Random(2023)
+    starts = [rng.getrandbits(bit_length - 2) | (3 << (bit_length - 2)) | 1 for i in range(20)]
+    search(starts, bit_length)          # Warm up (and choose the backend)
+    before = search(starts, bit_length)
+    with instrument.instrumented():
+        enabled = search(starts, bit_length)
+    after = search(starts, bit_length)
+    for name, t in (('no listener', before), ('instrumented', enabled), ('removed', after)):
+        print("{:>14s}: {:8.2f} ms for {} windows ({:+.1%})".format(
+            name, 1000 * t, len(starts), t / before - 1))
+
+    with ProcessPoolExecutor(workers) as executor, instrument.instrumented() as recorder:
+        p = primes.random_prime(bit_length, executor=executor)
+    assert is_prime(p) and p.bit_length() == bit_length
+    assert recorder.summary()['random_prime_time']['calls'] == 1
+    print("random_prime with {} workers inside instrumented(): {} bits".format(
+        workers, p.bit_length()))
+
+    with instrument.instrumented() as recorder:
+        primes.search_window((1 << bit_length) - 1, bit_length)
+    assert recorder.counts['windows'] == 1 and recorder.counts['candidates'] == 1
+
+    with instrument.instrumented() as recorder:
+        for i in range(keys):
+            primes.rsa_private_key(bit_length)
+    assert recorder.counts['powmod'] == recorder.counts['miller_rabin'] > 0
+    print()
+    print(recorder.report())
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:4]])
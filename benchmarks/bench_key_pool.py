@@ -0,0 +1,53 @@
+"""
+Compares the time a client waits for an RSA key: calling rsa_private_key
+directly, against taking one from a warmed up KeyPool. Prints the pool
+metrics at the end. Then checks that a pool whose jobs fail (DH groups
+of 4 bits, which random_safe_prime refuses) makes get return None
+instead of waiting forever.
+
+Run from the repository root with:  python benchmarks/bench_key_pool.py [bit_length] [workers]
+"""
+
+import os
+import sys
+from time import perf_counter, sleep
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hybrid_crypto.key_pool import KeyPool, RETRIES
+from hybrid_crypto.primes import rsa_private_key
+
+NUM_KEYS = 8
+
+
+def main(bit_length=512, workers=2):
+    start = perf_counter()
+    for i in range(NUM_KEYS):
+        rsa_private_key(bit_length)
+    print("rsa_private_key:   {:10.4f} s per key".format((perf_counter() - start) / NUM_KEYS))
+
+    with KeyPool(bit_length, low_watermark=NUM_KEYS // 2, high_watermark=NUM_KEYS,
+                 workers=workers) as pool:
+        while pool.depth() < NUM_KEYS:
+            sleep(0.05)
+        waits = []
+        for i in range(NUM_KEYS):
+            start = perf_counter()
+            pool.get()
+            waits.append(perf_counter() - start)
+        print("KeyPool.get:       {:10.6f} s per key (longest wait {:.6f} s)".format(
+            sum(waits) / NUM_KEYS, max(waits)))
+        print(pool.metrics())
+
+    with KeyPool(4, kind='dh', low_watermark=0, high_watermark=2, workers=workers) as pool:
+        assert pool.get() is None
+        assert pool.get(timeout=5) is None
+        metrics = pool.metrics()
+        assert metrics['in_flight'] == 0 and metrics['failures'] > RETRIES, metrics
+        print("failing jobs: get returned None after {} failures ({!r})".format(
+            metrics['failures'], metrics['error']))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,53 @@
+"""
+Times the totient and divisor count tables of hybrid_crypto.multiplicative
+against calling the lecture euler_totient / mult_div_no for every k.
+
+Run from the repository root with:  python benchmarks/bench_multiplicative.py [limit]
+"""
+
+import importlib.util
+import os
+import sys
+from time import perf_counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'lectures_2023'))
+
+import number_theory_lecture_functions as lecture
+from hybrid_crypto import multiplicative
+
+LECTURE_LIMIT = 10**5           # The lecture functions are timed up to here only
+
+
+def timed(func, *args):
+    '''
+    Returns (func(*args), seconds taken).
+    '''
+    start = perf_counter()
+    result = func(*args)
+    return result, perf_counter() - start
+
+
+def main(limit=10**7):
+    phi, phi_time = timed(multiplicative.totient_table, limit)
+    d, d_time = timed(multiplicative.divisor_count_table, limit)
+    print("totient_table({}):       {:8.2f} s".format(limit, phi_time))
+    print("divisor_count_table({}): {:8.2f} s".format(limit, d_time))
+    if importlib.util.find_spec('numpy') is not None:
+        phi_np, np_time = timed(multiplicative.totient_table, limit, True)
+        d_np, d_np_time = timed(multiplicative.divisor_count_table, limit, True)
+        assert list(phi_np) == list(phi) and list(d_np) == list(d)
+        print("  with NumPy:            {:8.2f} s and {:.2f} s".format(np_time, d_np_time))
+
+    k_max = min(limit, LECTURE_LIMIT)
+    old, old_time = timed(lambda: [lecture.euler_totient(k) for k in range(1, k_max + 1)])
+    assert old == list(phi[1:k_max + 1])
+    old_d, old_d_time = timed(lambda: [lecture.mult_div_no(k) for k in range(1, k_max + 1)])
+    assert old_d == list(d[1:k_max + 1])
+    print("lecture euler_totient for k <= {}: {:.2f} s, mult_div_no: {:.2f} s".format(
+        k_max, old_time, old_d_time))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
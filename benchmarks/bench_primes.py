@@ -0,0 +1,45 @@
+"""
+Reports RSA keys per second by key bit length for the lecture
+rsa_private_key and for hybrid_crypto.primes.rsa_private_key (serial and
+with a process pool).
+
+Run from the repository root with:  python benchmarks/bench_primes.py [num_keys]
+"""
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'lectures_2023'))
+
+import cryptography_functions as lecture
+from hybrid_crypto import primes
+
+
+def keys_per_second(make_key, num_keys):
+    '''
+    Returns the number of keys per second made by num_keys calls of make_key.
+    '''
+    start = perf_counter()
+    for i in range(num_keys):
+        make_key()
+    return num_keys / (perf_counter() - start)
+
+
+def main(num_keys=5, key_lengths=(512, 1024, 2048)):
+    print("{:>10s}{:>14s}{:>14s}{:>14s}".format("key bits", "lecture", "sieved", "pool"))
+    with ProcessPoolExecutor() as executor:
+        for key_length in key_lengths:
+            bit_length = key_length // 2
+            old = keys_per_second(lambda: lecture.rsa_private_key(bit_length), num_keys)
+            new = keys_per_second(lambda: primes.rsa_private_key(bit_length), num_keys)
+            pool = keys_per_second(lambda: primes.rsa_private_key(bit_length, executor=executor),
+                                   num_keys)
+            print("{:10d}{:14.2f}{:14.2f}{:14.2f}".format(key_length, old, new, pool))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
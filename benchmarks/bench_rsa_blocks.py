@@ -0,0 +1,51 @@
+"""
+Reports the throughput (blocks per second) of the chunked RSA pipeline
+in hybrid_crypto.rsa_blocks on the message_*.txt files.
+
+Run from the repository root with:  python benchmarks/bench_rsa_blocks.py
+"""
+
+import glob
+import os
+import sys
+import tempfile
+from time import perf_counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'lectures_2023'))
+
+from cryptography_functions import rsa_private_key, rsa_public_key
+from hybrid_crypto import rsa_blocks
+
+
+def main(bit_lengths=(512, 1024)):
+    file_names = sorted(glob.glob(os.path.join(ROOT, 'message_*.txt')))
+    with tempfile.TemporaryDirectory() as work_dir:
+        print("{:>10s}{:>10s}{:>18s}{:>18s}".format(
+            "N bits", "blocks", "encrypt blocks/s", "decrypt blocks/s"))
+        for bit_length in bit_lengths:
+            (p, q) = rsa_private_key(bit_length)
+            (N, e) = rsa_public_key(p, q)
+            blocks = 0
+            encrypt_time = decrypt_time = 0.0
+            for file_name in file_names:
+                cipher_name = os.path.join(work_dir, 'cipher.bin')
+                plain_name = os.path.join(work_dir, 'plain.txt')
+
+                start = perf_counter()
+                blocks += rsa_blocks.encrypt_file(file_name, cipher_name, N, e)
+                encrypt_time += perf_counter() - start
+
+                start = perf_counter()
+                rsa_blocks.decrypt_file(cipher_name, plain_name, p, q, N, e)
+                decrypt_time += perf_counter() - start
+
+                with open(file_name, 'rb') as f, open(plain_name, 'rb') as g:
+                    assert f.read() == g.read()
+            print("{:10d}{:10d}{:18.1f}{:18.1f}".format(
+                N.bit_length(), blocks, blocks / encrypt_time, blocks / decrypt_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""
+Compares the lecture rsa_decrypt with CRT decryption through
+hybrid_crypto.rsa_keys.RSAPrivateKey (single calls and decrypt_many).
+
+Run from the repository root with:  python benchmarks/bench_rsa_crt.py
+"""
+
+import os
+import sys
+from random import SystemRandom
+from time import perf_counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'lectures_2023'))
+
+from cryptography_functions import rsa_private_key, rsa_public_key, rsa_decrypt
+from hybrid_crypto.rsa_keys import RSAPrivateKey
+
+
+def main(bit_lengths=(512, 1024), num_blocks=200):
+    print("{:>8s}{:>16s}{:>16s}{:>16s}{:>10s}".format(
+        "N bits", "lecture (/s)", "decrypt (/s)", "many (/s)", "speedup"))
+    for bit_length in bit_lengths:
+        (p, q) = rsa_private_key(bit_length)
+        (N, e) = rsa_public_key(p, q)
+        ciphertexts = [SystemRandom().randrange(N) for i in range(num_blocks)]
+
+        start = perf_counter()
+        expected = [rsa_decrypt(c, p, q, N, e) for c in ciphertexts]
+        lecture_time = perf_counter() - start
+
+        key = RSAPrivateKey(p, q, e)
+        start = perf_counter()
+        single = [key.decrypt(c) for c in ciphertexts]
+        single_time = perf_counter() - start
+
+        start = perf_counter()
+        many = key.decrypt_many(ciphertexts)
+        many_time = perf_counter() - start
+
+        assert expected == single == many
+        print("{:8d}{:16.1f}{:16.1f}{:16.1f}{:10.1f}".format(
+            N.bit_length(), num_blocks / lecture_time, num_blocks / single_time,
+            num_blocks / many_time, lecture_time / many_time))
+
+
+if __name__ == '__main__':
+    main()
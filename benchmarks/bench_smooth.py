@@ -0,0 +1,100 @@
+"""
+Checks and times hybrid_crypto.smooth:
+
+  * keys with a deliberately smooth p-1 (stage 1 only, and with one
+    prime between B1 and B2 for stage 2) must be factored by pollard_pm1
+    and flagged by is_smooth;
+  * for every small prime p and a large prime q, pollard_pm1(p * q,
+    SMALL_B1, SMALL_B2, base=3) must find p whenever is_smooth(p - 1,
+    SMALL_B1, SMALL_B2) says so (and it must not say so for p = 641,
+    p-1 = 2**7 * 5, where 2**7 is above SMALL_B1);
+  * ecm must find a prime of 40 bits times a prime of 512 bits, with and
+    without a process pool;
+  * keys from rsa_private_key must pass is_smooth for both primes and
+    resist audit, whose time per key is printed.
+
+Run from the repository root with:  python benchmarks/bench_smooth.py [bit_length] [keys] [workers]
+"""
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from random import Random
+from time import perf_counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hybrid_crypto import smooth
+from hybrid_crypto.primality import is_prime, small_primes
+from hybrid_crypto.primes import random_prime, rsa_private_key
+
+B1 = 10000
+B2 = 1000000
+SMALL_B1 = 100                  # Bounds for the small primes p
+SMALL_B2 = 1000
+SMALL_LIMIT = 20000             # Small primes p tried
+
+
+def smooth_prime(rng, bit_length, extra=1):
+    '''
+    Returns a prime p of at least bit_length bits with p - 1 = 2 * extra
+    * (distinct odd primes below B1).
+    '''
+    odd_primes = small_primes(B1)[1:]
+    while True:
+        factors = set()
+        m = 2 * extra
+        while m.bit_length() < bit_length:
+            r = rng.choice(odd_primes)
+            if r not in factors:
+                factors.add(r)
+                m *= r
+        if is_prime(m + 1):
+            return m + 1
+
+
+def main(bit_length=512, keys=4, workers=2):
+    rng = Random(2023)
+    q = random_prime(bit_length)
+    for name, extra in (('stage 1', 1), ('stage 2', 999983)):
+        p = smooth_prime(rng, bit_length, extra)
+        assert smooth.is_smooth(p - 1, B1, B2)
+        start = perf_counter()
+        assert smooth.pollard_pm1(p * q, B1, B2) == p, name
+        print("p-1 {}: factored in {:.3f} s".format(name, perf_counter() - start))
+
+    (smooth_count, found) = (0, 0)
+    start = perf_counter()
+    for p in small_primes(SMALL_LIMIT)[2:]:                 # p = 5, 7, 11, ... (3 is the base)
+        factor = smooth.pollard_pm1(p * q, SMALL_B1, SMALL_B2, base=3)
+        if smooth.is_smooth(p - 1, SMALL_B1, SMALL_B2):
+            assert factor == p, p
+            smooth_count += 1
+        found += factor == p
+    assert not smooth.is_smooth(641 - 1, SMALL_B1, SMALL_B2)
+    print("p-1 small p < {}: {} smooth, {} found ({:.3f} s)".format(
+        SMALL_LIMIT, smooth_count, found, perf_counter() - start))
+
+    p = random_prime(40)
+    N = p * random_prime(512)
+    start = perf_counter()
+    assert smooth.ecm(N, curves=200) == p
+    print("ECM, 40-bit factor:   {:8.3f} s".format(perf_counter() - start))
+    with ProcessPoolExecutor(workers) as executor:
+        start = perf_counter()
+        assert smooth.ecm(N, curves=200, executor=executor) == p
+        print("ECM, {} workers:       {:8.3f} s".format(workers, perf_counter() - start))
+
+        private_keys = [rsa_private_key(bit_length) for i in range(keys)]
+        for (p, q) in private_keys:
+            assert not smooth.is_smooth(p - 1) and not smooth.is_smooth(q - 1)
+        for (index, N, p, q, method, seconds) in smooth.audit(
+                [p * q for (p, q) in private_keys], executor=executor):
+            assert p is None, index
+            print("rsa_private_key({}) key {}: resisted p-1 and {} curves in {:.2f} s".format(
+                bit_length, index, smooth.ECM_CURVES, seconds))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:4]])
@@ -0,0 +1,79 @@
+"""
+Reports the throughput (MB/s) of hybrid_crypto.vigenere on the alphabetic
+content of the message_*.txt corpus, in memory and through vigenere_file,
+against a per-character Python loop. Checks on the way that keys which
+are empty or have characters other than letters are refused.
+
+Run from the repository root with:  python benchmarks/bench_vigenere.py [megabytes]
+"""
+
+import glob
+import os
+import string
+import sys
+import tempfile
+from random import SystemRandom
+from time import perf_counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hybrid_crypto import vigenere
+
+NON_LETTERS = bytes(b for b in range(256) if not chr(b).isascii() or not chr(b).isalpha())
+
+
+def corpus_letters():
+    '''
+    Returns the letters of all the message_*.txt files as one bytes object.
+    '''
+    parts = []
+    for file_name in sorted(glob.glob(os.path.join(ROOT, 'message_*.txt'))):
+        with open(file_name, 'rb') as f:
+            parts.append(f.read().translate(None, NON_LETTERS))
+    return b''.join(parts)
+
+
+def python_vigenere(text, key):
+    '''
+    The per-character version, for comparison.
+    '''
+    result = ''
+    for i, char in enumerate(text):
+        base = 97 if char.islower() else 65
+        shift = ord(key[i % len(key)].lower()) - 97
+        result += chr((ord(char) - base + shift) % 26 + base)
+    return result
+
+
+def main(megabytes=64):
+    letters = corpus_letters()
+    key = ''.join(SystemRandom().choice(string.ascii_lowercase) for i in range(200))
+    print("Corpus: {} letters, key length {}".format(len(letters), len(key)))
+
+    sample = letters.decode('ascii')
+    start = perf_counter()
+    expected = python_vigenere(sample, key)
+    python_rate = len(sample) / (perf_counter() - start) / 1e6
+    assert vigenere.vigenere_encrypt(sample, key) == expected
+    for bad_key in ('', 'AB C@', 'cl\u00e9'):
+        assert vigenere.vigenere_encrypt(sample, bad_key) is None, bad_key
+    print("per-character Python: {:10.2f} MB/s".format(python_rate))
+
+    data = vigenere.letters_to_array(letters * (megabytes * 10**6 // len(letters) + 1))
+    shifts = vigenere.key_to_shifts(key)
+    start = perf_counter()
+    vigenere.vigenere_array(data, shifts)
+    print("vigenere_array:       {:10.2f} MB/s".format(len(data) / (perf_counter() - start) / 1e6))
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        plain_name = os.path.join(work_dir, 'plain.txt')
+        cipher_name = os.path.join(work_dir, 'cipher.txt')
+        data.tofile(plain_name)
+        start = perf_counter()
+        vigenere.vigenere_file(plain_name, cipher_name, key)
+        print("vigenere_file:        {:10.2f} MB/s".format(len(data) / (perf_counter() - start) / 1e6))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,43 @@
+"""
+Times hybrid_crypto.vigenere_crack.crack on ciphertexts made from the
+letters of the message_*.txt corpus (repeated up to the given length)
+with random keys of several lengths, and checks the keys found.
+
+Run from the repository root with:  python benchmarks/bench_vigenere_crack.py [letters] [workers]
+"""
+
+from glob import glob
+import os
+import string
+import sys
+from random import SystemRandom
+from time import perf_counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hybrid_crypto import vigenere, vigenere_crack
+from hybrid_crypto.alphabetic import extract_file
+
+KEY_LENGTHS = (1, 7, 60, 250, 500)
+
+
+def main(length=10**6, workers=1):
+    letters = b''.join(b''.join(extract_file(file_name))
+                       for file_name in sorted(glob(os.path.join(ROOT, 'message_*.txt'))))
+    text = (letters * (length // len(letters) + 1))[:length]
+    print("Ciphertext: {} letters, key lengths up to {}, {} worker(s)".format(
+        len(text), vigenere_crack.MAX_KEY_LENGTH, workers))
+    data = vigenere.letters_to_array(text)
+    for k in KEY_LENGTHS:
+        key = ''.join(SystemRandom().choice(string.ascii_lowercase) for i in range(k))
+        cipher = vigenere.vigenere_array(data, vigenere.key_to_shifts(key))
+        start = perf_counter()
+        found = vigenere_crack.crack(cipher, workers=workers)
+        elapsed = perf_counter() - start
+        print("key length {:4d}: {:6.2f} s  {}".format(
+            k, elapsed, 'cracked' if found == key else 'FAILED (found length {})'.format(len(found))))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,84 @@
+"""
+Checks hybrid_crypto.aes against the published test vectors:
+
+  * FIPS-197 appendix B and the example vectors of appendix C for
+    AES-128, AES-192 and AES-256 (encryption and decryption);
+  * NIST SP 800-38A F.5.1 and F.5.5 (CTR-AES128 and CTR-AES256), also
+    streamed in pieces of every length from 1 to 64 bytes;
+  * a random round trip through RSA+AES (HybridCipher) and DH+AES.
+
+Run from the repository root with:  python benchmarks/check_aes.py
+"""
+
+import io
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hybrid_crypto.aes import AES
+
+BLOCK_VECTORS = [
+    # (key, plaintext, ciphertext)
+    ('2b7e151628aed2a6abf7158809cf4f3c', '3243f6a8885a308d313198a2e0370734',
+     '3925841d02dc09fbdc118597196a0b32'),
+    ('000102030405060708090a0b0c0d0e0f', '00112233445566778899aabbccddeeff',
+     '69c4e0d86a7b0430d8cdb78070b4c55a'),
+    ('000102030405060708090a0b0c0d0e0f1011121314151617', '00112233445566778899aabbccddeeff',
+     'dda97ca4864cdfe06eaf70a0ec0d7191'),
+    ('000102030405060708090a0b0c0d0e0f101112131415161718191a1b1c1d1e1f',
+     '00112233445566778899aabbccddeeff', '8ea2b7ca516745bfeafc49904b496089'),
+]
+
+CTR_PLAINTEXT = ('6bc1bee22e409f96e93d7e117393172aae2d8a571e03ac9c9eb76fac45af8e51'
+                 '30c81c46a35ce411e5fbc1191a0a52eff69f2445df4f9b17ad2b417be66c3710')
+CTR_IV = 'f0f1f2f3f4f5f6f7f8f9fafbfcfdfeff'
+CTR_VECTORS = [
+    ('2b7e151628aed2a6abf7158809cf4f3c',
+     '874d6191b620e3261bef6864990db6ce9806f66b7970fdff8617187bb9fffdff'
+     '5ae4df3edbd5d35e5b4f09020db03eab1e031dda2fbe03d1792170a0f3009cee'),
+    ('603deb1015ca71be2b73aef0857d77811f352c073b6108d72d9810a30914dff4',
+     '601ec313775789a5b7a7f504bbf3d228f443e3ca4d62b59aca84e990cacaf5c5'
+     '2b0930daa23de94ce87017ba2d84988ddfc9c58db67aada613c2dd08457941a6'),
+]
+
+
+def main():
+    for key, plain, cipher in BLOCK_VECTORS:
+        aes = AES(bytes.fromhex(key))
+        assert aes.encrypt_block(bytes.fromhex(plain)).hex() == cipher, key
+        assert aes.decrypt_block(bytes.fromhex(cipher)).hex() == plain, key
+    print("FIPS-197 block vectors: ok")
+
+    plain = bytes.fromhex(CTR_PLAINTEXT)
+    iv = bytes.fromhex(CTR_IV)
+    for key, cipher in CTR_VECTORS:
+        aes = AES(bytes.fromhex(key))
+        assert aes.ctr(plain, iv).hex() == cipher, key
+        assert aes.ctr(bytes.fromhex(cipher), iv) == plain, key
+        for size in range(1, 65):
+            pieces = [plain[i:i + size] for i in range(0, len(plain), size)]
+            assert b''.join(aes.ctr_stream(pieces, iv)).hex() == cipher, (key, size)
+    print("SP 800-38A CTR vectors: ok")
+
+    from hybrid_crypto.dh import DHGroup
+    from hybrid_crypto.hybrid import HybridCipher
+    message = os.urandom(100000)
+    alice = HybridCipher.generate(512, symmetric='aes')
+    envelope = io.BytesIO()
+    alice.public().encrypt_stream(io.BytesIO(message), envelope)
+    result = io.BytesIO()
+    alice.decrypt_stream(io.BytesIO(envelope.getvalue()), result)
+    assert result.getvalue() == message
+    print("RSA+AES round trip: ok")
+
+    group = DHGroup(2**127 - 1, 3)
+    (b, B) = group.generate_keypair()
+    (A, iv, cipher) = group.encrypt(B, message)
+    assert group.decrypt(b, A, iv, cipher) == message
+    print("DH+AES round trip: ok")
+
+
+if __name__ == '__main__':
+    main()
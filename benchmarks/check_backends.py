@@ -0,0 +1,111 @@
+"""
+Checks that every big integer backend of hybrid_crypto.backend gives
+bit-identical results, and times them.
+
+  * powmod, invert and is_strong_prp of each backend must equal those of
+    the Python backend (same int values, same ValueError for a number
+    that is not invertible, same verdicts including the edge cases
+    base = 1, p-1, multiples of a factor of p and even p);
+  * RSAPrivateKey.decrypt, lecture.rsa_decrypt, DHGroup.power and
+    key_audit.audit must give the same results under each backend;
+  * check_primality and check_lecture_copies are run again with
+    HYBRID_CRYPTO_BACKEND set to each backend.
+
+Only the Python backend is checked when gmpy2 is not installed.
+
+Run from the repository root with:  python benchmarks/check_backends.py [trials]
+"""
+
+import os
+import subprocess
+import sys
+from random import Random
+from time import perf_counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hybrid_crypto import backend, key_audit, lecture
+from hybrid_crypto.dh import DHGroup
+from hybrid_crypto.primes import random_prime
+from hybrid_crypto.rsa_keys import RSAPrivateKey
+
+
+def results(trials, seed):
+    '''
+    Returns the list of the results of the backend in use on inputs drawn
+    from seed.
+    '''
+    rng = Random(seed)
+    out = []
+    for i in range(trials):
+        bits = rng.choice((16, 64, 512, 2048))
+        m = rng.getrandbits(bits) | 1
+        out.append(backend.powmod(rng.getrandbits(bits), rng.getrandbits(bits), m))
+        a = rng.getrandbits(bits)
+        try:
+            out.append(backend.invert(a, m))
+        except ValueError:
+            out.append('not invertible')
+        for base in (1, 2, m - 1, m - 2, m + 3, 3 * rng.randrange(1, 100), rng.randrange(2, m + 2)):
+            out.append(backend.is_strong_prp(m, base))
+        out.append(backend.is_strong_prp(m + 1, 3))                # Even p
+    for (p, q) in [((1 << 127) - 1, (1 << 89) - 1), ((1 << 521) - 1, (1 << 607) - 1)]:
+        key = RSAPrivateKey(p, q)
+        c = rng.randrange(key.N)
+        out += [key.decrypt(c), key.decrypt_many([c, c + 1]), key.d, key.q_inv,
+                lecture.rsa_decrypt(c, p, q, key.N, key.e)]
+    group = DHGroup((1 << 521) - 1, 3, exponent_bits=256)
+    out += [group.power(rng.getrandbits(256)), group.power(rng.getrandbits(600)),
+            group.shared_secret(rng.getrandbits(256), 5)]
+    primes = [(1 << 61) - 1, (1 << 89) - 1, (1 << 107) - 1, (1 << 127) - 1]
+    out.append(key_audit.audit([primes[0] * primes[1], primes[1] * primes[2],
+                                primes[3] * ((1 << 31) - 1), 11 * 13]))
+    return out
+
+
+def timings():
+    '''
+    Returns (powmod at 2048 bits, random_prime(1024)) in milliseconds for
+    the backend in use.
+    '''
+    rng = Random(1)
+    (b, e, m) = (rng.getrandbits(2048), rng.getrandbits(2048), rng.getrandbits(2048) | 1)
+    start = perf_counter()
+    for i in range(20):
+        backend.powmod(b, e, m)
+    powmod_time = (perf_counter() - start) / 20
+    start = perf_counter()
+    for i in range(5):
+        random_prime(1024)
+    return (1000 * powmod_time, 1000 * (perf_counter() - start) / 5)
+
+
+def main(trials=500, seed=2023):
+    start = perf_counter()
+    backend.use('python')
+    expected = results(trials, seed)
+    for name in backend.BACKENDS:
+        backend.use(name)
+        found = results(trials, seed)
+        assert all(type(x) is type(y) and x == y for x, y in zip(found, expected)), name
+        print("{:>8s}: identical to the Python backend on {} results".format(name, len(found)))
+    for name in backend.BACKENDS:
+        backend.use(name)
+        print("{:>8s}: powmod (2048 bits) {:8.2f} ms, random_prime(1024) {:8.1f} ms".format(
+            name, *timings()))
+    backend.use()
+
+    for name in backend.BACKENDS:
+        env = dict(os.environ, HYBRID_CRYPTO_BACKEND=name)
+        for script, args in (('check_primality.py', ['200000']), ('check_lecture_copies.py', [])):
+            print("{:>8s}: {}".format(name, script), flush=True)
+            subprocess.run([sys.executable, os.path.join(ROOT, 'benchmarks', script)] + args,
+                           env=env, check=True)
+    if len(backend.BACKENDS) == 1:
+        print("gmpy2 is not installed: only the Python backend was checked")
+    print("Done in {:.1f} s".format(perf_counter() - start))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,146 @@
+"""
+Checks that the copies of the lecture functions agree with each other
+and with hybrid_crypto:
+
+    diffie_hellman/cryptography_lecture_functions.py
+    lectures_2023/cryptography_functions.py
+    lectures_2023/miller_rabin.py
+    lectures_2023/number_theory_lecture_functions.py
+
+on random inputs: gcd, gcd_ext, modular_inverse, is_prime,
+smallest_factor, decompose, totient, convert_to_integer /
+convert_to_text and rsa_encrypt / rsa_decrypt give identical results.
+The lecture modules now import these from hybrid_crypto.lecture, so this
+catches a module that exports the wrong function or stops importing.
+The miller_rabin copies must agree exactly with
+hybrid_crypto.primality.miller_rabin, and they must say True wherever
+the frozen original lecture algorithm (check_primality's
+reference_miller_rabin, which can also reject at a square root of 1)
+says True, in particular on every prime. For p < 4 and even p, inputs
+the lecture version took as well, they must give exactly what it gave
+(miller_rabin(1, 2) is False, not an error).
+The modules are loaded from their files, so the check does not depend
+on which copy happens to be first on the path.
+
+Run from the repository root with:  python benchmarks/check_lecture_copies.py [trials]
+"""
+
+import importlib.util
+import os
+import sys
+from random import Random
+from time import perf_counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from check_primality import reference_miller_rabin
+from hybrid_crypto import codec, factor, multiplicative, number_theory, primality
+from hybrid_crypto.primes import random_prime
+from hybrid_crypto.rsa_keys import RSAPrivateKey
+
+COPIES = {
+    'dh': 'diffie_hellman/cryptography_lecture_functions.py',
+    'crypto': 'lectures_2023/cryptography_functions.py',
+    'mr': 'lectures_2023/miller_rabin.py',
+    'nt': 'lectures_2023/number_theory_lecture_functions.py',
+}
+SMALL_LIMIT = 200               # miller_rabin(n, base) checked for all n below and base <= 2n+1
+
+
+def load_copies():
+    '''
+    Returns the dictionary of the lecture modules, loaded from COPIES.
+    '''
+    modules = {}
+    for name, path in COPIES.items():
+        spec = importlib.util.spec_from_file_location('lecture_' + name, os.path.join(ROOT, path))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        modules[name] = module
+    return modules
+
+
+def copies_of(modules, function_name):
+    '''
+    Returns the list of (copy name, function) of the copies defining
+    function_name.
+    '''
+    return [(name, getattr(module, function_name)) for name, module in modules.items()
+            if hasattr(module, function_name)]
+
+
+def agree(modules, function_name, reference, *args):
+    '''
+    Checks that every copy of function_name returns reference(*args).
+    '''
+    expected = reference(*args)
+    for name, function in copies_of(modules, function_name):
+        result = function(*args)
+        assert result == expected, (function_name, name, args, result, expected)
+
+
+def main(trials=300, seed=2023):
+    rng = Random(seed)
+    modules = load_copies()
+    start = perf_counter()
+
+    for i in range(trials):
+        bits = rng.choice((8, 32, 64, 256, 1024))
+        a = rng.getrandbits(bits) - rng.getrandbits(bits)
+        b = rng.getrandbits(bits) + 1
+        agree(modules, 'gcd', number_theory.gcd, a, b)
+        agree(modules, 'gcd_ext', number_theory.gcd_ext, a, b)
+        if number_theory.gcd(a, b) == 1 and b > 1:
+            agree(modules, 'modular_inverse', number_theory.modular_inverse, a, b)
+    print("gcd, gcd_ext, modular_inverse: all copies agree")
+
+    for i in range(trials):
+        bits = rng.choice((16, 64, 128, 512))
+        n = rng.getrandbits(bits) | 1 | (1 << (bits - 1))
+        if i % 3 == 0:
+            n = random_prime(bits)
+        for base in (2, 3, rng.randrange(2, n - 1)):
+            agree(modules, 'miller_rabin', primality.miller_rabin, n, base)
+            if reference_miller_rabin(n, base):     # The reference never rejects a prime
+                for name, function in copies_of(modules, 'miller_rabin'):
+                    assert function(n, base), (name, n, base)
+        agree(modules, 'is_prime', primality.is_prime, n)
+    for n in range(1, SMALL_LIMIT):
+        for base in range(2 * n + 2):
+            agree(modules, 'miller_rabin', primality.miller_rabin, n, base)
+            if n < 4 or n % 2 == 0:
+                assert primality.miller_rabin(n, base) == reference_miller_rabin(n, base), (n, base)
+    print("miller_rabin, is_prime: all copies agree")
+
+    for i in range(trials):
+        n = rng.randrange(2, 1 << rng.choice((10, 24, 40)))
+        agree(modules, 'smallest_factor', factor.smallest_factor, n)
+        agree(modules, 'decompose', factor.factorize, n)
+        agree(modules, 'totient', multiplicative.euler_totient, n)
+        agree(modules, 'euler_totient', multiplicative.euler_totient, n)
+    print("smallest_factor, decompose, totient: all copies agree")
+
+    for i in range(trials // 10):
+        text = ''.join(chr(rng.randrange(256)) for j in range(rng.randrange(1, 100)))
+        agree(modules, 'convert_to_integer', codec.convert_to_integer, text)
+        number = codec.convert_to_integer(text)
+        agree(modules, 'convert_to_text', codec.convert_to_text, number)
+
+        key = None
+        while key is None:
+            (p, q) = (random_prime(128), random_prime(128))
+            try:
+                key = RSAPrivateKey(p, q)
+            except ValueError:
+                continue
+        m = rng.randrange(key.N)
+        agree(modules, 'rsa_encrypt', lambda m, N, e: pow(m, e, N), m, key.N, key.e)
+        c = pow(m, key.e, key.N)
+        agree(modules, 'rsa_decrypt', lambda c, p, q, N, e: key.decrypt(c), c, p, q, key.N, key.e)
+    print("convert_to_integer, convert_to_text, rsa_encrypt, rsa_decrypt: all copies agree")
+    print("Done in {:.1f} s".format(perf_counter() - start))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,107 @@
+"""
+Cross-checks hybrid_crypto.primality against the original lecture
+miller_rabin and is_prime, kept below as reference_miller_rabin and
+reference_is_prime (lectures_2023/miller_rabin.py now imports the
+hybrid_crypto versions).
+
+  * is_prime must agree exactly with the lecture is_prime on every
+    integer below limit and on random integers below 2**64 (both are
+    deterministic there);
+  * for every odd n and base, a False from the new miller_rabin must be
+    a False from the lecture one (the lecture test also checks the
+    earlier squarings, so it can only reject more);
+  * above 2**64 is_prime, baillie_psw and the lecture is_prime must agree
+    on random odd numbers and on products of two primes.
+
+Run from the repository root with:  python benchmarks/check_primality.py [limit]
+"""
+
+import os
+import sys
+from random import Random
+from time import perf_counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hybrid_crypto import primality
+
+FIRST_PRIMES = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37]
+_reference_random = Random()
+
+
+def reference_miller_rabin(p, base):
+    '''
+    The lecture miller_rabin: computes base**(p-1) mod p from the top bit
+    of p-1 down, returning False at a square root of 1 other than +1 or
+    -1 (ROO) or if the result is not 1 (FLT).
+    '''
+    n = 1
+    for bit in bin(p - 1)[2:]:
+        n_squared = n * n % p
+        if n_squared == 1 and n != 1 and n != p - 1:
+            return False
+        n = n_squared * base % p if bit == '1' else n_squared
+    return n == 1
+
+
+def reference_is_prime(p, num_wit=50):
+    '''
+    The lecture is_prime: the witnesses FIRST_PRIMES up to 2**64 and
+    num_wit random witnesses above.
+    '''
+    if p < 38:
+        return p in FIRST_PRIMES
+    if p % 2 == 0:
+        return False
+    if p <= 2**64:
+        return all(reference_miller_rabin(p, witness) for witness in FIRST_PRIMES)
+    return all(reference_miller_rabin(p, _reference_random.randint(2, p - 2))
+               for i in range(num_wit))
+
+
+def main(limit=2000000, num_random=200000, seed=2023):
+    rng = Random(seed)
+    start = perf_counter()
+
+    for n in range(limit):
+        assert primality.is_prime(n) == reference_is_prime(n), n
+    print("is_prime agrees on 0..{}".format(limit - 1))
+
+    for i in range(num_random):
+        n = rng.getrandbits(64) | 1
+        assert primality.is_prime(n) == reference_is_prime(n), n
+        base = rng.randrange(2, n - 1)
+        if not primality.miller_rabin(n, base):
+            assert not reference_miller_rabin(n, base), (n, base)
+    print("is_prime and miller_rabin agree on {} random 64-bit numbers".format(num_random))
+
+    # Strong pseudoprimes to base 2 must still be caught
+    for n in (2047, 3277, 4033, 4681, 8321, 3215031751, 2152302898747, 3474749660383,
+              341550071728321, 3825123056546413051, 318665857834031151167461):
+        assert not primality.is_prime(n) and not primality.baillie_psw(n), n
+    print("known strong pseudoprimes are rejected")
+
+    for bits in (80, 128, 256, 512):
+        for i in range(200):
+            n = rng.getrandbits(bits) | (1 << (bits - 1)) | 1
+            verdict = reference_is_prime(n)
+            assert primality.is_prime(n) == verdict == primality.baillie_psw(n), n
+            if verdict:
+                m = n * next_prime(rng.getrandbits(bits // 2) | 1)
+                assert not primality.is_prime(m) and not primality.baillie_psw(m), m
+    print("is_prime, baillie_psw and the lecture is_prime agree up to 512 bits")
+    print("Done in {:.1f} s".format(perf_counter() - start))
+
+
+def next_prime(n):
+    '''
+    Returns the first prime >= n.
+    '''
+    while not primality.is_prime(n):
+        n += 1
+    return n
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
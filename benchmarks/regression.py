@@ -0,0 +1,277 @@
+"""
+Benchmark regression suite of the number theory hot paths.
+
+Every case is timed with timeit at a range of bit sizes: the number of
+calls per measurement is raised until a measurement takes at least
+0.2 s, the measurement is repeated and the median time per call is kept. The
+inputs are drawn from a fixed seed, so two runs time the same work
+(except for random_prime and rsa_private_key, which search from random
+starting points and get a wider tolerance).
+
+The results can be saved as JSON (--save) and are compared with the
+stored baseline of the backend in use, benchmarks/baseline_gmpy2.json or
+benchmarks/baseline_python.json: a case more than its tolerance times
+slower than the baseline is reported and the run exits with status 1.
+--update-baseline writes the results as the new baseline. --check also
+runs check_lecture_copies (the lecture copies must agree). --backend
+selects the big integer backend (see hybrid_crypto.backend, the default
+is gmpy2 when it is installed). The backend is saved with the results,
+and a baseline measured with another backend is not compared at all
+(exit status 2): GMP timings say nothing about Python int timings.
+Timings depend on the machine, so the baseline should be regenerated
+when the suite moves to another one.
+
+Run from the repository root with:  python benchmarks/regression.py [--quick] [--full]
+    [--only NAME] [--save FILE] [--baseline FILE] [--update-baseline] [--check]
+    [--backend gmpy2|python]
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+from random import Random
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'lectures_2023'))
+
+import cryptography_functions as lecture
+from hybrid_crypto import backend, codec, factor, multiplicative, number_theory, primality, primes
+from hybrid_crypto.rsa_keys import RSAPrivateKey
+
+BASELINE = os.path.join(ROOT, 'benchmarks', 'baseline_{}.json')     # One per backend
+SIZES = (64, 256, 1024, 2048, 4096)
+QUICK_SIZES = (64, 256, 1024)
+FACTOR_SIZES = (32, 48, 64)     # Factoring is exponential: small sizes only
+DETERMINISTIC = 1.5             # Tolerated slowdown of a case with fixed inputs
+RANDOM = 3.0                    # and of a case that searches at random
+
+
+def _odd(rng, bits):
+    return rng.getrandbits(bits) | 1 | (1 << (bits - 1))
+
+
+def _prime(rng, bits):
+    n = _odd(rng, bits)
+    while not primality.is_prime(n, 20):
+        n += 2
+    return n
+
+
+def _key(rng, bits):
+    '''
+    Returns an RSAPrivateKey whose N has about bits bits, from the
+    primes found after two seeded random starts.
+    '''
+    while True:
+        try:
+            return RSAPrivateKey(_prime(rng, bits // 2), _prime(rng, bits // 2))
+        except ValueError:
+            continue
+
+
+def _miller_rabin(rng, bits):
+    p = _prime(rng, bits)
+    return lambda: primality.miller_rabin(p, 2)
+
+
+def _is_prime(rng, bits):
+    # A prime (all the witnesses are tried) and a composite
+    p = _prime(rng, bits)
+    n = _odd(rng, bits) * 3
+    return lambda: (primality.is_prime(p, 20), primality.is_prime(n, 20))
+
+
+def _random_prime(rng, bits):
+    return lambda: primes.random_prime(bits)
+
+
+def _rsa_private_key(rng, bits):
+    return lambda: primes.rsa_private_key(bits // 2)
+
+
+def _gcd_ext(rng, bits):
+    (a, b) = (rng.getrandbits(bits), rng.getrandbits(bits))
+    return lambda: number_theory.gcd_ext(a, b)
+
+
+def _modular_inverse(rng, bits):
+    n = _odd(rng, bits)
+    a = rng.randrange(1, n)
+    while number_theory.gcd(a, n) != 1:
+        a = rng.randrange(1, n)
+    return lambda: number_theory.modular_inverse(a, n)
+
+
+def _decompose(rng, bits):
+    # A product of two primes of half the size: the hardest case for rho
+    n = _prime(rng, bits // 2) * _prime(rng, bits // 2)
+    return lambda: factor.factorize(n)
+
+
+def _totient(rng, bits):
+    # The factorization is cached: time it afresh on every call
+    n = _prime(rng, bits // 2) * _prime(rng, bits // 2)
+    return lambda: (multiplicative.factorization.cache_clear(), multiplicative.euler_totient(n))
+
+
+def _convert(rng, bits):
+    text = ''.join(chr(rng.randrange(32, 127)) for i in range(bits // 8))
+    return lambda: codec.convert_to_text(codec.convert_to_integer(text))
+
+
+def _rsa_encrypt(rng, bits):
+    key = _key(rng, bits)
+    m = rng.randrange(key.N)
+    return lambda: lecture.rsa_encrypt(m, key.N, key.e)
+
+
+def _rsa_decrypt(rng, bits):
+    key = _key(rng, bits)
+    c = rng.randrange(key.N)
+    return lambda: lecture.rsa_decrypt(c, key.p, key.q, key.N, key.e)
+
+
+def _rsa_decrypt_crt(rng, bits):
+    key = _key(rng, bits)
+    c = rng.randrange(key.N)
+    return lambda: key.decrypt(c)
+
+
+# name: (make the timed function for a bit size, sizes, tolerance)
+CASES = {
+    'miller_rabin': (_miller_rabin, SIZES, DETERMINISTIC),
+    'is_prime': (_is_prime, SIZES, DETERMINISTIC),
+    'random_prime': (_random_prime, SIZES[:-1], RANDOM),
+    'rsa_private_key': (_rsa_private_key, SIZES[:-1], RANDOM),
+    'gcd_ext': (_gcd_ext, SIZES, DETERMINISTIC),
+    'modular_inverse': (_modular_inverse, SIZES, DETERMINISTIC),
+    'decompose': (_decompose, FACTOR_SIZES, RANDOM),
+    'totient': (_totient, FACTOR_SIZES, RANDOM),
+    'convert_to_integer/text': (_convert, SIZES, DETERMINISTIC),
+    'rsa_encrypt': (_rsa_encrypt, SIZES, DETERMINISTIC),
+    'rsa_decrypt': (_rsa_decrypt, SIZES, DETERMINISTIC),
+    'rsa_decrypt_crt': (_rsa_decrypt_crt, SIZES, DETERMINISTIC),
+}
+# random_prime and rsa_private_key at 4096 bits take minutes: --full only
+FULL_ONLY = {'random_prime': (4096,), 'rsa_private_key': (4096,)}
+
+
+def measure(function, repeats, min_time=0.2):
+    '''
+    Returns the median time in seconds of one call of function over
+    repeats measurements of at least min_time seconds (or one call).
+    '''
+    timer = timeit.Timer(function)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        number = max(2 * number, int(1.2 * number * min_time / elapsed) if elapsed else 10 * number)
+    times = [elapsed] + timer.repeat(repeats - 1, number) if repeats > 1 else [elapsed]
+    return statistics.median(times) / number
+
+
+def run(names, quick=False, full=False, repeats=5, seed=2023):
+    '''
+    Returns the dictionary {'name bits': seconds per call} of the cases
+    names, printing each result as it is measured.
+    '''
+    results = {}
+    for name in names:
+        (make, sizes, tolerance) = CASES[name]
+        if quick:
+            sizes = [bits for bits in sizes if bits in QUICK_SIZES or bits in FACTOR_SIZES]
+        elif full:
+            sizes = sorted(set(sizes) | set(FULL_ONLY.get(name, ())))
+        for bits in sizes:
+            function = make(Random('{} {} {}'.format(seed, name, bits)), bits)
+            seconds = measure(function, repeats)
+            results['{} {}'.format(name, bits)] = seconds
+            print("{:>28s}{:6d}{:14.3f} ms".format(name, bits, 1000 * seconds), flush=True)
+    return results
+
+
+def compare(results, baseline):
+    '''
+    Prints the ratio of each result to the baseline and returns the list
+    of the cases slower than their tolerance allows.
+    '''
+    slower = []
+    print("\n{:>35s}{:>14s}{:>14s}{:>8s}".format("case", "baseline ms", "now ms", "ratio"))
+    for case, seconds in results.items():
+        if case not in baseline:
+            continue
+        ratio = seconds / baseline[case]
+        tolerance = CASES[case.rsplit(' ', 1)[0]][2]
+        flag = '  SLOWER' if ratio > tolerance else ''
+        print("{:>35s}{:14.3f}{:14.3f}{:8.2f}{}".format(
+            case, 1000 * baseline[case], 1000 * seconds, ratio, flag))
+        if flag:
+            slower.append(case)
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Number theory benchmark regression suite.')
+    parser.add_argument('--quick', action='store_true', help='sizes up to 1024 bits, 3 repeats')
+    parser.add_argument('--full', action='store_true', help='random_prime at 4096 bits too')
+    parser.add_argument('--only', action='append', choices=sorted(CASES), help='run this case only')
+    parser.add_argument('--save', help='write the results to this JSON file')
+    parser.add_argument('--baseline', help='JSON file to compare with (default: the one of the backend)')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='write the results to the baseline file instead of comparing')
+    parser.add_argument('--check', action='store_true', help='run check_lecture_copies first')
+    parser.add_argument('--backend', choices=backend.BACKENDS, help='big integer backend to use')
+    args = parser.parse_args(argv)
+    if args.backend:
+        backend.use(args.backend)
+    if args.baseline is None:
+        args.baseline = BASELINE.format(backend.current())
+
+    if args.check:
+        import check_lecture_copies
+        check_lecture_copies.main()
+
+    results = run(args.only or list(CASES), args.quick, args.full, 3 if args.quick else 5)
+    record = {'python': platform.python_version(), 'machine': platform.machine(),
+              'backend': backend.current(), 'results': results}
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(record, f, indent=1, sort_keys=True)
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):       # Keep the cases that were not run
+            with open(args.baseline) as f:
+                old = json.load(f)
+            if old.get('backend', 'python') == backend.current():
+                baseline = old['results']
+        record['results'] = dict(baseline, **results)
+        with open(args.baseline, 'w') as f:
+            json.dump(record, f, indent=1, sort_keys=True)
+        print('Baseline written to', args.baseline)
+        return 0
+    if not os.path.exists(args.baseline):
+        print('No baseline at', args.baseline, '- run with --update-baseline first.')
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get('backend', 'python') != backend.current():
+        print('The baseline {} was measured with the {} backend, this run uses {}: not compared.'
+              .format(args.baseline, baseline.get('backend', 'python'), backend.current()))
+        return 2
+    slower = compare(results, baseline['results'])
+    if slower:
+        print('\n{} case(s) slower than the baseline allows: {}'.format(len(slower), ', '.join(slower)))
+        return 1
+    print('\nNo slowdown beyond the tolerances.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
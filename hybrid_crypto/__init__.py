@@ -0,0 +1,63 @@
+"""
+Package name: hybrid_crypto
+Package contains: the library versions of the number theory and
+                  cryptography functions used in the Hybrid Cryptography
+                  Project. The lecture modules in diffie_hellman/ and
+                  lectures_2023/ import the lecture functions from
+                  hybrid_crypto.lecture.
+
+Importing the package loads nothing else. The functions and classes
+listed in _EXPORTS (hybrid_crypto.is_prime, hybrid_crypto.HybridCipher,
+...) and the submodules (hybrid_crypto.vigenere, ...) are imported the
+first time they are used, by the module __getattr__ below. So NumPy
+(alphabetic, bigram, vigenere, vigenere_crack), process pools (key_pool,
+safe_primes) and gmpy2 (backend, at the first big integer operation)
+are only loaded by the code that needs them, and a worker process that
+only runs, say, primes.search_window starts in a few milliseconds.
+"""
+
+import importlib
+
+# name: submodule defining it
+_EXPORTS = {
+    'gcd': 'number_theory', 'gcd_ext': 'number_theory',
+    'modular_inverse': 'number_theory', 'batch_modular_inverse': 'number_theory',
+    'miller_rabin': 'primality', 'is_prime': 'primality', 'baillie_psw': 'primality',
+    'random_prime': 'primes', 'rsa_private_key': 'primes',
+    'random_safe_prime': 'safe_primes', 'safe_prime_group': 'safe_primes',
+    'factorize': 'factor', 'decompose': 'factor', 'smallest_factor': 'factor',
+    'pollard_pm1': 'smooth', 'ecm': 'smooth',
+    'euler_totient': 'multiplicative', 'totient_table': 'multiplicative',
+    'convert_to_integer': 'codec', 'convert_to_text': 'codec',
+    'encode_bytes': 'codec', 'decode_bytes': 'codec',
+    'RSAPrivateKey': 'rsa_keys', 'DHGroup': 'dh', 'AES': 'aes',
+    'HybridCipher': 'hybrid', 'KeyPool': 'key_pool',
+}
+
+_SUBMODULES = frozenset([
+    'aes', 'alphabetic', 'backend', 'bigram', 'codec', 'dh', 'exponent_audit', 'factor', 'hybrid',
+    'instrument', 'key_audit', 'key_pool', 'lecture', 'multiplicative', 'number_theory', 'orders',
+    'primality', 'primes', 'rsa_blocks', 'rsa_keys', 'safe_primes', 'smooth', 'vigenere',
+    'vigenere_crack',
+])
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    '''
+    Imports the submodule name, or the submodule defining name, on first
+    use. The result is stored in the package, so this runs once per name.
+    '''
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module('hybrid_crypto.' + _EXPORTS[name]), name)
+    elif name in _SUBMODULES:
+        value = importlib.import_module('hybrid_crypto.' + name)
+    else:
+        raise AttributeError("module 'hybrid_crypto' has no attribute '{}'".format(name))
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS) | _SUBMODULES)
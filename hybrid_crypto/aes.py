@@ -0,0 +1,285 @@
+"""
+Module name: aes
+Module contains: the Advanced Encryption Standard (FIPS-197) in pure
+                 Python, with CTR mode for bulk data
+Class names: AES
+Function names: key_expansion, derive_key
+
+AES works on a 16 byte state, viewed here as four 32 bit columns s0..s3.
+A round is SubBytes, ShiftRows, MixColumns and AddRoundKey. For one
+output column these combine into four table lookups (the T-tables)
+
+    t0 = Te0[s0 >> 24] ^ Te1[(s1 >> 16) & 255] ^ Te2[(s2 >> 8) & 255]
+         ^ Te3[s3 & 255] ^ round_key
+
+where Te0[x] is the MixColumns column of the S-box value S[x] and Te1,
+Te2, Te3 are its byte rotations. The tables, the S-box and its inverse
+are computed once at import from the arithmetic of GF(2^8), and the round
+keys (for decryption too) once per key.
+
+In CTR mode the i-th block of keystream is the encryption of the counter
+block iv + i (mod 2**128), and encryption and decryption both XOR the
+data with the keystream. The keystream is made BATCH_BLOCKS blocks at a
+time and XORed over the whole batch with one big integer operation
+(int.from_bytes), never byte by byte.
+
+derive_key turns a shared secret integer (e.g. from Diffie-Hellman) into
+an AES key by hashing it with SHA-256.
+"""
+
+import hashlib
+import struct
+
+BATCH_BLOCKS = 4096             # Keystream blocks made at a time (64 KiB)
+
+
+def _multiply(a, b):
+    '''
+    Returns the product of the bytes a and b in GF(2^8) modulo the AES
+    polynomial x^8 + x^4 + x^3 + x + 1.
+    '''
+    result = 0
+    while b:
+        if b & 1:
+            result ^= a
+        a <<= 1
+        if a & 0x100:
+            a ^= 0x11B
+        b >>= 1
+    return result
+
+
+def _make_tables():
+    '''
+    Returns the S-box, its inverse, and the encryption and decryption
+    T-tables.
+    '''
+    # Multiplicative inverses from the powers of the generator 3
+    power = [0] * 255
+    log = [0] * 256
+    x = 1
+    for i in range(255):
+        power[i] = x
+        log[x] = i
+        x = _multiply(x, 3)
+    inverse = [0] + [power[-log[a] % 255] for a in range(1, 256)]
+    sbox = [0] * 256
+    for a in range(256):
+        x = inverse[a]
+        y = x
+        for i in range(4):          # The affine map: x + x<<<1 + ... + x<<<4 + 0x63
+            x = ((x << 1) | (x >> 7)) & 0xFF
+            y ^= x
+        sbox[a] = y ^ 0x63
+    inv_sbox = [0] * 256
+    for a in range(256):
+        inv_sbox[sbox[a]] = a
+
+    def rotations(column):
+        return [column, [(w >> 8) | ((w & 0xFF) << 24) for w in column],
+                [(w >> 16) | ((w & 0xFFFF) << 16) for w in column],
+                [(w >> 24) | ((w & 0xFFFFFF) << 8) for w in column]]
+
+    te = rotations([(_multiply(s, 2) << 24) | (s << 16) | (s << 8) | _multiply(s, 3)
+                    for s in sbox])
+    td = rotations([(_multiply(s, 14) << 24) | (_multiply(s, 9) << 16)
+                    | (_multiply(s, 13) << 8) | _multiply(s, 11) for s in inv_sbox])
+    return (sbox, inv_sbox, te, td)
+
+
+(SBOX, INV_SBOX, (_TE0, _TE1, _TE2, _TE3), (_TD0, _TD1, _TD2, _TD3)) = _make_tables()
+# The S-box shifted into each byte of a column, for the last round
+_S24 = [s << 24 for s in SBOX]
+_S16 = [s << 16 for s in SBOX]
+_S8 = [s << 8 for s in SBOX]
+_IS24 = [s << 24 for s in INV_SBOX]
+_IS16 = [s << 16 for s in INV_SBOX]
+_IS8 = [s << 8 for s in INV_SBOX]
+_BLOCK = struct.Struct('>4I')
+
+
+def key_expansion(key):
+    '''
+    Given a key of 16, 24 or 32 bytes returns the list of the 4*(rounds+1)
+    32 bit words of the encryption round keys.
+    '''
+    nk = len(key) // 4
+    rounds = nk + 6
+    words = list(struct.unpack('>{}I'.format(nk), key))
+    rcon = 1
+    for i in range(nk, 4 * (rounds + 1)):
+        w = words[i - 1]
+        if i % nk == 0:
+            # RotWord, SubWord and the round constant
+            w = (_S24[(w >> 16) & 255] ^ _S16[(w >> 8) & 255] ^ _S8[w & 255]
+                 ^ SBOX[w >> 24] ^ (rcon << 24))
+            rcon = _multiply(rcon, 2)
+        elif nk > 6 and i % nk == 4:
+            w = _S24[w >> 24] ^ _S16[(w >> 16) & 255] ^ _S8[(w >> 8) & 255] ^ SBOX[w & 255]
+        words.append(words[i - nk] ^ w)
+    return words
+
+
+def derive_key(secret, key_bytes=16):
+    '''
+    Returns an AES key of key_bytes bytes derived from the integer secret
+    (the first bytes of the SHA-256 hash of its big endian bytes).
+    '''
+    data = secret.to_bytes((secret.bit_length() + 7) // 8 or 1, 'big')
+    return hashlib.sha256(data).digest()[:key_bytes]
+
+
+def _decryption_keys(words, rounds):
+    '''
+    Returns the round keys of the equivalent inverse cipher: the rounds
+    in reverse order with InvMixColumns applied to the middle ones.
+    '''
+    keys = list(words[4 * rounds:4 * rounds + 4])
+    for r in range(rounds - 1, 0, -1):
+        for w in words[4 * r:4 * r + 4]:
+            keys.append(_TD0[SBOX[w >> 24]] ^ _TD1[SBOX[(w >> 16) & 255]]
+                        ^ _TD2[SBOX[(w >> 8) & 255]] ^ _TD3[SBOX[w & 255]])
+    keys.extend(words[:4])
+    return keys
+
+
+class AES:
+    '''
+    An AES key (16, 24 or 32 bytes) with its round keys for encryption
+    and decryption.
+    '''
+    __slots__ = ('rounds', 'round_keys', 'decrypt_keys')
+
+    def __init__(self, key):
+        if len(key) not in (16, 24, 32):
+            raise ValueError('An AES key has 16, 24 or 32 bytes.')
+        self.rounds = len(key) // 4 + 6
+        self.round_keys = key_expansion(key)
+        self.decrypt_keys = _decryption_keys(self.round_keys, self.rounds)
+
+    def _encrypt_words(self, s0, s1, s2, s3):
+        '''
+        Returns the four columns of the encryption of the state s0..s3.
+        '''
+        te0, te1, te2, te3 = _TE0, _TE1, _TE2, _TE3
+        rk = self.round_keys
+        s0 ^= rk[0]
+        s1 ^= rk[1]
+        s2 ^= rk[2]
+        s3 ^= rk[3]
+        for i in range(4, 4 * self.rounds, 4):
+            t0 = te0[s0 >> 24] ^ te1[(s1 >> 16) & 255] ^ te2[(s2 >> 8) & 255] ^ te3[s3 & 255] ^ rk[i]
+            t1 = te0[s1 >> 24] ^ te1[(s2 >> 16) & 255] ^ te2[(s3 >> 8) & 255] ^ te3[s0 & 255] ^ rk[i + 1]
+            t2 = te0[s2 >> 24] ^ te1[(s3 >> 16) & 255] ^ te2[(s0 >> 8) & 255] ^ te3[s1 & 255] ^ rk[i + 2]
+            s3 = te0[s3 >> 24] ^ te1[(s0 >> 16) & 255] ^ te2[(s1 >> 8) & 255] ^ te3[s2 & 255] ^ rk[i + 3]
+            s0, s1, s2 = t0, t1, t2
+        i = 4 * self.rounds
+        return (_S24[s0 >> 24] ^ _S16[(s1 >> 16) & 255] ^ _S8[(s2 >> 8) & 255] ^ SBOX[s3 & 255] ^ rk[i],
+                _S24[s1 >> 24] ^ _S16[(s2 >> 16) & 255] ^ _S8[(s3 >> 8) & 255] ^ SBOX[s0 & 255] ^ rk[i + 1],
+                _S24[s2 >> 24] ^ _S16[(s3 >> 16) & 255] ^ _S8[(s0 >> 8) & 255] ^ SBOX[s1 & 255] ^ rk[i + 2],
+                _S24[s3 >> 24] ^ _S16[(s0 >> 16) & 255] ^ _S8[(s1 >> 8) & 255] ^ SBOX[s2 & 255] ^ rk[i + 3])
+
+    def encrypt_block(self, block):
+        '''
+        Returns the encryption of the 16 byte block.
+        '''
+        return _BLOCK.pack(*self._encrypt_words(*_BLOCK.unpack(block)))
+
+    def decrypt_block(self, block):
+        '''
+        Returns the decryption of the 16 byte block.
+        '''
+        td0, td1, td2, td3 = _TD0, _TD1, _TD2, _TD3
+        dk = self.decrypt_keys
+        (s0, s1, s2, s3) = _BLOCK.unpack(block)
+        s0 ^= dk[0]
+        s1 ^= dk[1]
+        s2 ^= dk[2]
+        s3 ^= dk[3]
+        for i in range(4, 4 * self.rounds, 4):
+            t0 = td0[s0 >> 24] ^ td1[(s3 >> 16) & 255] ^ td2[(s2 >> 8) & 255] ^ td3[s1 & 255] ^ dk[i]
+            t1 = td0[s1 >> 24] ^ td1[(s0 >> 16) & 255] ^ td2[(s3 >> 8) & 255] ^ td3[s2 & 255] ^ dk[i + 1]
+            t2 = td0[s2 >> 24] ^ td1[(s1 >> 16) & 255] ^ td2[(s0 >> 8) & 255] ^ td3[s3 & 255] ^ dk[i + 2]
+            s3 = td0[s3 >> 24] ^ td1[(s2 >> 16) & 255] ^ td2[(s1 >> 8) & 255] ^ td3[s0 & 255] ^ dk[i + 3]
+            s0, s1, s2 = t0, t1, t2
+        i = 4 * self.rounds
+        return _BLOCK.pack(
+            _IS24[s0 >> 24] ^ _IS16[(s3 >> 16) & 255] ^ _IS8[(s2 >> 8) & 255] ^ INV_SBOX[s1 & 255] ^ dk[i],
+            _IS24[s1 >> 24] ^ _IS16[(s0 >> 16) & 255] ^ _IS8[(s3 >> 8) & 255] ^ INV_SBOX[s2 & 255] ^ dk[i + 1],
+            _IS24[s2 >> 24] ^ _IS16[(s1 >> 16) & 255] ^ _IS8[(s0 >> 8) & 255] ^ INV_SBOX[s3 & 255] ^ dk[i + 2],
+            _IS24[s3 >> 24] ^ _IS16[(s2 >> 16) & 255] ^ _IS8[(s1 >> 8) & 255] ^ INV_SBOX[s0 & 255] ^ dk[i + 3])
+
+    def keystream(self, counter, num_blocks):
+        '''
+        Returns num_blocks blocks of CTR keystream (bytes), starting with
+        the encryption of the counter block counter (an integer).
+        '''
+        # The rounds of _encrypt_words written out here with everything in
+        # local variables, as this loop is where CTR mode spends its time
+        te0, te1, te2, te3 = _TE0, _TE1, _TE2, _TE3
+        s24, s16, s8, sbox = _S24, _S16, _S8, SBOX
+        rk = self.round_keys
+        (k0, k1, k2, k3) = rk[:4]
+        middle = [tuple(rk[i:i + 4]) for i in range(4, 4 * self.rounds, 4)]
+        (l0, l1, l2, l3) = rk[4 * self.rounds:]
+        mask = 0xFFFFFFFF
+        words = []
+        extend = words.extend
+        for c in range(counter, counter + num_blocks):
+            c &= (1 << 128) - 1
+            s0 = (c >> 96) ^ k0
+            s1 = ((c >> 64) & mask) ^ k1
+            s2 = ((c >> 32) & mask) ^ k2
+            s3 = (c & mask) ^ k3
+            for (r0, r1, r2, r3) in middle:
+                t0 = te0[s0 >> 24] ^ te1[(s1 >> 16) & 255] ^ te2[(s2 >> 8) & 255] ^ te3[s3 & 255] ^ r0
+                t1 = te0[s1 >> 24] ^ te1[(s2 >> 16) & 255] ^ te2[(s3 >> 8) & 255] ^ te3[s0 & 255] ^ r1
+                t2 = te0[s2 >> 24] ^ te1[(s3 >> 16) & 255] ^ te2[(s0 >> 8) & 255] ^ te3[s1 & 255] ^ r2
+                s3 = te0[s3 >> 24] ^ te1[(s0 >> 16) & 255] ^ te2[(s1 >> 8) & 255] ^ te3[s2 & 255] ^ r3
+                s0, s1, s2 = t0, t1, t2
+            extend((s24[s0 >> 24] ^ s16[(s1 >> 16) & 255] ^ s8[(s2 >> 8) & 255] ^ sbox[s3 & 255] ^ l0,
+                    s24[s1 >> 24] ^ s16[(s2 >> 16) & 255] ^ s8[(s3 >> 8) & 255] ^ sbox[s0 & 255] ^ l1,
+                    s24[s2 >> 24] ^ s16[(s3 >> 16) & 255] ^ s8[(s0 >> 8) & 255] ^ sbox[s1 & 255] ^ l2,
+                    s24[s3 >> 24] ^ s16[(s0 >> 16) & 255] ^ s8[(s1 >> 8) & 255] ^ sbox[s2 & 255] ^ l3))
+        return struct.pack('>{}I'.format(len(words)), *words)
+
+    def ctr(self, data, iv, offset=0):
+        '''
+        Returns the CTR mode encryption (equally, decryption) of data with
+        the 16 byte initial counter block iv. offset is the position of
+        data[0] in the whole message and must be a multiple of 16 except
+        for the last piece of a message.
+        '''
+        if offset % 16:
+            print('The offset must be a multiple of 16.')
+            return None
+        counter = int.from_bytes(iv, 'big') + offset // 16
+        view = memoryview(data)
+        pieces = []
+        for start in range(0, len(view), 16 * BATCH_BLOCKS):
+            piece = view[start:start + 16 * BATCH_BLOCKS]
+            n = len(piece)
+            stream = self.keystream(counter + start // 16, (n + 15) // 16)[:n]
+            pieces.append((int.from_bytes(piece, 'big') ^ int.from_bytes(stream, 'big')).to_bytes(n, 'big'))
+        return b''.join(pieces)
+
+    def ctr_stream(self, chunks, iv):
+        '''
+        Given an iterable of chunks of bytes yields their CTR mode
+        encryptions (equally, decryptions), continuing the keystream from
+        one chunk to the next.
+        '''
+        counter = int.from_bytes(iv, 'big')
+        pending = b''                       # Unused keystream of a part block
+        for chunk in chunks:
+            n = len(chunk)
+            if n <= len(pending):
+                stream = pending[:n]
+                pending = pending[n:]
+            else:
+                blocks = (n - len(pending) + 15) // 16
+                stream = pending + self.keystream(counter, blocks)
+                counter += blocks
+                pending = stream[n:]
+                stream = stream[:n]
+            yield (int.from_bytes(chunk, 'big') ^ int.from_bytes(stream, 'big')).to_bytes(n, 'big')
@@ -0,0 +1,159 @@
+"""
+Module name: alphabetic
+Module contains: extraction of the alphabetic content of texts and files
+                 (see extract_alphabetic_content.ipynb), streamed in chunks
+Function names: extract_letters, extract_text, extract_stream, extract_file,
+                restore_case, rebuild, rebuild_stream
+
+Filtering a text one character at a time (and building new strings as
+we go) is slow for whole books. Here every chunk of raw bytes is filtered
+by a single call of bytes.translate with a delete table: all bytes that
+are not one of the 52 ASCII letters are deleted, and the table can at the
+same time fold the letters to upper or lower case. Files are read in
+binary, so there is no decoding step either (the bytes of non-ASCII
+characters such as the utf-8 BOM are simply not letters).
+
+Optionally the layout of the text is recorded in a binary file object:
+a copy of the input in which every upper case letter is replaced by 'A'
+and every lower case letter by 'a' (again one translate call). This holds
+both the case of each letter and all of the punctuation, spacing etc., so
+rebuild puts the (deciphered) letters back to give the original text.
+With NumPy installed rebuild scatters the letters into the layout with
+one fancy-indexing assignment, otherwise it joins the words and gaps.
+"""
+
+import re
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+CHUNK_SIZE = 1 << 20            # Bytes read from a file at a time
+
+UPPER = b'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+LOWER = b'abcdefghijklmnopqrstuvwxyz'
+NON_LETTERS = bytes(b for b in range(256) if b not in UPPER + LOWER)
+
+_KEEP = bytes(range(256))                           # translate tables
+_TO_UPPER = bytes.maketrans(LOWER, UPPER)
+_TO_LOWER = bytes.maketrans(UPPER, LOWER)
+_CASE_TABLES = {None: _KEEP, 'upper': _TO_UPPER, 'lower': _TO_LOWER}
+_LAYOUT = bytes.maketrans(UPPER + LOWER, b'A' * 26 + b'a' * 26)
+_NOT_PLACEHOLDER = bytes(b for b in range(256) if b not in b'Aa')
+_PLACEHOLDER_RUN = re.compile(b'[Aa]+')
+
+
+def extract_letters(data, case=None):
+    '''
+    Given bytes data returns the bytes of its letters a-z and A-Z only,
+    converted to upper (or lower) case if case is 'upper' (or 'lower').
+    '''
+    return data.translate(_CASE_TABLES[case], NON_LETTERS)
+
+
+def extract_text(text, case=None):
+    '''
+    Returns the string containing only the alphabetic content of the
+    string text (the function extract_text of the notebook).
+    '''
+    data = text.encode('utf-8', errors='ignore')
+    return extract_letters(data, case).decode('ascii')
+
+
+def extract_stream(stream, chunk_size=CHUNK_SIZE, case=None, layout=None):
+    '''
+    Given a binary file object stream, yields the letters of each chunk
+    of (at most) chunk_size bytes read from it, as bytes. If layout is a
+    binary file object the layout of the text is written to it.
+    '''
+    if case not in _CASE_TABLES:
+        print("case must be None, 'upper' or 'lower'.")
+        return
+    table = _CASE_TABLES[case]
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            return
+        if layout is not None:
+            layout.write(chunk.translate(_LAYOUT))
+        letters = chunk.translate(table, NON_LETTERS)
+        if letters:
+            yield letters
+
+
+def extract_file(file_name, chunk_size=CHUNK_SIZE, case=None, layout=None):
+    '''
+    Given input file_name yields the letters of that file, chunk_size
+    bytes of the file at a time.
+    '''
+    with open(file_name, 'rb') as f:
+        yield from extract_stream(f, chunk_size, case, layout)
+
+
+def restore_case(letters, case_mask):
+    '''
+    Given letters (bytes, in any case) and case_mask (bytes of the same
+    length, 'A' for upper case and 'a' for lower case) returns the
+    letters in the cases given by case_mask.
+    '''
+    n = len(letters)
+    if len(case_mask) != n:
+        print('The letters and the case mask have different lengths.')
+        return None
+    # The case of an ASCII letter is its bit 0x20, so for all letters at
+    # once: clear that bit in the letters and take it from case_mask
+    bits = int.from_bytes(b'\x20' * n, 'big')
+    result = (int.from_bytes(letters, 'big') & ~bits) | (int.from_bytes(case_mask, 'big') & bits)
+    return result.to_bytes(n, 'big')
+
+
+def rebuild(letters, layout):
+    '''
+    Given letters (bytes) and the layout recorded by extract_stream
+    returns the original text (bytes) with those letters in place of the
+    letters of the original.
+    '''
+    if np is not None:
+        result = np.frombuffer(layout, dtype=np.uint8).copy()
+        where = np.flatnonzero((result | 32) == 97)    # The positions of 'A' and 'a'
+        if len(where) != len(letters):
+            print('The letters and the case mask have different lengths.')
+            return None
+        # Clear the case bit 0x20 of the letters and take it from the layout
+        result[where] = (np.frombuffer(letters, dtype=np.uint8) & 0xDF) | (result[where] & 0x20)
+        return result.tobytes()
+    letters = restore_case(letters, layout.translate(None, _NOT_PLACEHOLDER))
+    if letters is None:
+        return None
+    gaps = _PLACEHOLDER_RUN.split(layout)           # The punctuation etc. between words
+    pieces = [gaps[0]]
+    i = 0
+    for word, gap in zip(_PLACEHOLDER_RUN.findall(layout), gaps[1:]):
+        pieces.append(letters[i:i + len(word)])
+        pieces.append(gap)
+        i += len(word)
+    return b''.join(pieces)
+
+
+def rebuild_stream(letter_chunks, layout_stream, chunk_size=CHUNK_SIZE):
+    '''
+    Given an iterable of chunks of letters (e.g. deciphered chunks from
+    extract_file) and the binary file object holding the layout, yields
+    the chunks of the rebuilt text.
+    '''
+    chunks = iter(letter_chunks)
+    pending = bytearray()
+    while True:
+        layout = layout_stream.read(chunk_size)
+        if not layout:
+            return
+        needed = layout.count(b'A') + layout.count(b'a')
+        while len(pending) < needed:
+            chunk = next(chunks, None)
+            if chunk is None:
+                print('There are fewer letters than the layout needs.')
+                return
+            pending += chunk
+        yield rebuild(bytes(pending[:needed]), layout)
+        del pending[:needed]
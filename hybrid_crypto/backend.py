@@ -0,0 +1,153 @@
+"""
+Module name: backend
+Module contains: the big integer operations that the rest of the package
+                 goes through, done by gmpy2 (GMP) when it is installed
+                 and by Python ints otherwise
+Function names: use, current, mpz, powmod, invert, is_strong_prp
+
+primality.miller_rabin (and so random_prime and is_prime), the RSA
+decryptions of rsa_keys and lecture, the Diffie-Hellman exponentiations
+of dh and the product trees of key_audit call backend.powmod,
+backend.invert, backend.is_strong_prp and backend.mpz. These are the
+functions of the backend in use:
+
+    'gmpy2'   gmpy2.powmod, gmpy2.invert, gmpy2.is_strong_prp, gmpy2.mpz
+    'python'  pow(b, e, m), pow(a, -1, m), the strong probable prime test
+              written out below, and mpz(n) = n
+
+The default is gmpy2 if it is installed. HYBRID_CRYPTO_BACKEND=python
+in the environment or use('python') selects the fallback. Importing
+gmpy2 takes tens of milliseconds, so nothing is chosen (or imported)
+until the first call of one of the functions, which calls use(); a
+worker process that never does big integer arithmetic does not pay for
+it. Callers look the functions up as backend.powmod etc. at every call,
+so a later use() applies everywhere at once.
+
+The results are bit-identical whichever backend is in use: powmod and
+invert return Python ints (mpz results are converted), invert raises
+ValueError for a non-invertible a just like pow, and the gmpy2 test is
+only used for the arguments where it agrees with the strong test below
+(odd p and 1 < base < p-1).
+"""
+
+import os
+from importlib.machinery import PathFinder        # Finds gmpy2 without importing it
+
+BACKENDS = ('gmpy2', 'python') if PathFinder.find_spec('gmpy2') else ('python',)
+
+NAME = None                     # The backend in use, None until use() is called
+gmpy2 = None                    # The gmpy2 module, once use('gmpy2') imports it
+
+
+def _python_mpz(n):
+    return n
+
+
+def _python_powmod(base, exponent, modulus):
+    return pow(base, exponent, modulus)
+
+
+def _python_invert(a, modulus):
+    return pow(a, -1, modulus)          # ValueError if gcd(a, modulus) != 1
+
+
+def _python_is_strong_prp(p, base):
+    '''
+    The strong probable prime (Miller-Rabin) test of the odd number p > 3
+    to the given base: p - 1 = 2**s * d with d odd, pow(base,d,p) once
+    and then at most s-1 squarings. For any other p > 0 it is the Fermat
+    test base**(p-1) = 1 (mod p), which is what the lecture version of
+    miller_rabin gives there (False for p = 1).
+    '''
+    if p < 4 or not p & 1:
+        return p > 1 and pow(base, p - 1, p) == 1
+    d = p - 1
+    s = (d & -d).bit_length() - 1       # p - 1 = 2**s * d with d odd
+    d >>= s
+    x = pow(base, d, p)
+    if x == 1 or x == p - 1:
+        return True
+    for i in range(s - 1):
+        x = x * x % p
+        if x == p - 1:
+            return True
+        if x == 1:                      # A square root of 1 other than +1 or -1
+            return False
+    return False
+
+
+def _gmpy2_powmod(base, exponent, modulus):
+    return int(gmpy2.powmod(base, exponent, modulus))
+
+
+def _gmpy2_invert(a, modulus):
+    try:
+        return int(gmpy2.invert(a, modulus))
+    except ZeroDivisionError:
+        raise ValueError('base is not invertible for the given modulus') from None
+
+
+def _gmpy2_is_strong_prp(p, base):
+    if not (p & 1 and 1 < base < p - 1):    # gmpy2 treats these its own way
+        return _python_is_strong_prp(p, base)
+    try:
+        return gmpy2.is_strong_prp(p, base)
+    except ValueError:                  # gcd(base, p) > 1, so p is composite
+        return False
+
+
+def use(name=None):
+    '''
+    Selects the backend name ('gmpy2' or 'python'). With no name the
+    environment variable HYBRID_CRYPTO_BACKEND decides, and otherwise
+    gmpy2 if it is installed. Returns the name of the backend in use, or
+    None with a message if name is not available.
+    '''
+    global NAME, gmpy2, mpz, powmod, invert, is_strong_prp
+    if name is None:
+        name = os.environ.get('HYBRID_CRYPTO_BACKEND') or BACKENDS[0]
+    if name not in BACKENDS:
+        print('The backend {} is not available, choose from {}.'.format(name, BACKENDS))
+        return None
+    if name == 'gmpy2':
+        import gmpy2
+        (mpz, powmod, invert, is_strong_prp) = (
+            gmpy2.mpz, _gmpy2_powmod, _gmpy2_invert, _gmpy2_is_strong_prp)
+    else:
+        (mpz, powmod, invert, is_strong_prp) = (
+            _python_mpz, _python_powmod, _python_invert, _python_is_strong_prp)
+    NAME = name
+    return name
+
+
+def current():
+    '''
+    Returns the name of the backend in use, choosing it first if
+    necessary.
+    '''
+    if NAME is None and use() is None:  # An unknown HYBRID_CRYPTO_BACKEND
+        use('python')
+    return NAME
+
+
+# Until a backend is chosen each function chooses one and calls its own
+# version, which replaces it from then on
+
+def mpz(n):
+    current()
+    return mpz(n)
+
+
+def powmod(base, exponent, modulus):
+    current()
+    return powmod(base, exponent, modulus)
+
+
+def invert(a, modulus):
+    current()
+    return invert(a, modulus)
+
+
+def is_strong_prp(p, base):
+    current()
+    return is_strong_prp(p, base)
@@ -0,0 +1,210 @@
+"""
+Module name: bigram
+Module contains: the random (homophonic) encoding of letters into 2-grams
+                 of section 4 of the project, with NumPy lookup tables
+Function names: make_encoding, encoding_to_key, key_to_encoding,
+                encode_array, decode_array, bigram_encode, bigram_decode,
+                encode_stream, decode_stream, letters_to_indices
+
+Each letter is represented by a randomly chosen set of 2-grams made up
+of distinct letters (there are 26*25 = 650 of them), the size of the set
+being proportional to the frequency of the letter in English. Encoding
+replaces every instance of a letter by a random member of its set, so
+all 2-grams occur about equally often and the letter frequencies are
+disguised.
+
+An encoding is stored as its decoding table: a uint8 array of length
+676 with table[26*i + j] the letter (0,...,25) that the 2-gram of the
+letters i, j stands for, or UNUSED. For decoding this is widened to a
+table of 65536 entries indexed by the two bytes of a 2-gram read as one
+uint16, so decoding is the single fancy indexing wide[pairs] over the
+array viewed as uint16. For encoding the members of all the sets are
+listed letter by letter in one array (again as uint16 pairs of bytes),
+so the k-th member of the set of letter x is members[starts[x] + k] and
+one np.take writes both letters of every 2-gram. The random choices k
+for a block of letters come from a single os.urandom call rather than
+one SystemRandom call per letter.
+
+As a key the table is the string of its 676 entries, a letter for each
+used 2-gram and '-' otherwise.
+"""
+
+import os
+from random import SystemRandom
+
+import numpy as np
+
+NUM_BIGRAMS = 650               # Size of the encoding, at most 650
+UNUSED = 255                    # Table entry of a 2-gram that is not used
+BLOCK_SIZE = 1 << 16            # Letters encoded per random draw
+
+_random = SystemRandom()
+
+
+def make_encoding(size=NUM_BIGRAMS, frequencies=None, rng=None):
+    '''
+    Returns a random decoding table using size of the 650 2-grams of
+    distinct letters, the letter i getting about size * frequencies[i]
+    of them (and at least one). frequencies defaults to those of the
+    message_*.txt corpus. The 2-grams are shuffled by rng (a random.Random,
+    SystemRandom by default).
+    '''
+    if not 26 <= size <= 650:
+        print('The size must be between 26 and 650.')
+        return None
+    if frequencies is None:
+        from hybrid_crypto.vigenere_crack import corpus_frequencies
+        frequencies = corpus_frequencies()
+    # One 2-gram for every letter, the rest shared out in proportion to
+    # the frequencies, the largest remainders getting the last few
+    shares = np.asarray(frequencies, dtype=np.float64) * (size - 26) / np.sum(frequencies)
+    counts = 1 + shares.astype(np.int64)
+    extra = size - counts.sum()
+    counts[np.argsort(shares - np.floor(shares))[::-1][:extra]] += 1
+    codes = [26 * i + j for i in range(26) for j in range(26) if i != j]
+    (rng or _random).shuffle(codes)
+    table = np.full(676, UNUSED, dtype=np.uint8)
+    table[codes[:size]] = np.repeat(np.arange(26, dtype=np.uint8), counts)
+    return table
+
+
+def encoding_to_key(table):
+    '''
+    Returns the decoding table as a string of 676 characters.
+    '''
+    letters = np.where(table == UNUSED, ord('-'), table + ord('a'))
+    return letters.astype(np.uint8).tobytes().decode('ascii')
+
+
+def key_to_encoding(key):
+    '''
+    Returns the decoding table given by the string key of encoding_to_key.
+    '''
+    if len(key) != 676:
+        print('An encoding key has 676 characters.')
+        return None
+    data = np.frombuffer(key.encode('ascii'), dtype=np.uint8)
+    return np.where(data == ord('-'), UNUSED, (data & 31) - 1).astype(np.uint8)
+
+
+def _encoding_sets(table):
+    '''
+    Returns (members, starts, counts): the 2-grams of each letter listed
+    letter by letter, each as the uint16 whose two bytes (in memory) are
+    its letter indices, and where and how many there are of them.
+    '''
+    used = np.flatnonzero(table != UNUSED)
+    codes = used[np.argsort(table[used], kind='stable')]
+    pairs = np.empty((len(codes), 2), dtype=np.uint8)
+    pairs[:, 0] = codes // 26
+    pairs[:, 1] = codes % 26
+    counts = np.bincount(table[used], minlength=26)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    return (pairs.view(np.uint16).ravel(), starts, counts.astype(np.uint64))
+
+
+def encode_array(indices, table, sets=None):
+    '''
+    Given a uint8 array of letter indices 0,...,25 returns the uint8
+    array of twice the length holding the indices of the 2-grams chosen
+    at random to encode them.
+    '''
+    if sets is None:
+        sets = _encoding_sets(table)
+    (members, starts, counts) = sets
+    result = np.empty(len(indices), dtype=np.uint16)
+    for start in range(0, len(indices), BLOCK_SIZE):
+        x = indices[start:start + BLOCK_SIZE]
+        # A random 32 bit number r for each letter; r * count >> 32 is a
+        # (practically) uniform choice among the count members of its set
+        r = np.frombuffer(os.urandom(4 * len(x)), dtype=np.uint32).astype(np.uint64)
+        r *= counts[x]
+        r >>= 32
+        np.take(members, starts[x] + r.astype(np.int64), out=result[start:start + BLOCK_SIZE])
+    return result.view(np.uint8)
+
+
+def _wide_table(table):
+    '''
+    Returns the decoding table indexed by the uint16 whose two bytes (in
+    memory) are the letter indices of a 2-gram.
+    '''
+    pairs = np.empty((676, 2), dtype=np.uint8)
+    pairs[:, 0] = np.arange(676) // 26
+    pairs[:, 1] = np.arange(676) % 26
+    wide = np.full(1 << 16, UNUSED, dtype=np.uint8)
+    wide[pairs.view(np.uint16).ravel()] = table
+    return wide
+
+
+def decode_array(indices, table, wide=None):
+    '''
+    Given a uint8 array of 2-gram letter indices (of even length) returns
+    the uint8 array of the letters that they encode.
+    '''
+    if len(indices) % 2:
+        print('The encoded message has odd length.')
+        return None
+    if wide is None:
+        wide = _wide_table(table)
+    letters = wide[np.ascontiguousarray(indices).view(np.uint16)]
+    if (letters == UNUSED).any():
+        print('The message contains a 2-gram that the encoding does not use.')
+        return None
+    return letters
+
+
+def letters_to_indices(text):
+    '''
+    Returns the alphabetic string (or bytes) text as a uint8 array of
+    letter indices 0,...,25.
+    '''
+    if isinstance(text, str):
+        text = text.encode('ascii')
+    return (np.frombuffer(text, dtype=np.uint8) & 31) - 1
+
+
+def bigram_encode(text, table):
+    '''
+    Returns the random 2-gram encoding (in lower case) of the alphabetic
+    string text.
+    '''
+    return (encode_array(letters_to_indices(text), table) + ord('a')).tobytes().decode('ascii')
+
+
+def bigram_decode(text, table):
+    '''
+    Returns the (lower case) alphabetic string encoded by text.
+    '''
+    letters = decode_array(letters_to_indices(text), table)
+    if letters is None:
+        return None
+    return (letters + ord('a')).tobytes().decode('ascii')
+
+
+def encode_stream(chunks, table):
+    '''
+    Given an iterable of chunks of letters (bytes) yields the chunks of
+    their 2-gram encoding (lower case bytes).
+    '''
+    sets = _encoding_sets(table)
+    for chunk in chunks:
+        yield (encode_array(letters_to_indices(chunk), table, sets) + ord('a')).tobytes()
+
+
+def decode_stream(chunks, table):
+    '''
+    Given an iterable of chunks of an encoded message (bytes, of any
+    lengths) yields the chunks of the decoded letters (lower case bytes).
+    '''
+    wide = _wide_table(table)
+    carry = b''
+    for chunk in chunks:
+        data = carry + chunk
+        carry = data[len(data) - len(data) % 2:]    # A 2-gram split between chunks
+        letters = decode_array(letters_to_indices(data[:len(data) - len(carry)]), table, wide)
+        if letters is None:
+            return
+        yield (letters + ord('a')).tobytes()
+    if carry:
+        print('The encoded message has odd length.')
@@ -0,0 +1,105 @@
+"""
+Module name: codec
+Module contains: linear time conversion between messages and the
+                 integers that the RSA functions work with
+Function names: encode_bytes, decode_bytes,
+                convert_to_integer, convert_to_text,
+                encode_stream, encode_file, decode_stream
+
+The framing is the same as that of convert_to_integer in the lecture
+modules: a leading 1 bit followed by 8 bits for each character. So a
+number produced by the lecture version decodes here and vice versa.
+Instead of building a binary string one character at a time we let
+int.from_bytes and int.to_bytes do all of the work in C.
+"""
+
+DEFAULT_BLOCK_SIZE = 4096       # Number of message bytes per streamed block
+
+
+def encode_bytes(data):
+    '''
+    Given input data (bytes, bytearray or memoryview) returns the
+    integer whose binary representation is a leading 1 followed by
+    the 8 bits of each byte of data.
+    '''
+    buffer = bytearray(len(data) + 1)
+    buffer[0] = 1                       # This is the leading 1
+    buffer[1:] = data
+    return int.from_bytes(buffer, 'big')
+
+
+def decode_bytes(number):
+    '''
+    Given input number produced by encode_bytes (or by the lecture
+    convert_to_integer) returns the bytes that it encodes. If number
+    does not carry the leading 1 framing an error message is printed.
+    '''
+    length = (number.bit_length() + 7) // 8
+    raw = number.to_bytes(length, 'big')
+    if length == 0 or raw[0] != 1:
+        print('The number does not start with the leading 1 byte.')
+        return None
+    return raw[1:]
+
+
+def convert_to_integer(text):
+    '''
+    Returns an integer that encodes the input string text. This is the
+    same integer as the one returned by the lecture convert_to_integer,
+    i.e. every character of text must have order below 256.
+    '''
+    try:
+        data = text.encode('latin-1')   # One byte per character, byte = ord(char)
+    except UnicodeEncodeError:
+        print('Every character must have order below 256, use encode_bytes instead.')
+        return None
+    return encode_bytes(data)
+
+
+def convert_to_text(number):
+    '''
+    Returns the string that is the decoding of the input integer number,
+    i.e. the inverse of convert_to_integer.
+    '''
+    data = decode_bytes(number)
+    if data is None:
+        return None
+    return data.decode('latin-1')       # Each byte b becomes the character chr(b)
+
+
+def encode_stream(stream, block_size=DEFAULT_BLOCK_SIZE):
+    '''
+    Given a binary file object stream, yields one framed integer for
+    each block of (at most) block_size bytes read from it. Only one
+    block is held in memory at a time.
+    '''
+    buffer = bytearray(block_size + 1)
+    buffer[0] = 1                       # Leading 1 shared by every block
+    view = memoryview(buffer)
+    while True:
+        num_read = stream.readinto(view[1:])
+        if not num_read:
+            return
+        yield int.from_bytes(view[:num_read + 1], 'big')
+
+
+def encode_file(file_name, block_size=DEFAULT_BLOCK_SIZE):
+    '''
+    Given input file_name yields the framed integers that encode the
+    bytes of that file, block_size bytes at a time.
+    '''
+    with open(file_name, 'rb') as f:
+        yield from encode_stream(f, block_size)
+
+
+def decode_stream(numbers):
+    '''
+    Given an iterable of framed integers (e.g. from encode_file) yields
+    the blocks of bytes that they encode. Joining the blocks gives back
+    the original file contents.
+    '''
+    for number in numbers:
+        data = decode_bytes(number)
+        if data is None:
+            return
+        yield data
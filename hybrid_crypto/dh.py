@@ -0,0 +1,137 @@
+"""
+Module name: dh
+Module contains: Diffie-Hellman key exchange over a fixed group (p, g)
+Class names: DHGroup
+
+In the Diffie-Hellman notebook every public value is pow(g, a, p) from
+scratch, although g and p never change. DHGroup precomputes the table
+
+    table[i][j] = g**(j * 2**(w*i)) (mod p)    for 0 <= j < 2**w
+
+(fixed-base windowing with w = window_bits). Writing the secret exponent
+a in base 2**w as a = sum of d_i * 2**(w*i), g**a is the product of the
+table[i][d_i]: one multiplication per w bits of a and no squarings at
+all. A larger w means fewer multiplications but a table of
+(exponent_bits / w) * 2**w numbers. With the gmpy2 backend the table
+holds gmpy2.mpz numbers, so the multiplications are done by GMP, and the
+other exponentiations are backend.powmod.
+
+encrypt and decrypt give the DH+AES hybrid of section 7: the sender uses
+a fresh exponent a with the recipient's public value B, the AES key is
+derived from the shared secret B**a, and the message is encrypted with
+AES-CTR. The recipient gets A = g**a with the ciphertext.
+"""
+
+import os
+from random import SystemRandom
+
+from hybrid_crypto import backend
+
+_random = SystemRandom()
+
+
+class DHGroup:
+    '''
+    A Diffie-Hellman group: the prime p, the generator g and the table
+    of powers of g used to compute public values quickly.
+    '''
+    __slots__ = ('p', 'g', 'exponent_bits', 'window_bits', 'table')
+
+    def __init__(self, p, g, exponent_bits=None, window_bits=4):
+        if exponent_bits is None:
+            exponent_bits = p.bit_length()
+        self.p = p
+        self.g = g
+        self.exponent_bits = exponent_bits
+        self.window_bits = window_bits
+        self.table = []
+        base = backend.mpz(g) % p                   # g**(2**(w*i)) for the current i
+        for i in range(0, exponent_bits, window_bits):
+            row = [1] * (1 << window_bits)
+            for j in range(1, 1 << window_bits):
+                row[j] = row[j - 1] * base % p
+            self.table.append(row)
+            base = row[-1] * base % p               # g**(2**(w*(i+1)))
+
+    @classmethod
+    def from_cache(cls, bit_length, window_bits=4, workers=1):
+        '''
+        Returns the DHGroup of a safe prime group of bit_length bits from
+        safe_primes.safe_prime_group (made and cached if necessary).
+        '''
+        from hybrid_crypto.safe_primes import safe_prime_group
+        (p, g) = safe_prime_group(bit_length, workers)
+        return cls(p, g, window_bits=window_bits)
+
+    def table_size(self):
+        '''
+        Returns the number of precomputed values in the table.
+        '''
+        return len(self.table) * len(self.table[0])
+
+    def power(self, a):
+        '''
+        Returns g**a (mod p) for 0 <= a, using the table when a has at
+        most exponent_bits bits.
+        '''
+        if a.bit_length() > self.exponent_bits:
+            return backend.powmod(self.g, a, self.p)
+        p = self.p
+        w = self.window_bits
+        mask = (1 << w) - 1
+        result = 1
+        for row in self.table:
+            digit = a & mask
+            if digit:
+                result = result * row[digit] % p
+            a >>= w
+            if not a:
+                break
+        return int(result)
+
+    def generate_keypair(self):
+        '''
+        Returns (a, A): a random secret exponent a and the public value
+        A = g**a (mod p).
+        '''
+        a = _random.randrange(2, min(self.p - 1, 1 << self.exponent_bits))
+        return (a, self.power(a))
+
+    def shared_secret(self, a, B):
+        '''
+        Given our secret a and the other party's public value B returns
+        the shared secret B**a (mod p).
+        '''
+        if not 1 < B < self.p - 1:
+            print('The public value B is not in the range 2 ... p-2.')
+            return None
+        return backend.powmod(B, a, self.p)
+
+    def encrypt(self, B, data):
+        '''
+        Given the recipient's public value B returns (A, iv, ciphertext):
+        our public value A for a fresh secret exponent, the AES-CTR
+        counter block and the encryption of the bytes data.
+        '''
+        from hybrid_crypto.aes import AES, derive_key
+        (a, A) = self.generate_keypair()
+        secret = self.shared_secret(a, B)
+        if secret is None:
+            return None
+        iv = os.urandom(16)
+        return (A, iv, AES(derive_key(secret)).ctr(data, iv))
+
+    def decrypt(self, b, A, iv, ciphertext):
+        '''
+        Given our secret exponent b and the (A, iv, ciphertext) returned
+        by encrypt returns the decrypted bytes.
+        '''
+        from hybrid_crypto.aes import AES, derive_key
+        secret = self.shared_secret(b, A)
+        if secret is None:
+            return None
+        return AES(derive_key(secret)).ctr(ciphertext, iv)
+
+    def __repr__(self):
+        return 'DHGroup(p={} bits, g={}, window_bits={})'.format(
+            self.p.bit_length(), self.g, self.window_bits)
@@ -0,0 +1,244 @@
+"""
+Module name: exponent_audit
+Module contains: scanners for RSA keys with a small private exponent
+                 (Wiener's attack) and for messages sent with a small
+                 public exponent (Hastad's broadcast attack)
+Function names: continued_fraction, convergents, wiener, wiener_audit,
+                crt, iroot, hastad, broadcast_audit, read_keys
+
+rsa_public_key(p, q, e) accepts any e, and the private exponent is just
+d = e^(-1) mod (p-1)(q-1). Two ways this goes wrong:
+
+Wiener: e*d = 1 + k*phi(N) and phi(N) is close to N, so e/N is very
+close to k/d. If d < N**(1/4) / 3 then k/d is one of the convergents of
+the continued fraction of e/N, and phi(N) = (e*d - 1) / k gives p and q
+as the roots of x**2 - (N - phi(N) + 1) x + N. A small d forces a large
+e (e > 3 N**(3/4) or so), so wiener_audit passes over every key with a
+smaller e, such as 65537, with a single comparison; only the few
+remaining keys get the continued fraction expansion.
+
+Hastad: the same message m sent with e = 3 to three keys gives
+c_i = m**3 mod N_i. Since m < N_i, m**3 < N_1 N_2 N_3, so combining the
+c_i by the Chinese Remainder Theorem gives m**3 itself and an integer
+cube root gives m. broadcast_audit groups the ciphertexts of a store
+by message tag and e, combines each group and reports every group whose
+combination is an exact e-th power that encrypts to the ciphertexts, so
+also a single ciphertext with m**e < N (no padding).
+
+NumPy cannot hold numbers of this size, so instead of vectorizing the
+work the cheap screening runs over the whole store and the remaining
+keys are handed in chunks of CHUNK_SIZE to the workers of a
+concurrent.futures executor, if one is given.
+
+Run from the repository root with:
+    python -m hybrid_crypto.exponent_audit keys.txt [--ciphertexts c.txt]
+where keys.txt holds one key "N e" per line (e = 65537 if missing) and
+c.txt one ciphertext "tag N e c" per line (numbers decimal or 0x hex).
+"""
+
+from collections import defaultdict
+from math import isqrt
+
+from hybrid_crypto import backend
+
+CHUNK_SIZE = 256                # Keys per task given to an executor
+MAX_BROADCAST_E = 17            # Larger e need too many recipients to matter
+
+
+def continued_fraction(numerator, denominator):
+    '''
+    Yields the partial quotients a_0, a_1, ... of the continued fraction
+    of numerator / denominator.
+    '''
+    while denominator:
+        a, r = divmod(numerator, denominator)
+        yield a
+        numerator, denominator = denominator, r
+
+
+def convergents(quotients):
+    '''
+    Yields the convergents (h, k), h/k = [a_0; a_1, ..., a_i], of the
+    continued fraction with the given partial quotients.
+    '''
+    (h0, h1) = (0, 1)
+    (k0, k1) = (1, 0)
+    for a in quotients:
+        (h0, h1) = (h1, a * h1 + h0)
+        (k0, k1) = (k1, a * k1 + k0)
+        yield (h1, k1)
+
+
+def _may_be_wiener(N, e):
+    '''
+    Returns False when e is too small for a private exponent below
+    N**(1/4) / 3, i.e. when e < N**(3/4) (Wiener cannot apply).
+    '''
+    return 4 * e.bit_length() >= 3 * N.bit_length()
+
+
+def wiener(N, e):
+    '''
+    Returns (p, q, d) if the key (N, e) has a private exponent d small
+    enough for Wiener's attack, None otherwise.
+    '''
+    for (k, d) in convergents(continued_fraction(e, N)):
+        if k == 0 or (e * d - 1) % k:
+            continue
+        phi = (e * d - 1) // k
+        s = N - phi + 1                 # p + q if phi is phi(N)
+        discriminant = s * s - 4 * N    # (p - q)**2
+        if discriminant < 0:
+            continue
+        r = isqrt(discriminant)
+        if r * r == discriminant and (s + r) % 2 == 0:
+            (p, q) = ((s + r) // 2, (s - r) // 2)
+            if p * q == N and q > 1:
+                return (p, q, d)
+    return None
+
+
+def _wiener_chunk(keys):
+    '''
+    Returns the list of wiener(N, e) for the pairs (N, e) in keys.
+    '''
+    return [wiener(N, e) for (N, e) in keys]
+
+
+def wiener_audit(keys, executor=None):
+    '''
+    Given an iterable of public keys (N, e) returns the list of findings
+    (index, N, e, p, q, d), one for each key broken by Wiener's attack.
+    '''
+    candidates = [(index, N, e) for index, (N, e) in enumerate(keys) if _may_be_wiener(N, e)]
+    chunks = [[(N, e) for (index, N, e) in candidates[i:i + CHUNK_SIZE]]
+              for i in range(0, len(candidates), CHUNK_SIZE)]
+    if executor is None:
+        results = map(_wiener_chunk, chunks)
+    else:
+        results = executor.map(_wiener_chunk, chunks)
+    findings = []
+    for (index, N, e), found in zip(candidates, (r for chunk in results for r in chunk)):
+        if found is not None:
+            findings.append((index, N, e) + found)
+    return findings
+
+
+def crt(residues, moduli):
+    '''
+    Returns (x, M) with x = residues[i] (mod moduli[i]) for every i and
+    0 <= x < M = the product of the moduli, which must be pairwise
+    coprime (ValueError otherwise).
+    '''
+    (x, M) = (0, 1)
+    for c, N in zip(residues, moduli):
+        t = (c - x) * backend.invert(M % N, N) % N    # Garner: x + M*t = c (mod N)
+        x += M * t
+        M *= N
+    return (x, M)
+
+
+def iroot(x, k):
+    '''
+    Returns the integer part of the k-th root of the non-negative
+    integer x (Newton's method from above).
+    '''
+    if x < 2:
+        return x
+    r = 1 << -(-x.bit_length() // k)    # 2**ceil(bits/k) is at least the root
+    while True:
+        s = ((k - 1) * r + x // r ** (k - 1)) // k
+        if s >= r:
+            return r
+        r = s
+
+
+def hastad(ciphertexts, e):
+    '''
+    Given a list of pairs (N, c) of ciphertexts c of the same message m
+    under the keys (N, e), returns m if the Chinese Remainder Theorem
+    and an integer e-th root recover it, None otherwise.
+    '''
+    moduli = [N for (N, c) in ciphertexts]
+    try:
+        (x, M) = crt([c for (N, c) in ciphertexts], moduli)
+    except ValueError:                  # Two moduli share a factor (see key_audit)
+        return None
+    m = iroot(x, e)
+    if m ** e != x or m >= min(moduli):
+        return None
+    return m
+
+
+def broadcast_audit(records, max_e=MAX_BROADCAST_E):
+    '''
+    Given an iterable of ciphertexts (tag, N, e, c), where equal tags
+    mean the same message, returns the list of findings
+    (tag, e, m, number of keys), one for each message m recovered by
+    Hastad's broadcast attack (from a single key when m**e < N). Only
+    exponents e <= max_e are considered.
+    '''
+    groups = defaultdict(dict)          # (tag, e): {N: c}
+    for (tag, N, e, c) in records:
+        if e <= max_e:
+            groups[(tag, e)][N] = c
+    findings = []
+    for (tag, e), ciphertexts in groups.items():
+        m = hastad(list(ciphertexts.items()), e)
+        if m is not None:
+            findings.append((tag, e, m, len(ciphertexts)))
+    return findings
+
+
+def read_keys(file_name):
+    '''
+    Yields the tuples of numbers stored in the text file file_name, one
+    per line. Blank lines and lines starting with # are skipped.
+    '''
+    with open(file_name, 'r') as f:
+        for line in f:
+            fields = line.split()
+            if not fields or fields[0].startswith('#'):
+                continue
+            yield tuple(int(field, 0) for field in fields)
+
+
+def main(argv):
+    import argparse
+    from time import perf_counter
+
+    parser = argparse.ArgumentParser(
+        description='Report RSA keys with a small private exponent and messages sent with a small e.')
+    parser.add_argument('file_name', help='text file with one key "N e" per line')
+    parser.add_argument('--ciphertexts', help='text file with one ciphertext "tag N e c" per line')
+    parser.add_argument('--max-e', type=int, default=MAX_BROADCAST_E)
+    parser.add_argument('--workers', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    start = perf_counter()
+    keys = [key if len(key) > 1 else (key[0], 65537) for key in read_keys(args.file_name)]
+    if args.workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(args.workers) as executor:
+            findings = wiener_audit(keys, executor)
+    else:
+        findings = wiener_audit(keys)
+    for (index, N, e, p, q, d) in findings:
+        print("key {} ({} bits): private exponent d = {} ({} bits) (Wiener)".format(
+            index, N.bit_length(), d, d.bit_length()))
+    print("{} of {} keys broken by Wiener's attack ({:.2f} s)".format(
+        len(findings), len(keys), perf_counter() - start))
+
+    if args.ciphertexts:
+        start = perf_counter()
+        records = list(read_keys(args.ciphertexts))
+        broadcasts = broadcast_audit(records, args.max_e)
+        for (tag, e, m, count) in broadcasts:
+            print("message {} (e = {}, {} keys): recovered m = {}".format(tag, e, count, m))
+        print("{} messages recovered from {} ciphertexts ({:.2f} s)".format(
+            len(broadcasts), len(records), perf_counter() - start))
+
+
+if __name__ == '__main__':
+    import sys
+    main(sys.argv[1:])
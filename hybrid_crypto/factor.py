@@ -0,0 +1,125 @@
+"""
+Module name: factor
+Module contains: prime factorization of integers well beyond 10**14
+Function names: wheel_division, brent_rho, factorize, decompose,
+                smallest_factor
+
+factorize(n) works in three layers:
+  1. trial division by 2, 3, 5 and then by the numbers coprime to 30
+     (the 2*3*5 wheel) up to WHEEL_BOUND, continuing from where it got
+     to rather than restarting from 2 after each factor;
+  2. the primality test of hybrid_crypto.primality to stop on primes;
+  3. Brent's variant of Pollard's rho method (see pollard_rho.pdf) for
+     whatever composite part is left, taking the gcd of a product of
+     BATCH differences at a time instead of one gcd per step.
+The result is the same dictionary {prime: exponent} as decompose in the
+lecture modules, with the primes in increasing order.
+"""
+
+from math import gcd, isqrt
+from random import Random
+
+from hybrid_crypto.primality import is_prime
+
+WHEEL_BOUND = 10000             # Trial divide by the wheel up to this bound
+BATCH = 128                     # Number of rho steps per gcd
+
+_WHEEL_STEPS = (4, 2, 4, 2, 4, 6, 2, 6)     # Gaps between 7, 11, 13, 17, 19, 23, 29, 31, 37
+_random = Random()
+
+
+def wheel_division(n, factors, bound=WHEEL_BOUND):
+    '''
+    Divides out of n every prime factor below bound, recording them in
+    the dictionary factors. Returns the part of n that is left over.
+    '''
+    for p in (2, 3, 5):
+        while n % p == 0:
+            factors[p] = factors.get(p, 0) + 1
+            n //= p
+    p = 7
+    i = 0
+    while p < bound and p * p <= n:
+        if n % p == 0:
+            n //= p
+            e = 1
+            while n % p == 0:
+                n //= p
+                e += 1
+            factors[p] = factors.get(p, 0) + e
+        p += _WHEEL_STEPS[i]
+        i = (i + 1) & 7
+    if 1 < n and (n < bound * bound or n < p * p):   # What is left has no factor below sqrt(n)
+        factors[n] = factors.get(n, 0) + 1
+        n = 1
+    return n
+
+
+def brent_rho(n):
+    '''
+    Returns a non-trivial factor of the odd composite number n using
+    Brent's variant of Pollard's rho method with batched gcds.
+    '''
+    if n % 2 == 0:
+        return 2
+    while True:
+        y = _random.randrange(1, n)
+        c = _random.randrange(1, n)
+        g = r = q = 1
+        while g == 1:
+            x = y                               # Brent: compare with the value at the last power of 2
+            for i in range(r):
+                y = (y * y + c) % n
+            k = 0
+            while k < r and g == 1:
+                ys = y                          # Remember where this batch started
+                for i in range(min(BATCH, r - k)):
+                    y = (y * y + c) % n
+                    q = q * abs(x - y) % n
+                g = gcd(q, n)
+                k += BATCH
+            r *= 2
+        if g == n:                              # The batch overshot, redo it one step at a time
+            g = 1
+            while g == 1:
+                ys = (ys * ys + c) % n
+                g = gcd(abs(x - ys), n)
+        if g != n:
+            return g                            # Otherwise try again with a new c
+
+
+def factorize(n):
+    '''
+    Generates a dictionary {prime: exponent} representing the prime
+    decomposition of the positive integer n.
+    '''
+    factors = {}
+    if n < 2:
+        return factors
+    n = wheel_division(n, factors)
+    stack = [n] if n > 1 else []
+    while stack:
+        m = stack.pop()
+        if is_prime(m):
+            factors[m] = factors.get(m, 0) + 1
+            continue
+        root = isqrt(m)
+        if root * root == m:                    # Rho finds squares slowly
+            stack += [root, root]
+            continue
+        d = brent_rho(m)
+        stack += [d, m // d]
+    return dict(sorted(factors.items()))
+
+
+decompose = factorize                           # The name used by the lecture modules
+
+
+def smallest_factor(n):
+    '''
+    Returns the smallest factor of a positive integer n (n itself if
+    n is 1 or prime).
+    '''
+    if n < 2:
+        return n
+    return min(factorize(n))
@@ -0,0 +1,434 @@
+"""
+Module name: hybrid
+Module contains: the hybrid system of the project as one object: RSA for
+                 the Vigenere key and Vigenere (optionally on top of the
+                 random 2-gram encoding) for the message, or RSA+AES
+                 (section 7), with a file format
+Class names: HybridCipher
+Function names: derive_session
+
+Instead of wiring rsa_private_key, convert_to_integer, rsa_encrypt and
+the Vigenere functions together by hand, HybridCipher does the following
+for each message:
+  1. a fresh random Vigenere key (and 2-gram encoding) is drawn;
+  2. the key is RSA encrypted as a single block. A Vigenere key that
+     fits in a block (plaintext_block_size(N) bytes, see rsa_blocks) is
+     encrypted itself. With the 2-gram layer, or a longer key, a random
+     32 byte seed is encrypted instead, together with the key length
+     and the 2-gram size. Both sides derive the key and the encoding
+     from it: SHA-256 of the seed and a counter gives the random bits,
+     each key letter is drawn from them by rejection sampling, the 650
+     2-grams are put in order by a Fisher-Yates shuffle and shared out
+     by SEED_FREQUENCIES. These steps and the table are written out
+     here (not taken from random or bigram), as they are part of the
+     file format of VERSION. This is 36 bytes, one block for N of 290
+     bits or more;
+  3. the header and the encrypted key are written, followed by the body:
+     the letters of the message streamed through the extractor, the
+     2-gram encoding and the Vigenere cipher chunk_size bytes at a time.
+
+File format (integers big endian):
+
+    MAGIC (4 bytes) | VERSION (1) | flags (1) | number of key blocks (2)
+    | key blocks (ciphertext_block_size(N) bytes each) | body
+
+with flags bit 0 set when the 2-gram layer is used, bit 1 set for AES
+and bit 2 set when the key blocks hold a seed. (Files whose key blocks
+hold the Vigenere key followed by the 676 letter encoding key, without
+bit 2, are still read.) With symmetric='aes' the session key is a random 16 byte AES key
+and 16 byte initial counter block, and the body is the AES-CTR encryption
+of the message bytes (any characters at all). The body has no
+framing of its own: it runs to the end of the file. Decrypting a file
+without the 2-gram layer works on a memory map of the body. rewrap gives
+a file to another recipient by encrypting the key again; the body does
+not change, so it is copied with os.sendfile (kernel to kernel) where
+that is available.
+"""
+
+import os
+import shutil
+import struct
+from glob import glob
+from hashlib import sha256
+from random import SystemRandom
+
+import numpy as np
+
+from hybrid_crypto.aes import AES
+from hybrid_crypto.alphabetic import extract_stream
+from hybrid_crypto.bigram import encoding_to_key, key_to_encoding
+from hybrid_crypto.bigram import encode_stream, decode_stream, UNUSED
+from hybrid_crypto.rsa_blocks import plaintext_block_size, ciphertext_block_size
+from hybrid_crypto.rsa_blocks import encrypt_message, decrypt_message
+from hybrid_crypto.rsa_keys import RSAPrivateKey
+from hybrid_crypto.vigenere import vigenere_stream, vigenere_file
+
+MAGIC = b'HCV\x00'
+VERSION = 1
+BIGRAM_FLAG = 1
+AES_FLAG = 2
+SEED_FLAG = 4
+AES_KEY_BYTES = 16              # AES-128 key, followed by the 16 byte counter block
+KEY_LENGTH = 200                # Default length of the Vigenere key
+CHUNK_SIZE = 1 << 20            # Bytes of the message per chunk
+ENCODING_KEY_LENGTH = 676       # Length of bigram.encoding_to_key
+SEED_BYTES = 32                 # Seed of a derived Vigenere key and encoding
+LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+
+# English letter frequencies per 10000, as used by derive_session. Part of
+# the file format: changing them needs a new VERSION
+SEED_FREQUENCIES = (
+    817, 149, 278, 425, 1270, 223, 202, 609, 697, 15, 77, 403, 241,
+    675, 751, 193, 10, 599, 633, 906, 276, 98, 236, 15, 197, 7)
+
+_HEADER = struct.Struct('>4sBBH')
+_SEED = struct.Struct('>{}sHH'.format(SEED_BYTES))     # seed, key length, 2-gram size
+_random = SystemRandom()
+
+
+class _SeedStream:
+    '''
+    The random bits of SHA-256(seed, counter) for counter = 0, 1, ...,
+    so that the same seed gives the same choices everywhere.
+    '''
+    __slots__ = ('_key', '_counter', '_pool', '_bits')
+
+    def __init__(self, seed):
+        self._key = seed
+        self._counter = 0
+        self._pool = 0
+        self._bits = 0
+
+    def getrandbits(self, k):
+        '''
+        Returns the next k bits as an integer.
+        '''
+        while self._bits < k:
+            block = sha256(self._key + self._counter.to_bytes(8, 'big')).digest()
+            self._pool |= int.from_bytes(block, 'big') << self._bits
+            self._bits += 256
+            self._counter += 1
+        result = self._pool & ((1 << k) - 1)
+        self._pool >>= k
+        self._bits -= k
+        return result
+
+    def below(self, n):
+        '''
+        Returns a uniform random integer 0 <= r < n (rejection sampling).
+        '''
+        k = n.bit_length()
+        while True:
+            r = self.getrandbits(k)
+            if r < n:
+                return r
+
+
+def derive_session(seed, key_length, bigram_size):
+    '''
+    Returns the (vigenere_key, encoding) derived from the bytes seed: a
+    key of key_length letters and, if bigram_size is not 0, a 2-gram
+    encoding of that size (else None), laid out as by
+    bigram.make_encoding.
+    '''
+    bits = _SeedStream(seed)
+    key = ''.join(LETTERS[bits.below(26)] for i in range(key_length))
+    if not bigram_size:
+        return (key, None)
+    codes = [26 * i + j for i in range(26) for j in range(26) if i != j]
+    for i in range(len(codes) - 1, 0, -1):                  # Fisher-Yates
+        j = bits.below(i + 1)
+        (codes[i], codes[j]) = (codes[j], codes[i])
+    # One 2-gram for every letter, the rest shared out in proportion to
+    # the frequencies and the largest remainders (then the first letters)
+    # getting the last few, in integers so that no rounding can differ
+    total = sum(SEED_FREQUENCIES)
+    shares = [divmod(f * (bigram_size - 26), total) for f in SEED_FREQUENCIES]
+    counts = [1 + q for (q, r) in shares]
+    extra = bigram_size - sum(counts)
+    for i in sorted(range(26), key=lambda i: -shares[i][1])[:extra]:
+        counts[i] += 1
+    table = np.full(676, UNUSED, dtype=np.uint8)
+    table[codes[:bigram_size]] = np.repeat(np.arange(26, dtype=np.uint8), counts)
+    return (key, table)
+
+
+class HybridCipher:
+    '''
+    The public key (N, e) of the recipient (and the private key, if we
+    are the recipient) together with the settings of the symmetric layer:
+    symmetric is 'vigenere' or 'aes'.
+    '''
+    __slots__ = ('N', 'e', 'private_key', 'key_length', 'bigram_size', 'chunk_size',
+                 'symmetric')
+
+    def __init__(self, N, e=65537, private_key=None, key_length=None, bigram_size=0,
+                 chunk_size=CHUNK_SIZE, symmetric='vigenere'):
+        if symmetric not in ('vigenere', 'aes'):
+            raise ValueError("symmetric must be 'vigenere' or 'aes'.")
+        if key_length is None and bigram_size:
+            key_length = KEY_LENGTH     # Derived from a seed, so of any length
+        elif key_length is None:
+            # As long as possible while the key itself is a single RSA block
+            key_length = max(1, min(KEY_LENGTH, plaintext_block_size(N)))
+        self.N = N
+        self.e = e
+        self.private_key = private_key
+        self.key_length = key_length
+        self.bigram_size = bigram_size
+        self.chunk_size = chunk_size
+        self.symmetric = symmetric
+
+    @classmethod
+    def from_primes(cls, p, q, e=65537, **settings):
+        '''
+        Returns the HybridCipher of the recipient with private key (p,q).
+        '''
+        key = RSAPrivateKey(p, q, e)
+        return cls(key.N, e, key, **settings)
+
+    @classmethod
+    def generate(cls, bit_length=512, e=65537, **settings):
+        '''
+        Returns the HybridCipher of a new recipient whose primes p, q have
+        bit_length bits.
+        '''
+        from hybrid_crypto.primes import rsa_private_key
+        while True:
+            (p, q) = rsa_private_key(bit_length)
+            try:
+                return cls.from_primes(p, q, e, **settings)
+            except ValueError:          # e not coprime to (p-1)(q-1): try again
+                continue
+
+    def public(self):
+        '''
+        Returns the HybridCipher holding only the public key, as given to
+        a sender.
+        '''
+        return HybridCipher(self.N, self.e, None, self.key_length, self.bigram_size,
+                            self.chunk_size, self.symmetric)
+
+    def session_key(self):
+        '''
+        Returns a new random session key (vigenere_key, encoding, seed):
+        encoding is the 2-gram decoding table or None if the 2-gram layer
+        is not used, and seed the bytes the two were derived from, or None
+        if the key is short enough to be encrypted itself. For AES the key
+        is the bytes of the AES key and counter block.
+        '''
+        if self.symmetric == 'aes':
+            return (os.urandom(2 * AES_KEY_BYTES), None, None)
+        if self.bigram_size or self.key_length > plaintext_block_size(self.N):
+            seed = os.urandom(SEED_BYTES)
+            return derive_session(seed, self.key_length, self.bigram_size) + (seed,)
+        key = ''.join(_random.choice(LETTERS) for i in range(self.key_length))
+        return (key, None, None)
+
+    def wrap_key(self, key, encoding=None, seed=None):
+        '''
+        Returns the header and encrypted key blocks (bytes) for the
+        session key (key, encoding, seed) from session_key.
+        '''
+        if isinstance(key, bytes):
+            (data, flags) = (key, AES_FLAG)
+        elif seed is not None:
+            data = _SEED.pack(seed, len(key), 0 if encoding is None else _bigram_size(encoding))
+            flags = SEED_FLAG | (0 if encoding is None else BIGRAM_FLAG)
+        elif encoding is None:
+            (data, flags) = (key.encode('ascii'), 0)
+        else:
+            (data, flags) = ((key + encoding_to_key(encoding)).encode('ascii'), BIGRAM_FLAG)
+        blocks = encrypt_message(data, self.N, self.e)
+        width = ciphertext_block_size(self.N)
+        return _HEADER.pack(MAGIC, VERSION, flags, len(blocks)) + b''.join(
+            c.to_bytes(width, 'big') for c in blocks)
+
+    def unwrap_key(self, stream):
+        '''
+        Reads the header and the key blocks from the binary file object
+        stream and returns the session key (vigenere_key, encoding, seed),
+        or None with a message if the header is not valid.
+        '''
+        if self.private_key is None:
+            print('Decryption needs the private key.')
+            return None
+        header = stream.read(_HEADER.size)
+        if len(header) != _HEADER.size:
+            print('The file is too short for a header.')
+            return None
+        (magic, version, flags, count) = _HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            print('The file is not in the HybridCipher format.')
+            return None
+        width = ciphertext_block_size(self.N)
+        data = stream.read(count * width)
+        if len(data) != count * width:
+            print('The file ends inside the key blocks.')
+            return None
+        blocks = [int.from_bytes(data[i:i + width], 'big') for i in range(0, len(data), width)]
+        key = self.private_key
+        data = decrypt_message(blocks, key.p, key.q, key.N, key.e)
+        if flags & AES_FLAG:
+            if len(data) != 2 * AES_KEY_BYTES:
+                print('The key blocks do not decrypt to a key with this private key.')
+                return None
+            return (data, None, None)
+        if flags & SEED_FLAG:
+            if len(data) != _SEED.size:
+                print('The key blocks do not decrypt to a key with this private key.')
+                return None
+            (seed, key_length, bigram_size) = _SEED.unpack(data)
+            if key_length == 0 or bigram_size not in (0,) + tuple(range(26, 651)):
+                print('The key blocks do not decrypt to a key with this private key.')
+                return None
+            return derive_session(seed, key_length, bigram_size) + (seed,)
+        if not data.translate(None, b'-').isalpha() or not data.isascii():
+            print('The key blocks do not decrypt to a key with this private key.')
+            return None
+        text = data.decode('ascii')
+        if flags & BIGRAM_FLAG:
+            return (text[:-ENCODING_KEY_LENGTH], key_to_encoding(text[-ENCODING_KEY_LENGTH:]),
+                    None)
+        return (text, None, None)
+
+    def encrypt_stream(self, source, target):
+        '''
+        Encrypts the message read from the binary file object source (its
+        letters, for Vigenere) and writes the header and body to the binary
+        file object target. Returns the number of bytes in the body.
+        '''
+        (key, encoding, seed) = self.session_key()
+        target.write(self.wrap_key(key, encoding, seed))
+        if self.symmetric == 'aes':
+            chunks = iter(lambda: source.read(self.chunk_size), b'')
+            chunks = AES(key[:AES_KEY_BYTES]).ctr_stream(chunks, key[AES_KEY_BYTES:])
+        else:
+            chunks = extract_stream(source, self.chunk_size)
+            if encoding is not None:
+                chunks = encode_stream(chunks, encoding)
+            chunks = vigenere_stream(chunks, key)
+        size = 0
+        for chunk in chunks:
+            target.write(chunk)
+            size += len(chunk)
+        return size
+
+    def _decrypt_body(self, session, source, target):
+        '''
+        Decrypts the rest of the binary file object source with the
+        session key and writes the result to target. Returns its length.
+        '''
+        (key, encoding, seed) = session
+        chunks = iter(lambda: source.read(self.chunk_size), b'')
+        if isinstance(key, bytes):
+            chunks = AES(key[:AES_KEY_BYTES]).ctr_stream(chunks, key[AES_KEY_BYTES:])
+        else:
+            chunks = vigenere_stream(chunks, key, decrypt=True)
+            if encoding is not None:
+                chunks = decode_stream(chunks, encoding)
+        size = 0
+        for chunk in chunks:
+            target.write(chunk)
+            size += len(chunk)
+        return size
+
+    def decrypt_stream(self, source, target):
+        '''
+        Decrypts what encrypt_stream wrote, reading it from the binary
+        file object source, and writes the message to target. Returns its
+        length.
+        '''
+        session = self.unwrap_key(source)
+        if session is None:
+            return None
+        return self._decrypt_body(session, source, target)
+
+    def encrypt_file(self, in_name, out_name):
+        '''
+        Encrypts the file in_name (its letters, for Vigenere) into the
+        file out_name. Returns the number of bytes in the body.
+        '''
+        with open(in_name, 'rb') as source, open(out_name, 'wb') as target:
+            return self.encrypt_stream(source, target)
+
+    def decrypt_file(self, in_name, out_name):
+        '''
+        Decrypts the file in_name written by encrypt_file into the file
+        out_name. Returns the length of the message.
+        '''
+        with open(in_name, 'rb') as source:
+            session = self.unwrap_key(source)
+            if session is None:
+                return None
+            (key, encoding, seed) = session
+            if encoding is not None or isinstance(key, bytes):
+                with open(out_name, 'wb') as target:
+                    return self._decrypt_body(session, source, target)
+            offset = source.tell()
+        # Plain Vigenere: the body is deciphered in place through memory
+        # maps of both files
+        return vigenere_file(in_name, out_name, key, decrypt=True, chunk_size=self.chunk_size,
+                             in_offset=offset)
+
+    def encrypt_directory(self, directory, out_directory, pattern='message_*.txt',
+                          suffix='.hc'):
+        '''
+        Encrypts each file in directory matching pattern into a file of
+        the same name with suffix added in out_directory. Each file gets
+        its own key (a single RSA encryption, see the module docstring). Returns the list of the
+        names of the files written.
+        '''
+        os.makedirs(out_directory, exist_ok=True)
+        out_names = []
+        for in_name in sorted(glob(os.path.join(directory, pattern))):
+            out_name = os.path.join(out_directory, os.path.basename(in_name) + suffix)
+            self.encrypt_file(in_name, out_name)
+            out_names.append(out_name)
+        return out_names
+
+    def rewrap(self, in_name, out_name, recipient):
+        '''
+        Copies the file in_name written by encrypt_file to out_name, with
+        its key encrypted for the HybridCipher recipient instead of for
+        us. The body is copied unchanged.
+        '''
+        with open(in_name, 'rb') as source:
+            session = self.unwrap_key(source)
+            if session is None:
+                return None
+            offset = source.tell()
+            with open(out_name, 'wb') as target:
+                target.write(recipient.wrap_key(*session))
+                target.flush()
+                _copy_body(source, target, offset, os.path.getsize(in_name) - offset)
+        return out_name
+
+    def __repr__(self):
+        return 'HybridCipher(N={} bits, symmetric={}, key_length={}, bigram_size={}, private={})'.format(
+            self.N.bit_length(), self.symmetric, self.key_length, self.bigram_size,
+            self.private_key is not None)
+
+
+def _bigram_size(encoding):
+    '''
+    Returns the number of 2-grams used by the decoding table encoding.
+    '''
+    return int((encoding != UNUSED).sum())
+
+
+def _copy_body(source, target, offset, count):
+    '''
+    Copies count bytes from offset in the file object source to the end
+    of target, with os.sendfile when possible.
+    '''
+    try:
+        while count > 0:
+            sent = os.sendfile(target.fileno(), source.fileno(), offset, count)
+            if sent == 0:
+                break
+            offset += sent
+            count -= sent
+    except (AttributeError, OSError):
+        source.seek(offset)
+        shutil.copyfileobj(source, target)
@@ -0,0 +1,262 @@
+"""
+Module name: instrument
+Module contains: opt-in counters and timers for the hot paths of prime
+                 and key generation, with a text histogram report
+Class names: Recorder
+Function names: add_listener, remove_listener, instrumented
+
+While at least one listener is registered, probes replace the functions
+below in their modules (callers look them up there at every call):
+
+    backend.powmod          count 'powmod' (by bit size of the modulus)
+    backend.is_strong_prp   count 'miller_rabin' rounds and a 'powmod'
+                            for each (pow(base, d, p), which neither
+                            backend does through backend.powmod; the
+                            at most s-1 squarings after it, 2**s the
+                            power of 2 in p-1, are not counted), time
+                            each round
+    primes.sieve_window     time 'sieve_window'
+    primes.search_window    count 'windows' (random starting points),
+                            'candidates' examined and 'sieved_out' of
+                            them, time 'search_window'
+    primes.random_prime     time 'random_prime'
+    primes.rsa_private_key  time 'rsa_private_key'
+
+When the last listener is removed the original functions are put back,
+so with no listener the code runs exactly as if this module did not
+exist. Every event is passed to every listener as
+
+    listener(kind, name, value, bits)
+
+kind being 'count' (value is a number of events) or 'time' (value is in
+seconds), bits the bit size of the numbers involved. This needs no
+sys.setprofile hook. instrumented() registers a Recorder, which keeps
+totals, per bit size histograms and lists of times, for a with block.
+
+Work done in other processes is not seen: with an executor,
+random_prime submits primes._search_task, which runs the worker's own
+uninstrumented search_window (the probes are closures and cannot be
+pickled), so only the time of random_prime is recorded; KeyPool
+workers are not seen at all. Nor are functions imported by name before
+the probes are installed (from hybrid_crypto.primes import
+random_prime). Calling backend.use() while instrumented drops the
+backend probes.
+"""
+
+import importlib
+import sys
+from collections import defaultdict
+from contextlib import contextmanager
+from math import frexp
+from time import perf_counter
+
+_listeners = []
+_originals = {}                 # (module name, function name): original function
+
+
+def _emit(kind, name, value, bits):
+    for listener in _listeners:
+        listener(kind, name, value, bits)
+
+
+def _probe_powmod(powmod):
+    def probe(base, exponent, modulus):
+        _emit('count', 'powmod', 1, modulus.bit_length())
+        return powmod(base, exponent, modulus)
+    return probe
+
+
+def _probe_is_strong_prp(is_strong_prp):
+    def probe(p, base):
+        start = perf_counter()
+        result = is_strong_prp(p, base)
+        bits = p.bit_length()
+        _emit('count', 'miller_rabin', 1, bits)
+        _emit('count', 'powmod', 1, bits)
+        _emit('time', 'miller_rabin', perf_counter() - start, bits)
+        return result
+    return probe
+
+
+_last_flags = [b'']             # The flags of the window sieved last
+
+
+def _probe_sieve_window(sieve_window):
+    def probe(start, *args):
+        begin = perf_counter()
+        flags = sieve_window(start, *args)
+        _emit('time', 'sieve_window', perf_counter() - begin, start.bit_length())
+        _last_flags[0] = flags
+        return flags
+    return probe
+
+
+def _probe_search_window(search_window):
+    def probe(start, bit_length, num_wit=50, size=None):
+        if size is None:
+            from hybrid_crypto.primes import WINDOW as size
+        begin = perf_counter()
+        p = search_window(start, bit_length, num_wit, size)
+        _emit('time', 'search_window', perf_counter() - begin, bit_length)
+        # The search stops at the first prime: start, start+2, ..., p were
+        # examined. Without one it stops at the first candidate of more
+        # than bit_length bits, if the window reaches that far
+        if p is None:
+            examined = max(0, min(size, ((1 << bit_length) - start + 1) // 2))
+        else:
+            examined = (p - start) // 2 + 1
+        _emit('count', 'windows', 1, bit_length)
+        _emit('count', 'candidates', examined, bit_length)
+        _emit('count', 'sieved_out', examined - _last_flags[0].count(1, 0, examined), bit_length)
+        return p
+    return probe
+
+
+def _probe_timed(name):
+    def make(function):
+        def probe(bit_length, *args, **kwargs):
+            start = perf_counter()
+            result = function(bit_length, *args, **kwargs)
+            _emit('time', name, perf_counter() - start, bit_length)
+            return result
+        return probe
+    return make
+
+
+_PROBES = [
+    ('hybrid_crypto.backend', 'powmod', _probe_powmod),
+    ('hybrid_crypto.backend', 'is_strong_prp', _probe_is_strong_prp),
+    ('hybrid_crypto.primes', 'sieve_window', _probe_sieve_window),
+    ('hybrid_crypto.primes', 'search_window', _probe_search_window),
+    ('hybrid_crypto.primes', 'random_prime', _probe_timed('random_prime')),
+    ('hybrid_crypto.primes', 'rsa_private_key', _probe_timed('rsa_private_key')),
+]
+
+
+def _install():
+    importlib.import_module('hybrid_crypto.backend').current()  # Wrap the chosen backend
+    for module_name, name, make in _PROBES:
+        module = importlib.import_module(module_name)
+        _originals[(module_name, name)] = getattr(module, name)
+        setattr(module, name, make(getattr(module, name)))
+
+
+def _uninstall():
+    for (module_name, name), function in _originals.items():
+        setattr(sys.modules[module_name], name, function)
+    _originals.clear()
+
+
+def add_listener(listener):
+    '''
+    Registers listener(kind, name, value, bits) to receive every event,
+    installing the probes if it is the first listener.
+    '''
+    if not _listeners:
+        _install()
+    _listeners.append(listener)
+
+
+def remove_listener(listener):
+    '''
+    Unregisters listener, removing the probes if it was the last one.
+    '''
+    if listener not in _listeners:
+        print('The listener is not registered.')
+        return
+    _listeners.remove(listener)
+    if not _listeners:
+        _uninstall()
+
+
+class Recorder:
+    '''
+    A listener that keeps the total of each count, the number of events
+    of each name by bit size and the list of the times of each stage.
+    '''
+    __slots__ = ('counts', 'sizes', 'times')
+
+    def __init__(self):
+        self.counts = defaultdict(int)
+        self.sizes = defaultdict(lambda: defaultdict(int))
+        self.times = defaultdict(list)
+
+    def __call__(self, kind, name, value, bits):
+        if kind == 'count':
+            self.counts[name] += value
+            self.sizes[name][bits] += value
+        else:
+            self.times[name].append(value)
+
+    def summary(self):
+        '''
+        Returns a dictionary of the counts and, for each timed stage, the
+        number of calls and the total, mean and largest time in seconds.
+        '''
+        result = dict(self.counts)
+        for name, times in self.times.items():
+            result[name + '_time'] = {'calls': len(times), 'total': sum(times),
+                                      'mean': sum(times) / len(times), 'max': max(times)}
+        return result
+
+    def report(self, width=40):
+        '''
+        Returns the text report: each count with its histogram by bit
+        size, then each stage with the histogram of its times in buckets
+        of powers of 2.
+        '''
+        lines = []
+        for name in sorted(self.counts):
+            lines.append('{}: {}'.format(name, self.counts[name]))
+            lines += _bars(sorted(self.sizes[name].items()), '{:>8d} bits', width)
+        for name in sorted(self.times):
+            times = self.times[name]
+            lines.append('{}: {} calls, total {:.4f} s, mean {:.3g} s, max {:.3g} s'.format(
+                name, len(times), sum(times), sum(times) / len(times), max(times)))
+            buckets = defaultdict(int)
+            for t in times:
+                buckets[frexp(t)[1] if t > 0 else -1074] += 1    # t < 2**exponent
+            lines += _bars([(_format_time(2.0 ** e), n) for e, n in sorted(buckets.items())],
+                           '  < {:>8s}', width)
+        return '\n'.join(lines)
+
+    def __repr__(self):
+        return 'Recorder({})'.format(dict(self.counts))
+
+
+def _format_time(t):
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if t >= scale:
+            return '{:.3g} {}'.format(t / scale, unit)
+    return '{:.3g} ns'.format(t / 1e-9)
+
+
+def _bars(rows, label, width):
+    '''
+    Returns the lines of a histogram of the pairs (key, count) in rows.
+    '''
+    if not rows:
+        return []
+    largest = max(n for key, n in rows)
+    return ['  {}  {:>10d} {}'.format(label.format(key), n, '#' * max(1, n * width // largest))
+            for key, n in rows]
+
+
+@contextmanager
+def instrumented(*listeners):
+    '''
+    Registers a new Recorder (and any further listeners given) for the
+    duration of a with block and yields the Recorder:
+
+        with instrumented() as recorder:
+            rsa_private_key(1024)
+        print(recorder.report())
+    '''
+    recorder = Recorder()
+    for listener in (recorder,) + listeners:
+        add_listener(listener)
+    try:
+        yield recorder
+    finally:
+        for listener in (recorder,) + listeners:
+            remove_listener(listener)
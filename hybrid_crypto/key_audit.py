@@ -0,0 +1,268 @@
+"""
+Module name: key_audit
+Module contains: a scanner for weak RSA public keys
+Function names: read_moduli, product_tree, remainders,
+                batch_gcd, shared_factors, fermat_factor, audit
+
+Two keys that share a prime p are both broken by gcd(N1,N2) = p. Taking
+gcds of all pairs of n keys costs n*(n-1)/2 gcds, so instead we use
+Bernstein's batch gcd: multiply all the moduli together in a product
+tree, reduce the product modulo N_i**2 down a remainder tree, and then
+gcd(N_i, (P mod N_i**2) / N_i) is the gcd of N_i with the product of
+all the other moduli.
+
+The trees hold numbers of millions of bits. With the gmpy2 backend (see
+backend) they are built from gmpy2.mpz numbers, which is what makes 100k
+keys a matter of minutes. Otherwise Python ints are used, with a recursive division
+(_mod) in place of Python's quadratic one. Large key sets are split into
+chunks of chunk_size keys to bound the memory used by the trees: for each
+chunk the product of all the other chunks is accumulated modulo the
+chunk's own product and then reduced down the chunk's tree once.
+
+A key whose primes are too close together is broken by Fermat's method:
+N = a**2 - b**2 = (a-b)(a+b) for some a just above sqrt(N).
+
+Run from the repository root with:
+    python -m hybrid_crypto.key_audit moduli.txt
+where moduli.txt holds one modulus per line (decimal or 0x hex, anything
+after the modulus on the line, such as e, is ignored).
+"""
+
+from math import gcd, isqrt
+
+from hybrid_crypto import backend
+
+DEFAULT_CHUNK_SIZE = 16384      # Number of moduli per product tree
+FERMAT_STEPS = 64               # Fermat steps tried per modulus
+DIVISION_LIMIT = 4000           # Below this many bits the built-in % is fastest
+
+
+def read_moduli(file_name):
+    '''
+    Yields the moduli stored in the text file file_name, one per line.
+    Blank lines and lines starting with # are skipped.
+    '''
+    with open(file_name, 'r') as f:
+        for line in f:
+            fields = line.split()
+            if not fields or fields[0].startswith('#'):
+                continue
+            yield int(fields[0], 0)
+
+
+def _div2n1n(a, b, n):
+    '''
+    Returns divmod(a, b) for b of n bits and a < b * 2**n, by splitting
+    into two divisions of half the size (Burnikel and Ziegler). Python's
+    own long division takes time quadratic in the size, this takes about
+    the time of a (Karatsuba) multiplication.
+    '''
+    if a.bit_length() - n <= DIVISION_LIMIT:
+        return divmod(a, b)
+    pad = n & 1
+    if pad:
+        a <<= 1
+        b <<= 1
+        n += 1
+    half_n = n >> 1
+    mask = (1 << half_n) - 1
+    b1, b2 = b >> half_n, b & mask
+    q1, r = _div3n2n(a >> n, (a >> half_n) & mask, b, b1, b2, half_n)
+    q2, r = _div3n2n(r, a & mask, b, b1, b2, half_n)
+    if pad:
+        r >>= 1
+    return q1 << half_n | q2, r
+
+
+def _div3n2n(a12, a3, b, b1, b2, n):
+    '''
+    Helper for _div2n1n: divides (a12 * 2**n + a3) by b = b1 * 2**n + b2.
+    '''
+    if a12 >> n == b1:
+        q, r = (1 << n) - 1, a12 - (b1 << n) + b1
+    else:
+        q, r = _div2n1n(a12, b1, n)
+    r = (r << n | a3) - q * b2
+    while r < 0:
+        q -= 1
+        r += b
+    return q, r
+
+
+def _mod(a, b):
+    '''
+    Returns a % b for non-negative a and positive b, quickly even when
+    both have millions of bits.
+    '''
+    n = b.bit_length()
+    if n <= DIVISION_LIMIT or a < b or type(a) is not int:
+        return a % b
+    r = 0
+    for shift in range(((a.bit_length() - 1) // n) * n, -1, -n):
+        digit = (a >> shift) & ((1 << n) - 1)           # Work on a in n-bit digits
+        r = _div2n1n((r << n) | digit, b, n)[1]
+    return r
+
+
+def _to_big(values):
+    '''
+    Returns values as a list of gmpy2.mpz numbers with the gmpy2 backend
+    (GMP multiplies and divides huge numbers far faster).
+    '''
+    if backend.current() == 'python':
+        return list(values)
+    return [backend.mpz(v) for v in values]
+
+
+def product_tree(values):
+    '''
+    Returns the product tree of the list values as a list of levels: the
+    first level is values itself and the last level is [product of all].
+    '''
+    tree = [values]
+    while len(tree[-1]) > 1:
+        level = tree[-1]
+        tree.append([level[i] * level[i + 1] if i + 1 < len(level) else level[i]
+                     for i in range(0, len(level), 2)])
+    return tree
+
+
+def remainders(number, tree, square=False):
+    '''
+    Reduces number down the product tree tree and returns the list of
+    number mod v (or number mod v**2 if square is True) for each leaf v.
+    '''
+    level_rems = [number]
+    for level in reversed(tree[:-1]):
+        if square:
+            level_rems = [_mod(level_rems[i // 2], v * v) for i, v in enumerate(level)]
+        else:
+            level_rems = [_mod(level_rems[i // 2], v) for i, v in enumerate(level)]
+    if len(tree) == 1:                  # A single leaf: the loop above did nothing
+        v = tree[0][0]
+        level_rems = [number % (v * v if square else v)]
+    return level_rems
+
+
+def batch_gcd(moduli):
+    '''
+    Given a list of moduli returns the list of gcd(N_i, product of all
+    the other N_j), by Bernstein's product and remainder trees.
+    '''
+    if len(moduli) < 2:
+        return [1] * len(moduli)
+    tree = product_tree(_to_big(moduli))
+    rems = remainders(tree[-1][0], tree, square=True)
+    return [gcd(N, int(r // N)) for N, r in zip(moduli, rems)]
+
+
+def shared_factors(moduli, chunk_size=DEFAULT_CHUNK_SIZE):
+    '''
+    Returns the same list as batch_gcd(moduli), working on chunks of
+    chunk_size moduli at a time so that no product grows too large.
+    '''
+    if len(moduli) <= chunk_size:
+        return batch_gcd(moduli)
+    chunks = [_to_big(moduli[i:i + chunk_size]) for i in range(0, len(moduli), chunk_size)]
+    trees = [product_tree(chunk) for chunk in chunks]
+    products = [tree[-1][0] for tree in trees]
+    result = []
+    for i, chunk in enumerate(chunks):
+        # Inside the chunk: (P_i mod N**2) / N is the product of the others mod N
+        rems = remainders(products[i], trees[i], square=True)
+        inside = [r // N for N, r in zip(chunk, rems)]
+        # Outside the chunk: the product of the other chunks modulo P_i,
+        # reduced down the tree of chunk i in one go
+        outside = 1
+        for j, P in enumerate(products):
+            if j != i:
+                outside = _mod(outside * _mod(P, products[i]), products[i])
+        rems = remainders(outside, trees[i])
+        result += [gcd(int(N), int(a * r % N)) for N, a, r in zip(chunk, inside, rems)]
+    return result
+
+
+def fermat_factor(N, max_steps=FERMAT_STEPS):
+    '''
+    Tries to write the odd number N as a**2 - b**2 with a = ceil(sqrt(N)),
+    ceil(sqrt(N)) + 1, ... (max_steps values). Returns the factors
+    (a-b, a+b) if this works and None otherwise.
+    '''
+    a = isqrt(N)
+    if a * a < N:
+        a += 1
+    b_squared = a * a - N
+    for i in range(max_steps):
+        b = isqrt(b_squared)
+        if b * b == b_squared:
+            if a - b > 1:
+                return (a - b, a + b)
+            return None                 # Only the trivial factorization 1 * N
+        b_squared += 2 * a + 1          # (a+1)**2 - N
+        a += 1
+    return None
+
+
+def audit(moduli, chunk_size=DEFAULT_CHUNK_SIZE, fermat_steps=FERMAT_STEPS):
+    '''
+    Given an iterable of moduli returns a list of findings, one for each
+    compromised key, as tuples (index, N, p, q, reason).
+    '''
+    moduli = list(moduli)
+    findings = []
+    found = set()
+
+    gcds = shared_factors(moduli, chunk_size)
+    whole = []                          # Both primes shared, or a duplicate modulus
+    for index, (N, g) in enumerate(zip(moduli, gcds)):
+        if g == N:
+            whole.append(index)
+        elif g != 1:
+            findings.append((index, N, g, N // g, 'shared factor'))
+            found.add(index)
+    # gcd = N says nothing about the primes, so compare these few keys pairwise
+    for index in whole:
+        N = moduli[index]
+        for other, M in enumerate(moduli):
+            g = gcd(N, M) if other != index else 1
+            if g == N:
+                findings.append((index, N, None, None, 'duplicate of key {}'.format(other)))
+                found.add(index)
+                break
+            if g != 1:
+                findings.append((index, N, g, N // g, 'shared factor'))
+                found.add(index)
+                break
+
+    for index, N in enumerate(moduli):
+        if index not in found:
+            factors = fermat_factor(N, fermat_steps)
+            if factors is not None:
+                findings.append((index, N) + factors + ('primes too close (Fermat)',))
+    return sorted(findings, key=lambda finding: finding[0])
+
+
+def main(argv):
+    import argparse
+    from time import perf_counter
+
+    parser = argparse.ArgumentParser(description='Report RSA moduli with shared or close primes.')
+    parser.add_argument('file_name', help='text file with one modulus per line')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--fermat-steps', type=int, default=FERMAT_STEPS)
+    args = parser.parse_args(argv)
+
+    start = perf_counter()
+    moduli = list(read_moduli(args.file_name))
+    findings = audit(moduli, args.chunk_size, args.fermat_steps)
+    for (index, N, p, q, reason) in findings:
+        print("key {} ({} bits): {}".format(index, N.bit_length(), reason))
+        if p is not None:
+            print("    p = {}\n    q = {}".format(p, q))
+    print("{} of {} keys compromised ({:.2f} s)".format(
+        len(findings), len(moduli), perf_counter() - start))
+
+
+if __name__ == '__main__':
+    import sys
+    main(sys.argv[1:])
@@ -0,0 +1,248 @@
+"""
+Module name: key_pool
+Module contains: a pool of RSA keys (or Diffie-Hellman groups) generated
+                 ahead of time by background worker processes
+Class names: KeyPool
+
+rsa_private_key(bit_length) makes a client wait for two random_prime
+searches, one after the other. A KeyPool keeps a queue of finished keys
+and hands them out at once. Worker processes refill the queue in the
+background with watermarks: when the number of keys ready or being made
+falls to low_watermark, new jobs are started until there are
+high_watermark of them, so the workers run in bursts rather than for
+every key taken.
+
+For an RSA key the searches for p and q are submitted as two separate
+jobs, so they run in parallel; the key is queued when the second one
+finishes. A DH job makes a safe prime group (p, g) as in safe_primes.
+No thread of our own is needed: the jobs are started from get and their
+results are queued by the done callbacks of the futures.
+
+A job that fails (raises in the worker, returns None after printing
+its message, is cancelled, or cannot be submitted because the process
+pool is broken) is replaced by a new one, up to RETRIES failures in a
+row. A get that is waiting returns None with the error as soon as no
+job is left that could bring a key, instead of waiting forever; the
+next get starts new jobs again.
+
+metrics() returns the depth of the queue, the number of jobs in flight,
+the counts of keys generated and served, the number of requests that
+found the queue empty, the number of failed jobs and the last error,
+the generation rate and the mean time a key took.
+"""
+
+import threading
+from collections import deque
+from concurrent.futures import BrokenExecutor, CancelledError, ProcessPoolExecutor
+from time import perf_counter
+
+from hybrid_crypto.primes import random_prime
+
+RETRIES = 3                     # Failed jobs in a row replaced without a get
+
+
+def _dh_group(bit_length):
+    '''
+    Worker: returns a new safe prime group (p, g) of bit_length bits.
+    '''
+    from hybrid_crypto.safe_primes import random_safe_prime, primitive_root_safe
+    p = random_safe_prime(bit_length)
+    if p is None:
+        return None
+    return (p, primitive_root_safe(p))
+
+
+class KeyPool:
+    '''
+    A queue of pre-generated RSA keys (p, q) (kind='rsa') or DH groups
+    (p, g) (kind='dh') of bit_length bits, refilled by worker processes.
+    '''
+    __slots__ = ('bit_length', 'kind', 'low_watermark', 'high_watermark', '_executor',
+                 '_keys', '_condition', '_in_flight', '_closed', '_generated', '_served',
+                 '_misses', '_started', '_generation_time', '_failures', '_failed_in_row',
+                 '_error')
+
+    def __init__(self, bit_length=512, kind='rsa', low_watermark=4, high_watermark=16,
+                 workers=2):
+        if kind not in ('rsa', 'dh'):
+            raise ValueError("kind must be 'rsa' or 'dh'.")
+        if not 0 <= low_watermark < high_watermark:
+            raise ValueError('The watermarks must satisfy 0 <= low < high.')
+        self.bit_length = bit_length
+        self.kind = kind
+        self.low_watermark = low_watermark
+        self.high_watermark = high_watermark
+        self._executor = ProcessPoolExecutor(workers)
+        self._keys = deque()
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._closed = False
+        self._generated = 0
+        self._served = 0
+        self._misses = 0
+        self._started = perf_counter()
+        self._generation_time = 0.0
+        self._failures = 0
+        self._failed_in_row = 0
+        self._error = None
+        with self._condition:
+            self._refill()
+
+    def _refill(self):
+        '''
+        Starts jobs until high_watermark keys are ready or being made.
+        Called with the condition held.
+        '''
+        while not self._closed and len(self._keys) + self._in_flight < self.high_watermark:
+            start = perf_counter()
+            futures = []
+            try:
+                if self.kind == 'dh':
+                    futures.append(self._executor.submit(_dh_group, self.bit_length))
+                else:
+                    # p and q are searched for at the same time by two workers
+                    for i in range(2):
+                        futures.append(self._executor.submit(random_prime, self.bit_length))
+            except (BrokenExecutor, RuntimeError) as error:   # Broken or shut down pool
+                for future in futures:
+                    future.cancel()
+                self._failed(error)
+                return
+            self._in_flight += 1
+            if self.kind == 'dh':
+                futures[0].add_done_callback(lambda f, start=start: self._finished([f], start))
+                continue
+            pending = [2]
+            for future in futures:
+                future.add_done_callback(
+                    lambda f, futures=futures, pending=pending, start=start:
+                    self._part_finished(futures, pending, start))
+
+    def _part_finished(self, futures, pending, start):
+        '''
+        Done callback of the p and q searches of one key: the second one
+        to finish queues the key.
+        '''
+        with self._condition:
+            pending[0] -= 1
+            if pending[0]:
+                return
+        self._finished(futures, start)
+
+    def _finished(self, futures, start):
+        '''
+        Queues the result of the finished futures of one job, or records
+        its error and starts a new job in its place.
+        '''
+        with self._condition:
+            self._in_flight -= 1
+            if self._closed:
+                return
+            error = None
+            for f in futures:
+                if f.cancelled():
+                    error = CancelledError('A key generation job was cancelled.')
+                elif f.exception() is not None:
+                    error = f.exception()
+            if error is None and any(f.result() is None for f in futures):
+                error = ValueError('A worker made no key of {} bits.'.format(self.bit_length))
+            if error is not None:
+                self._failed(error)
+                if self._failed_in_row <= RETRIES:
+                    self._refill()
+                self._condition.notify_all()
+                return
+            self._failed_in_row = 0
+            if self.kind == 'dh':
+                key = futures[0].result()
+            else:
+                key = (futures[0].result(), futures[1].result())
+                if key[0] == key[1]:            # Practically impossible, but not a key
+                    self._refill()
+                    return
+            self._keys.append(key)
+            self._generated += 1
+            self._generation_time += perf_counter() - start
+            self._condition.notify()
+
+    def _failed(self, error):
+        '''
+        Records the error of a failed job. Called with the condition held.
+        '''
+        self._failures += 1
+        self._failed_in_row += 1
+        self._error = error
+
+    def get(self, timeout=None):
+        '''
+        Returns a key from the pool, waiting (at most timeout seconds, if
+        given) for one when the pool is empty. Returns None with a message
+        if no key arrives in time, the pool is closed or the jobs that
+        could bring a key have failed.
+        '''
+        with self._condition:
+            if not self._keys:
+                self._misses += 1
+                self._refill()
+                if not self._condition.wait_for(
+                        lambda: self._keys or self._closed or not self._in_flight, timeout):
+                    print('No key was ready within the timeout.')
+                    return None
+                if self._closed:
+                    print('The key pool is closed.')
+                    return None
+                if not self._keys:
+                    print('Key generation failed: {!r}'.format(self._error))
+                    return None
+            key = self._keys.popleft()
+            self._served += 1
+            if len(self._keys) + self._in_flight <= self.low_watermark:
+                self._refill()
+            return key
+
+    def depth(self):
+        '''
+        Returns the number of keys ready in the pool.
+        '''
+        with self._condition:
+            return len(self._keys)
+
+    def metrics(self):
+        '''
+        Returns a dictionary of the pool depth, jobs in flight, keys
+        generated and served, empty-pool requests (misses), failed jobs and
+        the last error, keys generated per second since the pool started
+        and mean seconds per key.
+        '''
+        with self._condition:
+            elapsed = perf_counter() - self._started
+            return {'depth': len(self._keys),
+                    'in_flight': self._in_flight,
+                    'generated': self._generated,
+                    'served': self._served,
+                    'misses': self._misses,
+                    'failures': self._failures,
+                    'error': self._error,
+                    'rate': self._generated / elapsed if elapsed else 0.0,
+                    'mean_generation_time': (self._generation_time / self._generated
+                                             if self._generated else None)}
+
+    def close(self):
+        '''
+        Stops the worker processes. Keys still in the pool are dropped.
+        '''
+        with self._condition:
+            self._closed = True
+            self._keys.clear()
+            self._condition.notify_all()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __repr__(self):
+        return 'KeyPool(kind={}, bit_length={}, watermarks={}/{}, depth={})'.format(
+            self.kind, self.bit_length, self.low_watermark, self.high_watermark, self.depth())
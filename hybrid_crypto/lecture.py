@@ -0,0 +1,256 @@
+"""
+Module name: lecture
+Module contains: the single copy of the functions of the lecture modules,
+                 with the names and arguments used in the lectures and
+                 notebooks
+Function names: isprime_basic, gcd, gcd_safe, gcd_ext, modular_inverse,
+                smallest_factor, recompose, decompose, totient_pp,
+                make_mult_func, totient, euler_totient_pp, euler_totient,
+                mult_div_no, miller_rabin, is_prime, char_to_byte,
+                convert_to_integer, convert_to_text, random_prime,
+                rsa_private_key, rsa_public_key, rsa_encrypt, rsa_decrypt
+
+diffie_hellman/cryptography_lecture_functions.py and lectures_2023/
+cryptography_functions.py, miller_rabin.py and
+number_theory_lecture_functions.py each had their own copy of gcd,
+gcd_ext, modular_inverse, miller_rabin and is_prime (and more), and a
+notebook got whichever copy was first on its path. Those modules now
+import everything from here, and these five functions are the ones of
+number_theory and primality (and decompose is factor.factorize). gcd,
+gcd_ext and modular_inverse first check, as the lecture versions did,
+that their arguments are integers (so 6.0 is accepted but 2.5 gets a
+message and None). The others keep their lecture form, which the
+benchmarks measure the library against.
+
+miller_rabin is the strong probable prime test. The old lecture version
+also rejected a square root of 1 met while computing base**(p-1) from
+the top bit down, so on a composite it could say False where this one
+says True (never the other way round). is_prime is exact below about
+3.3*10**24 and has error probability at most 4**(-num_wit) above.
+"""
+
+from random import SystemRandom
+
+from hybrid_crypto import backend
+from hybrid_crypto.factor import factorize
+from hybrid_crypto import number_theory
+from hybrid_crypto.primality import miller_rabin, is_prime
+
+_system_random = SystemRandom()    # Reused by random_prime
+
+decompose = factorize              # Same dictionary {prime: exponent} as the lecture version
+
+
+def isprime_basic(n, verbose=False):
+    '''
+    Checks whether the argument n is a prime number using a brute force
+    search for factors between 1 and n. With verbose=True it prints out
+    its results.
+    '''
+    if n == 1:
+        return False
+    if n % 2 == 0:                      # If n is even it is only prime if it is 2
+        if n == 2:
+            return True
+        if verbose:
+            print("{} is not prime: {} is a factor. ".format(n, 2))
+        return False
+    j = 3
+    while j * j <= n:                   # Check 3,5,... up to sqrt(n)
+        if n % j == 0:
+            if verbose:
+                print("{} is not prime: {} is a factor.".format(n, j))
+            return False
+        j = j + 2
+    if verbose:
+        print("{} is prime.".format(n))
+    return True
+
+
+def gcd(a, b):
+    '''
+    Returns the greatest common divisor of integers a and b using
+    Euclid's algorithm. The order of a and b does not matter and nor
+    do the signs.
+    '''
+    if not (a % 1 == 0 and b % 1 == 0):
+        print("Need to use integers for gcd.")
+        return None
+    return number_theory.gcd(a, b)
+
+
+gcd_safe = gcd                          # The name of the checked gcd in diffie_hellman/
+
+
+def gcd_ext(a, b):
+    '''
+    Outputs (gcd,x,y) such that gcd = ax + by.
+    '''
+    if not (a % 1 == 0 and b % 1 == 0):
+        print("Need to use integers for gcd.")
+        return None
+    return number_theory.gcd_ext(a, b)
+
+
+def modular_inverse(a, n):
+    '''
+    Given integers a and n with gcd(a,n) = 1 returns b in the range
+    [0,n) such that ab is 1 modulo n. Otherwise prints an error message.
+    '''
+    if isinstance(a, int) and isinstance(n, int):
+        return number_theory.modular_inverse(a, n)
+    result = gcd_ext(a, n)              # Whole numbers given as floats, say
+    if result is None:
+        return None
+    (g, x, y) = result
+    if g != 1:
+        print('The numbers are not coprime.')
+        return None
+    return x % n
+
+
+def smallest_factor(n):
+    '''
+    Returns the smallest factor of a positive integer n by trial
+    division (see hybrid_crypto.factor for large n).
+    '''
+    i = 2
+    while i * i <= n:
+        if n % i == 0:
+            return i                    # The first 2 <= i < n to divide n
+        i += 1
+    return n                            # So n is prime (its own least factor)
+
+
+def recompose(factor_dict):
+    '''
+    Recomposes an integer from the factor dictionary.
+    '''
+    result = 1
+    for p in factor_dict.keys():
+        result = result * (p**factor_dict[p])
+    return result
+
+
+def totient_pp(p, e):
+    '''
+    Given input (p,e) with p being a prime and e a positive integer,
+    returns the totient of p^e.
+    '''
+    return p**(e-1) * (p - 1)
+
+
+euler_totient_pp = totient_pp
+
+
+def make_mult_func(func_pp):
+    '''
+    When a function func_pp(p,e) of two arguments is given as input,
+    make_mult_func outputs a multiplicative function func obtained from
+    func_pp via prime decomposition. (See hybrid_crypto.multiplicative
+    for a version that caches the decompositions.)
+    '''
+    def func(n):
+        D = decompose(n)
+        result = 1
+        for p in D.keys():
+            result = result * func_pp(p, D[p])
+        return result
+    return func
+
+
+totient = euler_totient = make_mult_func(totient_pp)
+mult_div_no = make_mult_func(lambda p, e: e + 1)
+
+
+def char_to_byte(char):
+    '''
+    Returns the 8 bit binary representation (padded with leading zeros
+    when necessary) of ord(char).
+    '''
+    return format(ord(char), '08b')
+
+
+def convert_to_integer(text, verbose=False):
+    '''
+    Returns an integer that encodes the input string text: a leading 1
+    followed by the 8 bits of each character. With verbose=True the
+    binary representation is printed. (See hybrid_crypto.codec for a
+    linear time version.)
+    '''
+    bin_string = '1'
+    for letter in text:
+        bin_string = bin_string + char_to_byte(letter)
+    if verbose:
+        print("The binary representation of this message is:")
+        print(bin_string)
+    return int(bin_string, 2)
+
+
+def convert_to_text(number):
+    '''
+    Returns the string that is the decoding of the input integer number:
+    its binary representation without the leading 1 is cut into 8 bit
+    pieces, each giving one character.
+    '''
+    bin_string = bin(number)[3:]        # Remove '0b1'
+    text = ''
+    for i in range(0, len(bin_string), 8):
+        text = text + chr(int(bin_string[i:i+8], 2))
+    return text
+
+
+def random_prime(bit_length):
+    '''
+    Returns a cryptographically secure random prime of bit_length many
+    (binary) bits (see hybrid_crypto.primes for a much faster version).
+    '''
+    # Setting the top bit gives a uniformly random number in
+    # [2**(bit_length-1), 2**bit_length) without wasting half of the draws
+    top_bit = 1 << (bit_length - 1)
+    while True:
+        p = _system_random.getrandbits(bit_length) | top_bit
+        if is_prime(p):
+            return p
+
+
+def rsa_private_key(bit_length):
+    '''
+    Given input bit_length returns a private RSA key (p,q) where both p
+    and q are primes with bit_length number of (binary) bits.
+    '''
+    p = random_prime(bit_length)
+    q = random_prime(bit_length)
+    return (p, q)
+
+
+def rsa_public_key(p, q, e=65537):
+    '''
+    Given input (p,q,e) returns the RSA public key from the two prime
+    numbers p and q and auxiliary exponent e.
+    '''
+    N = p * q
+    return (N, e)
+
+
+def rsa_encrypt(m, N, e):
+    '''
+    Given input (m,N,e) where m is the numerical encoding of a message,
+    returns the RSA encryption of m using public key (N,e). For messages
+    with m >= N use hybrid_crypto.rsa_blocks.
+    '''
+    if m >= N:
+        print('The message is too large for the modulus N.')
+        return None
+    return backend.powmod(m, e, N)
+
+
+def rsa_decrypt(c, p, q, N, e):
+    '''
+    Given input (c,p,q,N,e) returns the RSA decryption of ciphertext c
+    using private key (p,q) and public key (N,e). (See
+    hybrid_crypto.rsa_keys for decryption with the CRT.)
+    '''
+    totient = N - (p + q) + 1           # This is (p-1)*(q-1)
+    f = modular_inverse(e, totient)     # Note: f * e = 1 (mod totient)
+    return backend.powmod(c, f, N)      # This is c**f (mod N)
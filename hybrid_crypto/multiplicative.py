@@ -0,0 +1,158 @@
+"""
+Module name: multiplicative
+Module contains: multiplicative functions of one integer (through a
+                 cached factorization) and tables of them for 0,1,...,N
+Function names: factorization, make_mult_func, euler_totient_pp,
+                euler_totient, mult_div_no,
+                spf_table, totient_table, divisor_count_table
+
+make_mult_func in the lecture modules factorizes n from scratch on every
+call. Here factorization(n) is an LRU cache around factor.factorize, so
+repeated values cost a dictionary lookup.
+
+For all values up to N at once we use tables. spf_table fills in the
+smallest prime factor of every n <= N by slice assignment (C speed). The
+totient and divisor count of n then follow from those of n / spf(n) in
+one linear pass (the linear sieve recurrence). Tables are compact
+array('I') buffers, or NumPy arrays (built with whole-array operations)
+if NumPy is installed and numpy=True is passed. NumPy is only imported
+then, so the rest of the module loads quickly.
+"""
+
+from array import array
+from functools import lru_cache
+from math import isqrt
+
+from hybrid_crypto.factor import factorize
+
+CACHE_SIZE = 1 << 16            # Number of factorizations remembered
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def factorization(n):
+    '''
+    Returns the prime decomposition of n as a tuple of pairs (p,e),
+    remembering the most recently used CACHE_SIZE results.
+    '''
+    return tuple(factorize(n).items())
+
+
+def make_mult_func(func_pp):
+    '''
+    When a function func_pp(p,e) of two arguments is given as input,
+    make_mult_func outputs the multiplicative function obtained from
+    func_pp via (cached) prime decomposition.
+    '''
+    def func(n):
+        result = 1
+        for p, e in factorization(n):
+            result *= func_pp(p, e)
+        return result
+    return func
+
+
+def euler_totient_pp(p, e):
+    '''
+    Returns the totient of p^e.
+    '''
+    return p**(e-1) * (p - 1)
+
+
+euler_totient = make_mult_func(euler_totient_pp)
+mult_div_no = make_mult_func(lambda p, e: e + 1)
+
+
+def _primes_to(limit):
+    '''
+    Returns the list of primes <= limit.
+    '''
+    flags = bytearray([1]) * (limit + 1)
+    flags[:2] = b'\x00\x00'
+    for i in range(2, isqrt(limit) + 1):
+        if flags[i]:
+            flags[i*i::i] = bytes(len(range(i*i, limit + 1, i)))
+    return [i for i, flag in enumerate(flags) if flag]
+
+
+def spf_table(limit, numpy=False):
+    '''
+    Returns a table spf with spf[n] the smallest prime factor of n for
+    2 <= n <= limit (and spf[0] = spf[1] = 0).
+    '''
+    small = _primes_to(isqrt(limit))
+    if numpy:
+        import numpy as np
+        spf = np.arange(limit + 1, dtype=np.uint32)
+        for p in reversed(small):       # Smaller primes are written last and win
+            spf[p*p::p] = p
+        spf[:2] = 0
+        return spf
+    spf = array('I', range(limit + 1))
+    for p in reversed(small):
+        spf[p*p::p] = array('I', [p]) * len(range(p*p, limit + 1, p))
+    spf[:2] = array('I', [0, 0])[:limit + 1]     # Only spf[0] when limit is 0
+    return spf
+
+
+def totient_table(limit, numpy=False):
+    '''
+    Returns a table phi with phi[n] the Euler totient of n for
+    0 <= n <= limit (phi[0] = 0).
+    '''
+    if numpy:
+        import numpy as np
+        phi = np.arange(limit + 1, dtype=np.uint32)
+        is_prime = np.ones(limit + 1, dtype=bool)
+        is_prime[:2] = False
+        for p in range(2, isqrt(limit) + 1):
+            if is_prime[p]:
+                is_prime[p*p::p] = False
+        for p in np.flatnonzero(is_prime).tolist():
+            phi[p::p] -= phi[p::p] // p         # Multiply by (1 - 1/p)
+        return phi
+    spf = spf_table(limit)
+    phi = array('I', bytes(4 * (limit + 1)))
+    if limit >= 1:
+        phi[1] = 1
+    for n in range(2, limit + 1):
+        p = spf[n]
+        m = n // p
+        # phi(pm) = p*phi(m) if p divides m, and (p-1)*phi(m) otherwise
+        phi[n] = phi[m] * (p if spf[m] == p else p - 1)
+    return phi
+
+
+def divisor_count_table(limit, numpy=False):
+    '''
+    Returns a table d with d[n] the number of divisors of n for
+    0 <= n <= limit (d[0] = 0).
+    '''
+    if numpy:
+        import numpy as np
+        d = np.ones(limit + 1, dtype=np.uint32)
+        d[0] = 0
+        exponent = np.zeros(limit + 1, dtype=np.uint8)
+        for p in _primes_to(limit):
+            pk = p
+            while pk <= limit:
+                exponent[pk::pk] += 1           # exponent of p in each multiple
+                pk *= p
+            d[p::p] *= exponent[p::p] + 1
+            exponent[p::p] = 0
+        return d
+    spf = spf_table(limit)
+    d = array('I', bytes(4 * (limit + 1)))
+    e = array('B', bytes(limit + 1))    # e[n] = exponent of spf(n) in n
+    if limit >= 1:
+        d[1] = 1
+    for n in range(2, limit + 1):
+        p = spf[n]
+        m = n // p
+        if spf[m] == p:
+            k = e[m] + 1
+            e[n] = k
+            d[n] = d[m] // k * (k + 1)  # The factor k for p**(k-1) becomes k+1
+        else:
+            e[n] = 1
+            d[n] = d[m] * 2
+    return d
@@ -0,0 +1,77 @@
+"""
+Module name: number_theory
+Module contains: iterative versions of the basic number theory functions
+                 of the lecture modules, for integers of any size
+Function names: gcd, gcd_ext, modular_inverse, batch_modular_inverse
+"""
+
+from hybrid_crypto import backend
+
+
+def gcd(a, b):
+    '''
+    Returns the greatest common divisor of integers a and b using
+    Euclid's algorithm. The order of a and b does not matter and nor
+    do the signs.
+    '''
+    while b != 0:
+        a, b = b, a % b
+    return abs(a)
+
+
+def gcd_ext(a, b):
+    '''
+    Outputs (gcd,x,y) such that gcd = ax + by, with the same x and y as
+    the (recursive) lecture version of gcd_ext.
+    '''
+    r0, r1 = a, b                       # Keep r0 = a*x0 + b*y0 and r1 = a*x1 + b*y1
+    x0, y0, x1, y1 = 1, 0, 0, 1
+    while r0 != 0:
+        quot = r1 // r0
+        r0, r1 = r1 - quot * r0, r0     # gcd(r0,r1) = gcd(r1 % r0, r0)
+        x0, x1 = x1 - quot * x0, x0
+        y0, y1 = y1 - quot * y0, y0
+    sign = abs(r1) // r1                # Now gcd = |r1| = sign * r1
+    return (abs(r1), sign * x1, sign * y1)
+
+
+def modular_inverse(a, n):
+    '''
+    Given integers a and n with gcd(a,n) = 1 returns the multiplicative
+    inverse of a modulo n. Otherwise prints an error message.
+    '''
+    try:
+        return backend.invert(a, n)     # Computed in C (by Python or GMP)
+    except ValueError:
+        print('The numbers are not coprime.')
+        return None
+
+
+def batch_modular_inverse(values, modulus):
+    '''
+    Given a list of integers values, each coprime to modulus, returns the
+    list of their inverses modulo modulus. Uses Montgomery's trick: one
+    modular inversion and about 3k multiplications for k values.
+    '''
+    k = len(values)
+    if k == 0:
+        return []
+    # prefix[i] is the product of values[0],...,values[i] (mod modulus)
+    prefix = [0] * k
+    running = 1
+    for i in range(k):
+        running = running * values[i] % modulus
+        prefix[i] = running
+    # A single inversion of the product of all the values
+    try:
+        inverse = backend.invert(running, modulus)
+    except ValueError:
+        print('Not every value is coprime to the modulus.')
+        return None
+    # Walk backwards: inverse is now 1/(values[0]*...*values[i])
+    result = [0] * k
+    for i in range(k - 1, 0, -1):
+        result[i] = inverse * prefix[i - 1] % modulus
+        inverse = inverse * values[i] % modulus
+    result[0] = inverse % modulus
+    return result
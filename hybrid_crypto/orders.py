@@ -0,0 +1,101 @@
+"""
+Module name: orders
+Module contains: multiplicative orders, primitive roots and subgroup
+                 generators modulo a prime p
+Function names: group_cofactors, multiplicative_order, is_primitive_root,
+                primitive_roots, find_primitive_root,
+                find_generator_of_subgroup
+
+mult_order in the Diffie-Hellman notebook multiplies by a until it gets
+back to 1, which takes up to p-1 steps. Here we use that the order of a
+divides p - 1: starting from p - 1 we divide out each prime factor q of
+p - 1 for as long as a**(order/q) is still 1. This needs the
+factorization of p - 1 (found by factor.factorize unless it is given)
+and only a few pow calls for each prime factor.
+"""
+
+from hybrid_crypto.factor import factorize
+
+
+def group_cofactors(p, factors=None):
+    '''
+    Returns the list of (p-1)/q for the distinct primes q dividing p - 1.
+    b is a primitive root modulo p exactly when b**c != 1 (mod p) for
+    every c in this list.
+    '''
+    if factors is None:
+        factors = factorize(p - 1)
+    return [(p - 1) // q for q in factors]
+
+
+def multiplicative_order(a, p, factors=None):
+    '''
+    Returns the multiplicative order of a modulo the prime p. factors is
+    the factorization {q: e} of p - 1, computed here if not given.
+    '''
+    if a % p == 0:
+        print('a is divisible by p, so it has no multiplicative order.')
+        return None
+    if factors is None:
+        factors = factorize(p - 1)
+    order = p - 1
+    for q, e in factors.items():
+        for i in range(e):
+            if pow(a, order // q, p) != 1:
+                break
+            order //= q                 # a**(order/q) = 1, so the order divides order/q
+    return order
+
+
+def is_primitive_root(b, p, cofactors=None):
+    '''
+    Checks whether b is a primitive root modulo the prime p, using the
+    list returned by group_cofactors(p) (computed here if not given).
+    '''
+    if b % p == 0:
+        return False
+    if cofactors is None:
+        cofactors = group_cofactors(p)
+    for c in cofactors:
+        if pow(b, c, p) == 1:
+            return False
+    return True
+
+
+def primitive_roots(candidates, p, factors=None):
+    '''
+    Returns the list of those candidates that are primitive roots modulo
+    the prime p. p - 1 is factorized (at most) once for the whole batch.
+    '''
+    cofactors = group_cofactors(p, factors)
+    return [b for b in candidates if is_primitive_root(b, p, cofactors)]
+
+
+def find_primitive_root(p, factors=None):
+    '''
+    Returns the smallest primitive root modulo the prime p.
+    '''
+    if p == 2:
+        return 1
+    cofactors = group_cofactors(p, factors)
+    b = 2
+    while not is_primitive_root(b, p, cofactors):
+        b += 1
+    return b
+
+
+def find_generator_of_subgroup(p, q):
+    '''
+    Returns a generator of the subgroup of order q modulo the prime p,
+    where q is a prime dividing p - 1.
+    '''
+    if (p - 1) % q != 0:
+        print('q does not divide p - 1.')
+        return None
+    cofactor = (p - 1) // q
+    h = 2
+    while True:
+        g = pow(h, cofactor, p)         # g**q = h**(p-1) = 1, so g has order 1 or q
+        if g != 1:
+            return g
+        h += 1
@@ -0,0 +1,198 @@
+"""
+Module name: primality
+Module contains: primality testing based on the strong probable prime
+                 (Miller-Rabin) test and the Baillie-PSW test
+Function names: small_primes, trial_division, miller_rabin,
+                deterministic_bases, jacobi, strong_lucas,
+                baillie_psw, is_prime
+
+The lecture miller_rabin walks through bin(p-1) one bit at a time in
+Python. Here we write p - 1 = 2**s * d with d odd, compute pow(a,d,p)
+once (in C) and then square at most s-1 times. For p < 3.3 * 10**24
+a fixed set of bases is known to give the correct answer, so is_prime
+is deterministic there. Before any of this, a single gcd with the
+product of the primes below TRIAL_LIMIT removes most composites. The
+test itself is backend.is_strong_prp, so GMP does it when gmpy2 is
+installed.
+"""
+
+from math import gcd, isqrt
+from random import Random
+
+from hybrid_crypto import backend
+
+TRIAL_LIMIT = 1000              # Trial division by the primes below this bound
+
+# (bound, bases): the first bases are enough for every n < bound.
+# See Jaeschke (1993) and Sorenson and Webster (2015).
+_DETERMINISTIC = [
+    (2047, (2,)),
+    (1373653, (2, 3)),
+    (25326001, (2, 3, 5)),
+    (3215031751, (2, 3, 5, 7)),
+    (2152302898747, (2, 3, 5, 7, 11)),
+    (3474749660383, (2, 3, 5, 7, 11, 13)),
+    (341550071728321, (2, 3, 5, 7, 11, 13, 17)),
+    (3825123056546413051, (2, 3, 5, 7, 11, 13, 17, 19, 23)),
+    (318665857834031151167461, (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)),
+    (3317044064679887385961981, (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)),
+]
+DETERMINISTIC_LIMIT = _DETERMINISTIC[-1][0]
+
+_random = Random()              # Witnesses need not be secret
+
+
+def small_primes(limit):
+    '''
+    Returns the list of primes below limit (sieve of Eratosthenes).
+    '''
+    flags = bytearray([1]) * limit
+    flags[:2] = b'\x00\x00'
+    for i in range(2, isqrt(limit - 1) + 1):
+        if flags[i]:
+            flags[i*i::i] = bytes(len(range(i*i, limit, i)))
+    return [i for i in range(limit) if flags[i]]
+
+
+TRIAL_PRIMES = small_primes(TRIAL_LIMIT)
+_TRIAL_SET = frozenset(TRIAL_PRIMES)
+_PRIMORIAL = 1
+for _p in TRIAL_PRIMES:
+    _PRIMORIAL *= _p
+
+
+def trial_division(n):
+    '''
+    Returns False if n has a prime factor below TRIAL_LIMIT (other than
+    n itself), True otherwise. One gcd replaces all the divisions.
+    '''
+    if n < TRIAL_LIMIT:
+        return n in _TRIAL_SET
+    return gcd(n, _PRIMORIAL) == 1
+
+
+def miller_rabin(p, base):
+    '''
+    The strong probable prime test of the odd number p > 3 to the given
+    base. If False is output then p is definitely not prime. If True is
+    output then p MIGHT be prime. For p < 4 or even p it is the Fermat
+    test, as the lecture version was.
+    '''
+    return backend.is_strong_prp(p, base)
+
+
+def deterministic_bases(n):
+    '''
+    Given n < DETERMINISTIC_LIMIT returns the bases for which the
+    miller_rabin test is known to be correct for n.
+    '''
+    for bound, bases in _DETERMINISTIC:
+        if n < bound:
+            return bases
+    return None
+
+
+def jacobi(a, n):
+    '''
+    Returns the Jacobi symbol (a/n) for odd n > 0.
+    '''
+    a %= n
+    result = 1
+    while a != 0:
+        while a % 2 == 0:
+            a //= 2
+            if n % 8 in (3, 5):
+                result = -result
+        a, n = n, a                     # Quadratic reciprocity
+        if a % 4 == 3 and n % 4 == 3:
+            result = -result
+        a %= n
+    return result if n == 1 else 0
+
+
+def strong_lucas(n):
+    '''
+    The strong Lucas probable prime test of odd n > 2 with Selfridge's
+    parameters: D is the first of 5,-7,9,-11,... with (D/n) = -1,
+    P = 1 and Q = (1-D)/4.
+    '''
+    if isqrt(n) ** 2 == n:              # No suitable D exists for a square
+        return False
+    D = 5
+    while True:
+        j = jacobi(D, n)
+        if j == -1:
+            break
+        if j == 0 and abs(D) != n:      # D shares a factor with n
+            return False
+        D = -D - 2 if D > 0 else -D + 2
+    P = 1
+    Q = (1 - D) // 4
+
+    d = n + 1
+    s = (d & -d).bit_length() - 1       # n + 1 = 2**s * d with d odd
+    d >>= s
+
+    # Compute U_d, V_d and Q**d (mod n) by the binary method starting from k = 1
+    U, V, Q_k = 1, P, Q % n
+    for bit in bin(d)[3:]:
+        U, V = U * V % n, (V * V - 2 * Q_k) % n        # k -> 2k
+        Q_k = Q_k * Q_k % n
+        if bit == '1':                                 # 2k -> 2k+1
+            U, V = P * U + V, (D * U + P * V) % n
+            if U % 2:
+                U += n
+            if V % 2:
+                V += n
+            U, V = (U // 2) % n, (V // 2) % n
+            Q_k = Q_k * Q % n
+    if U == 0 or V == 0:
+        return True
+    for r in range(s - 1):
+        V = (V * V - 2 * Q_k) % n                      # V_{2k} = V_k**2 - 2Q**k
+        if V == 0:
+            return True
+        Q_k = Q_k * Q_k % n
+    return False
+
+
+def baillie_psw(n):
+    '''
+    The Baillie-PSW test: trial division, a base 2 strong probable prime
+    test and a strong Lucas test. No composite is known to pass it.
+    '''
+    if n < 2:
+        return False
+    if not trial_division(n):
+        return False
+    if n < TRIAL_LIMIT * TRIAL_LIMIT:
+        return True
+    return miller_rabin(n, 2) and strong_lucas(n)
+
+
+def is_prime(p, num_wit=50, bpsw=False):
+    '''
+    Tests whether a positive integer p is prime.
+    Small factors are removed by trial_division first.
+    For p < DETERMINISTIC_LIMIT (about 3.3*10**24) the miller_rabin test
+    is applied with the deterministic_bases, so the answer is exact.
+    For larger p the Baillie-PSW test is used if bpsw is True, otherwise
+    miller_rabin with num_wit many randomly chosen witnesses.
+    '''
+    if p < 2:
+        return False
+    if not trial_division(p):
+        return False
+    if p < TRIAL_LIMIT * TRIAL_LIMIT:   # No factor below sqrt(p)
+        return True
+    if p < DETERMINISTIC_LIMIT:
+        for witness in deterministic_bases(p):
+            if not miller_rabin(p, witness):
+                return False
+        return True
+    if bpsw:
+        return miller_rabin(p, 2) and strong_lucas(p)
+    for i in range(num_wit):
+        if not miller_rabin(p, _random.randrange(2, p - 1)):
+            return False
+    return True
@@ -0,0 +1,148 @@
+"""
+Module name: primes
+Module contains: fast generation of random primes and RSA private keys
+Function names: sieve_window, search_window,
+                random_prime, rsa_private_key
+
+random_prime works as follows:
+  1. draw bit_length random bits, force the top bit (so the number has
+     exactly bit_length bits) and the bottom bit (so it is odd);
+  2. sieve the window start, start+2, ..., start+2*(WINDOW-1) against the
+     table of small primes, which removes about 90% of the candidates
+     with no big number arithmetic at all;
+  3. run the Miller-Rabin test only on the survivors.
+If the window holds no prime a new start is drawn. Passing a
+concurrent.futures executor spreads the windows across processes.
+"""
+
+import os
+from random import SystemRandom
+
+from hybrid_crypto.primality import small_primes, miller_rabin, is_prime, DETERMINISTIC_LIMIT
+
+SMALL_PRIME_LIMIT = 2000        # Sieve against the primes below this bound
+WINDOW = 1024                   # Number of odd candidates per window
+
+_random = SystemRandom()        # One generator for the whole module
+
+SMALL_PRIMES = small_primes(SMALL_PRIME_LIMIT)
+_ODD_SMALL_PRIMES = SMALL_PRIMES[1:]
+
+
+def _is_probable_prime(n, num_wit):
+    '''
+    Applies the Miller-Rabin test to odd n (with no factor below
+    SMALL_PRIME_LIMIT) using base 2 followed by num_wit-1 random bases.
+    Below DETERMINISTIC_LIMIT the exact is_prime is used instead.
+    '''
+    if n < DETERMINISTIC_LIMIT:
+        return is_prime(n)
+    if not miller_rabin(n, 2):          # Almost every composite fails here
+        return False
+    for i in range(num_wit - 1):
+        if not miller_rabin(n, _random.randrange(3, n - 1)):
+            return False
+    return True
+
+
+def sieve_window(start, size=WINDOW):
+    '''
+    Given odd start returns a bytearray flags of length size such that
+    flags[i] = 0 when start + 2*i has a factor in SMALL_PRIMES (and is
+    not that prime itself).
+    '''
+    flags = bytearray([1]) * size
+    for p in _ODD_SMALL_PRIMES:
+        # Find the first i with start + 2*i = 0 (mod p), i.e. i = -start/2 mod p
+        i = (-start * (p + 1) // 2) % p
+        if start + 2 * i == p:          # Do not sieve out p itself
+            i += p
+        flags[i::p] = bytes(len(range(i, size, p)))
+    return flags
+
+
+def search_window(start, bit_length, num_wit=50, size=WINDOW):
+    '''
+    Returns the first prime start + 2*i (0 <= i < size) with exactly
+    bit_length bits, or None if the window does not contain one.
+    '''
+    flags = sieve_window(start, size)
+    limit = 1 << bit_length
+    for i in range(size):
+        if flags[i]:
+            n = start + 2 * i
+            if n >= limit:
+                return None
+            if n < SMALL_PRIME_LIMIT:
+                if n in SMALL_PRIMES:
+                    return n
+            elif _is_probable_prime(n, num_wit):
+                return n
+    return None
+
+
+def _random_start(bit_length):
+    '''
+    Returns a random odd number with exactly bit_length bits.
+    '''
+    return _random.getrandbits(bit_length) | (1 << (bit_length - 1)) | 1
+
+
+def _search_task(start, bit_length, num_wit):
+    '''
+    What random_prime submits to an executor: search_window, looked up
+    in the worker. (primes.search_window itself may be a closure put in
+    its place by hybrid_crypto.instrument, which cannot be pickled.)
+    '''
+    return search_window(start, bit_length, num_wit)
+
+
+def random_prime(bit_length, num_wit=50, executor=None, workers=None):
+    '''
+    Returns a cryptographically secure random prime of bit_length many
+    (binary) bits. If a concurrent.futures executor is given, windows of
+    candidates are tested in parallel by its workers, keeping workers
+    windows in flight (default: the number of CPUs, like the default
+    ProcessPoolExecutor).
+    '''
+    if bit_length < 2:
+        print('A prime has at least 2 bits.')
+        return None
+    if bit_length == 2:
+        return _random.choice([2, 3])
+    if executor is None:
+        while True:
+            p = search_window(_random_start(bit_length), bit_length, num_wit)
+            if p is not None:
+                return p
+
+    # Keep every worker busy with a window until one of them finds a prime
+    from concurrent.futures import wait, FIRST_COMPLETED    # Only needed with an executor
+    if workers is None:
+        workers = os.cpu_count() or 1
+    pending = {executor.submit(_search_task, _random_start(bit_length), bit_length, num_wit)
+               for i in range(workers)}
+    try:
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                p = future.result()
+                if p is not None:
+                    return p
+                pending.add(executor.submit(_search_task, _random_start(bit_length),
+                                            bit_length, num_wit))
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def rsa_private_key(bit_length, num_wit=50, executor=None, workers=None):
+    '''
+    Given input bit_length returns a private RSA key (p,q) where both
+    p and q are distinct primes with bit_length number of (binary) bits.
+    '''
+    p = random_prime(bit_length, num_wit, executor, workers)
+    q = random_prime(bit_length, num_wit, executor, workers)
+    while q == p:
+        q = random_prime(bit_length, num_wit, executor, workers)
+    return (p, q)
@@ -0,0 +1,140 @@
+"""
+Module name: rsa_blocks
+Module contains: RSA encryption and decryption of messages that are
+                 larger than the modulus N
+Function names: plaintext_block_size, ciphertext_block_size,
+                encrypt_blocks, decrypt_blocks,
+                encrypt_message, decrypt_message,
+                write_blocks, read_blocks,
+                encrypt_file, decrypt_file
+
+rsa_encrypt(m,N,e) only works when m < N. Here the message bytes are cut
+into blocks that are small enough for the framed block (leading 1 byte,
+see codec) to be less than N. Every ciphertext block is written with the
+same number of bytes as N, so the blocks need no further separators.
+All of the block functions are generators, so a file streams through in
+constant memory.
+"""
+
+from hybrid_crypto import backend
+from hybrid_crypto.codec import encode_bytes, decode_bytes, encode_stream
+from hybrid_crypto.rsa_keys import RSAPrivateKey
+
+
+def plaintext_block_size(N):
+    '''
+    Given input N returns the number of message bytes k per block.
+    The framed block is less than 2**(8k+1) <= 2**(bit_length-1) <= N.
+    '''
+    return (N.bit_length() - 2) // 8
+
+
+def ciphertext_block_size(N):
+    '''
+    Given input N returns the number of bytes used to store one
+    ciphertext block (a number in the range [0,N)).
+    '''
+    return (N.bit_length() + 7) // 8
+
+
+def encrypt_blocks(numbers, N, e):
+    '''
+    Given an iterable of framed blocks (each less than N) yields
+    their RSA encryptions using public key (N,e).
+    '''
+    for m in numbers:
+        yield backend.powmod(m, e, N)
+
+
+def decrypt_blocks(ciphertexts, p, q, N, e):
+    '''
+    Given an iterable of ciphertext blocks yields the decrypted message
+    bytes of each block using private key (p,q) and public key (N,e).
+    The CRT values of the private key are computed once for the whole
+    stream.
+    '''
+    key = RSAPrivateKey(p, q, e)
+    for c in ciphertexts:
+        data = decode_bytes(key.decrypt(c))
+        if data is None:
+            return
+        yield data
+
+
+def encrypt_message(data, N, e):
+    '''
+    Given input data (bytes, or a string that is UTF-8 encoded first)
+    returns the list of RSA encrypted blocks of data.
+    '''
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    size = plaintext_block_size(N)
+    if size < 1:
+        print('The modulus is too small to hold a block.')
+        return None
+    view = memoryview(data)
+    numbers = (encode_bytes(view[i:i+size]) for i in range(0, len(view), size))
+    return list(encrypt_blocks(numbers, N, e))
+
+
+def decrypt_message(ciphertexts, p, q, N, e):
+    '''
+    Given the list of blocks returned by encrypt_message returns the
+    decrypted message as bytes.
+    '''
+    return b''.join(decrypt_blocks(ciphertexts, p, q, N, e))
+
+
+def write_blocks(ciphertexts, stream, N):
+    '''
+    Writes each ciphertext block to the binary file object stream using
+    ciphertext_block_size(N) bytes. Returns the number of blocks written.
+    '''
+    width = ciphertext_block_size(N)
+    count = 0
+    for c in ciphertexts:
+        stream.write(c.to_bytes(width, 'big'))
+        count += 1
+    return count
+
+
+def read_blocks(stream, N):
+    '''
+    Yields the ciphertext blocks stored in the binary file object
+    stream by write_blocks.
+    '''
+    width = ciphertext_block_size(N)
+    while True:
+        chunk = stream.read(width)
+        if not chunk:
+            return
+        if len(chunk) != width:
+            print('The ciphertext ends with an incomplete block.')
+            return
+        yield int.from_bytes(chunk, 'big')
+
+
+def encrypt_file(in_name, out_name, N, e):
+    '''
+    Encrypts the file in_name block by block with public key (N,e) and
+    writes the ciphertext to out_name. Returns the number of blocks.
+    '''
+    size = plaintext_block_size(N)
+    if size < 1:
+        print('The modulus is too small to hold a block.')
+        return None
+    with open(in_name, 'rb') as source, open(out_name, 'wb') as target:
+        return write_blocks(encrypt_blocks(encode_stream(source, size), N, e), target, N)
+
+
+def decrypt_file(in_name, out_name, p, q, N, e):
+    '''
+    Decrypts the file in_name written by encrypt_file and writes the
+    message to out_name. Returns the number of blocks.
+    '''
+    count = 0
+    with open(in_name, 'rb') as source, open(out_name, 'wb') as target:
+        for data in decrypt_blocks(read_blocks(source, N), p, q, N, e):
+            target.write(data)
+            count += 1
+    return count
@@ -0,0 +1,70 @@
+"""
+Module name: rsa_keys
+Module contains: an RSA private key object that precomputes everything
+                 needed for decryption once
+Class names: RSAPrivateKey
+
+rsa_decrypt(c,p,q,N,e) recomputes the totient and the decryption exponent
+on every call and then raises c to a full size exponent modulo N. Here
+d, dp = d mod (p-1), dq = d mod (q-1) and q_inv = q^(-1) mod p are computed
+once. Decryption then works modulo p and modulo q separately (exponents
+and moduli of half the size) and recombines the two results with the
+Chinese Remainder Theorem (Garner's formula). The powers and inverses
+are computed by the backend (gmpy2 when installed).
+"""
+
+from hybrid_crypto import backend
+
+
+class RSAPrivateKey:
+    '''
+    The private RSA key (p,q) together with the public exponent e and
+    the precomputed values used for CRT decryption.
+    '''
+    __slots__ = ('p', 'q', 'N', 'e', 'd', 'dp', 'dq', 'q_inv')
+
+    def __init__(self, p, q, e=65537):
+        totient = (p - 1) * (q - 1)
+        try:
+            d = backend.invert(e, totient)  # Note: d * e = 1 (mod totient)
+        except ValueError:
+            raise ValueError('e is not coprime to the totient of N = p*q.') from None
+        self.p = p
+        self.q = q
+        self.N = p * q
+        self.e = e
+        self.d = d
+        self.dp = d % (p - 1)           # By Fermat, c**d = c**dp (mod p)
+        self.dq = d % (q - 1)           # and c**d = c**dq (mod q)
+        self.q_inv = backend.invert(q, p)   # Used to recombine modulo N = p*q
+
+    def public_key(self):
+        '''
+        Returns the public key (N,e) that belongs to this private key.
+        '''
+        return (self.N, self.e)
+
+    def decrypt(self, c):
+        '''
+        Returns the RSA decryption of ciphertext c, i.e. c**d (mod N).
+        '''
+        m_p = backend.powmod(c, self.dp, self.p)
+        m_q = backend.powmod(c, self.dq, self.q)
+        h = (self.q_inv * (m_p - m_q)) % self.p
+        return m_q + h * self.q         # Equal to m_p mod p and to m_q mod q
+
+    def decrypt_many(self, ciphertexts):
+        '''
+        Returns the list of decryptions of the ciphertexts in the
+        iterable ciphertexts, reusing the precomputed values.
+        '''
+        p, q, dp, dq, q_inv = self.p, self.q, self.dp, self.dq, self.q_inv
+        powmod = backend.powmod
+        result = []
+        for c in ciphertexts:
+            m_q = powmod(c, dq, q)
+            result.append(m_q + ((q_inv * (powmod(c, dp, p) - m_q)) % p) * q)
+        return result
+
+    def __repr__(self):
+        return 'RSAPrivateKey(N={} bits, e={})'.format(self.N.bit_length(), self.e)
@@ -0,0 +1,186 @@
+"""
+Module name: safe_primes
+Module contains: generation of safe primes p = 2q + 1 (q a Sophie Germain
+                 prime) and of Diffie-Hellman groups built from them
+Function names: sieve_sophie_germain, search_window, random_safe_prime,
+                primitive_root_safe, load_groups, save_group,
+                safe_prime_group
+
+getrandSGprime in the Diffie-Hellman notebook tests random numbers one at
+a time with the full is_prime for q and then for 2q + 1. Here:
+  1. a window of odd candidates q is sieved against the small primes,
+     removing q whenever q or 2q + 1 has a small factor (so most
+     candidates are removed for free);
+  2. each survivor has p = 2q + 1 checked with the single exponentiation
+     2**(p-1) = 1 (mod p) (Fermat, base 2), which almost every composite
+     p fails;
+  3. only then are q and p given the full primality test.
+random_safe_prime(bit_length, workers=k) runs k processes and stops them
+all as soon as one of them finds a safe prime. Finished groups (p, g) are
+stored in a JSON file so they can be reused.
+"""
+
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from multiprocessing import Manager
+from random import SystemRandom
+
+from hybrid_crypto import backend
+from hybrid_crypto.primality import is_prime, small_primes
+
+SIEVE_LIMIT = 5000              # Sieve against the primes below this bound
+WINDOW = 4096                   # Number of odd candidates q per window
+CACHE_FILE = os.environ.get(
+    'HYBRID_CRYPTO_GROUPS',
+    os.path.join(os.path.expanduser('~'), '.cache', 'hybrid_crypto', 'dh_groups.json'))
+
+_random = SystemRandom()
+_ODD_SIEVE_PRIMES = small_primes(SIEVE_LIMIT)[1:]
+
+
+def sieve_sophie_germain(start, size=WINDOW):
+    '''
+    Given odd start returns a bytearray flags of length size with
+    flags[i] = 0 when q = start + 2*i or 2q + 1 has a small prime factor.
+    '''
+    flags = bytearray([1]) * size
+    for r in _ODD_SIEVE_PRIMES:
+        if r >= start:                          # Then q or 2q + 1 might be r itself
+            break
+        half = (r + 1) // 2                     # The inverse of 2 modulo r
+        # q = 0 (mod r) when i = -start/2, and 2q + 1 = 0 (mod r) when q = -1/2
+        i = (-start * half) % r
+        flags[i::r] = bytes(len(range(i, size, r)))
+        j = ((-half - start) * half) % r
+        flags[j::r] = bytes(len(range(j, size, r)))
+    return flags
+
+
+def search_window(start, bit_length, size=WINDOW):
+    '''
+    Returns the first safe prime 2q + 1 with q = start + 2*i (0 <= i < size)
+    that has bit_length bits, or None if the window holds none.
+    '''
+    flags = sieve_sophie_germain(start, size)
+    limit = 1 << bit_length
+    for i in range(size):
+        if flags[i]:
+            q = start + 2 * i
+            p = 2 * q + 1
+            if p >= limit:
+                return None
+            if backend.powmod(2, p - 1, p) != 1:    # The cheap Fermat test on p first
+                continue
+            if is_prime(q) and is_prime(p):
+                return p
+    return None
+
+
+def _random_start(bit_length):
+    '''
+    Returns a random odd q such that 2q + 1 has exactly bit_length bits.
+    '''
+    return _random.getrandbits(bit_length - 1) | (1 << (bit_length - 2)) | 1
+
+
+def _search_until_stopped(bit_length, stop):
+    '''
+    Worker process: searches random windows until a safe prime is found
+    (which is returned) or another worker sets the event stop.
+    '''
+    while not stop.is_set():
+        p = search_window(_random_start(bit_length), bit_length)
+        if p is not None:
+            return p
+    return None
+
+
+def random_safe_prime(bit_length, workers=1):
+    '''
+    Returns a random safe prime p = 2q + 1 of bit_length many (binary)
+    bits. With workers > 1 the search runs in that many processes.
+    '''
+    if bit_length < 6:
+        print('Use a bit length of at least 6.')
+        return None
+    if workers <= 1:
+        while True:
+            p = search_window(_random_start(bit_length), bit_length)
+            if p is not None:
+                return p
+    with Manager() as manager, ProcessPoolExecutor(workers) as executor:
+        stop = manager.Event()
+        futures = [executor.submit(_search_until_stopped, bit_length, stop)
+                   for i in range(workers)]
+        done, pending = wait(futures, return_when=FIRST_COMPLETED)
+        stop.set()                              # Tell the other workers to give up
+        for future in done:
+            if future.result() is not None:
+                return future.result()
+
+
+def primitive_root_safe(p):
+    '''
+    Returns the smallest primitive root modulo the safe prime p, i.e. the
+    smallest b whose order is neither 1, 2 nor q = (p-1)/2.
+    '''
+    q = (p - 1) // 2
+    b = 2
+    while b * b % p == 1 or pow(b, q, p) == 1:
+        b += 1
+    return b
+
+
+def load_groups(file_name=CACHE_FILE):
+    '''
+    Returns the list of groups (p, g) stored in file_name.
+    '''
+    try:
+        with open(file_name, 'r') as f:
+            entries = json.load(f)
+        return [(int(entry['p'], 16), entry['g']) for entry in entries]
+    except (OSError, ValueError, KeyError, TypeError):  # Missing, unreadable or malformed
+        return []
+
+
+def save_group(p, g, file_name=CACHE_FILE):
+    '''
+    Adds the group (p, g) to the groups stored in file_name.
+    '''
+    groups = load_groups(file_name)
+    if (p, g) in groups:
+        return
+    groups.append((p, g))
+    directory = os.path.dirname(file_name)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # A temporary file of its own for each writer, so that concurrent saves
+    # never write to the same file
+    with tempfile.NamedTemporaryFile('w', dir=directory or '.', suffix='.tmp',
+                                     delete=False) as f:
+        json.dump([{'bits': p.bit_length(), 'p': hex(p), 'g': g} for p, g in groups], f, indent=1)
+    try:
+        os.replace(f.name, file_name)           # Never leave a half written file
+    except OSError:
+        os.remove(f.name)
+        raise
+
+
+def safe_prime_group(bit_length, workers=1, fresh=False, file_name=CACHE_FILE):
+    '''
+    Returns a Diffie-Hellman group (p, g): a safe prime p of bit_length
+    bits and a primitive root g modulo p. A group of that size from the
+    cache file is reused unless fresh is True; new groups are saved there.
+    '''
+    if not fresh:
+        for p, g in load_groups(file_name):
+            if p.bit_length() == bit_length:
+                return (p, g)
+    p = random_safe_prime(bit_length, workers)
+    if p is None:
+        return None
+    g = primitive_root_safe(p)
+    save_group(p, g, file_name)
+    return (p, g)
@@ -0,0 +1,378 @@
+"""
+Module name: smooth
+Module contains: factoring methods that find a prime factor p of n when
+                 p-1, or the order of an elliptic curve modulo p, has
+                 only small prime factors, and an audit of RSA keys
+                 against them
+Function names: prime_power_product, is_smooth, pollard_pm1, ecm_curve,
+                ecm, audit
+
+Pollard's p-1 method: if every prime power dividing p-1 is at most B1,
+then p-1 divides M = the product of all prime powers up to B1, so
+a**M = 1 (mod p) and gcd(a**M - 1, n) is divisible by p (stage 1). If
+p-1 = (such a number) * q with one more prime B1 < q <= B2, then
+(a**M)**q = 1 (mod p); stage 2 walks through the primes q with one
+multiplication each, using a table of (a**M)**d for the gaps d between
+consecutive primes, and takes the gcd of the product of all the
+(a**M)**q - 1.
+
+Lenstra's elliptic curve method (ECM) does the same in the group of
+points of a random curve modulo p, whose order varies between
+p + 1 - 2 sqrt(p) and p + 1 + 2 sqrt(p) from curve to curve. So when
+p-1 is not smooth, another curve may have a smooth order. Curves are
+taken in Montgomery form B y**2 = x**3 + A x**2 + x with Suyama's
+parametrization (the order is divisible by 12), points kept as (X : Z)
+without y, and multiplied by the Montgomery ladder. Stage 2 pairs giant
+steps m*D*Q with baby steps j*Q: m*D*Q = +-j*Q (mod p) exactly when
+(m*D -+ j)*Q = 0, so X_m Z_j - X_j Z_m covers both primes m*D +- j.
+Each curve is independent, so ecm() can run its curves in the workers
+of a concurrent.futures executor. Both methods are written in Python;
+the numbers are backend.mpz numbers (GMP integers with the gmpy2
+backend), which makes a stage 2 several times faster.
+
+A key made by primes.rsa_private_key has random primes of hundreds of
+bits: p-1 is then smooth with negligible probability, and ECM only finds
+primes of a few dozen digits. For private keys is_smooth(p - 1, B1, B2)
+says exactly whether p-1 falls to these bounds. audit(moduli) runs p-1
+and then ECM on each modulus and reports the time spent on each key.
+
+Run from the repository root with:
+    python -m hybrid_crypto.smooth moduli.txt [--workers 4]
+where moduli.txt is read as in key_audit.
+"""
+
+from functools import lru_cache
+from math import gcd, isqrt
+from random import Random
+from time import perf_counter
+
+from hybrid_crypto import backend
+from hybrid_crypto.primality import is_prime
+
+PM1_B1 = 100000                 # p-1 stage 1 bound
+PM1_B2 = 1000000                # p-1 stage 2 bound
+ECM_B1 = 11000                  # ECM stage 1 bound (finds primes of about 20 digits)
+ECM_B2 = 1100000                # ECM stage 2 bound
+ECM_CURVES = 8                  # Number of curves tried by audit
+BATCH = 256                     # Number of stage 2 products per gcd
+GIANT_STEP = 2310               # D = 2*3*5*7*11 for ECM stage 2
+
+_random = Random()
+
+
+@lru_cache(maxsize=4)
+def _prime_flags(limit):
+    '''
+    Returns a bytearray flags of length limit with flags[i] = 1 exactly
+    when i is prime (sieve of Eratosthenes).
+    '''
+    flags = bytearray([1]) * limit
+    flags[:2] = b'\x00\x00'
+    for i in range(2, isqrt(limit - 1) + 1):
+        if flags[i]:
+            flags[i*i::i] = bytes(len(range(i*i, limit, i)))
+    return flags
+
+
+def _primes_between(low, high):
+    '''
+    Returns the list of primes p with low < p <= high.
+    '''
+    flags = _prime_flags(high + 1)
+    return [p for p in range(low + 1, high + 1) if flags[p]]
+
+
+def _product(values):
+    '''
+    Returns the product of the list values, multiplying numbers of about
+    the same size (much faster than from left to right for long lists).
+    '''
+    while len(values) > 1:
+        values = [values[i] * values[i + 1] if i + 1 < len(values) else values[i]
+                  for i in range(0, len(values), 2)]
+    return values[0] if values else 1
+
+
+@lru_cache(maxsize=8)
+def prime_power_product(bound):
+    '''
+    Returns M, the product of the largest power of each prime that is at
+    most bound (the least common multiple of 1, 2, ..., bound).
+    '''
+    powers = []
+    for p in _primes_between(1, bound):
+        q = p
+        while q * p <= bound:
+            q *= p
+        powers.append(q)
+    return _product(powers)
+
+
+def is_smooth(m, b1=PM1_B1, b2=PM1_B2):
+    '''
+    Returns True if m divides prime_power_product(b1) * q for a prime
+    b1 < q <= b2 (or q = 1), so that p-1 with these bounds factors a
+    modulus with a prime factor p = m + 1, False otherwise. (A prime
+    q <= b1 left over means its power in m is above b1: stage 2 only
+    tries the primes above b1.)
+    '''
+    r = m // gcd(m, prime_power_product(b1))
+    return r == 1 or (b1 < r <= b2 and is_prime(r))
+
+
+def _stage2_gcd(n, values):
+    '''
+    Returns the gcd of n with the product of the numbers in values,
+    taken BATCH at a time so that it stops soon after the product becomes
+    divisible by a prime factor of n. If one batch makes the gcd n, its
+    numbers are taken one at a time.
+    '''
+    for i in range(0, len(values), BATCH):
+        acc = 1
+        for v in values[i:i + BATCH]:
+            acc = acc * v % n
+        g = gcd(acc, n)
+        if g == n:
+            for v in values[i:i + BATCH]:
+                g = gcd(v, n)
+                if g != 1:
+                    return g
+        if g != 1:
+            return g
+    return 1
+
+
+def pollard_pm1(n, b1=PM1_B1, b2=PM1_B2, base=2):
+    '''
+    Returns a non-trivial factor of the odd composite number n found by
+    Pollard's p-1 method with stage 1 bound b1 and stage 2 bound b2, or
+    None if it finds none.
+    '''
+    if n % 2 == 0:
+        return 2
+    a = backend.powmod(base, prime_power_product(b1), n)
+    g = gcd(a - 1, n)
+    if g == n:
+        # p-1 and q-1 are both smooth: go back and raise to one prime power at a time
+        a = base
+        for p in _primes_between(1, b1):
+            q = p
+            while q * p <= b1:
+                q *= p
+            a = pow(a, q, n)
+            g = gcd(a - 1, n)
+            if g != 1:
+                return g if g != n else None
+        return None
+    if g != 1:
+        return g
+    if b2 <= b1:
+        return None
+
+    # Stage 2: a**q for the primes b1 < q <= b2 in turn, a**gap from a table
+    primes = _primes_between(b1, b2)
+    if not primes:
+        return None
+    (a, n) = (backend.mpz(a), backend.mpz(n))
+    gap_powers = {}
+    x = backend.mpz(backend.powmod(a, primes[0], n))
+    values = [x - 1]
+    previous = primes[0]
+    for q in primes[1:]:
+        d = q - previous
+        if d not in gap_powers:
+            gap_powers[d] = pow(a, d, n)
+        x = x * gap_powers[d] % n
+        values.append(x - 1)
+        previous = q
+    g = _stage2_gcd(n, values)
+    return int(g) if 1 < g < n else None
+
+
+def _double(X, Z, n, a24):
+    '''
+    Returns 2P for P = (X : Z) on the Montgomery curve with
+    a24 = (A+2)/4 modulo n.
+    '''
+    s = (X + Z) * (X + Z) % n
+    d = (X - Z) * (X - Z) % n
+    t = s - d
+    return (s * d % n, t * (d + a24 * t) % n)
+
+
+def _add(X1, Z1, X2, Z2, Xd, Zd, n):
+    '''
+    Returns P1 + P2 given P1 = (X1 : Z1), P2 = (X2 : Z2) and their
+    difference P1 - P2 = (Xd : Zd) (x-only addition needs it).
+    '''
+    u = (X1 - Z1) * (X2 + Z2) % n
+    v = (X1 + Z1) * (X2 - Z2) % n
+    return (Zd * ((u + v) * (u + v) % n) % n, Xd * ((u - v) * (u - v) % n) % n)
+
+
+def _ladder(k, X, Z, n, a24):
+    '''
+    Returns kP for P = (X : Z) and k >= 1 by the Montgomery ladder, which
+    keeps R1 - R0 = P throughout.
+    '''
+    (X0, Z0) = (X, Z)
+    (X1, Z1) = _double(X, Z, n, a24)
+    for bit in bin(k)[3:]:
+        if bit == '1':
+            (X0, Z0) = _add(X1, Z1, X0, Z0, X, Z, n)
+            (X1, Z1) = _double(X1, Z1, n, a24)
+        else:
+            (X1, Z1) = _add(X1, Z1, X0, Z0, X, Z, n)
+            (X0, Z0) = _double(X0, Z0, n, a24)
+    return (X0, Z0)
+
+
+def _suyama(n, sigma):
+    '''
+    Returns (X, Z, a24, g): the starting point and a24 of Suyama's curve
+    for sigma, and g = 1, or g = the gcd with n of a number that could
+    not be inverted (then X, Z, a24 are None).
+    '''
+    u = (sigma * sigma - 5) % n
+    v = 4 * sigma % n
+    X = u * u * u % n
+    Z = v * v * v % n
+    numerator = (v - u) * (v - u) * (v - u) * (3 * u + v) % n
+    denominator = 16 * X * v % n
+    g = gcd(denominator, n)
+    if g != 1:
+        return (None, None, None, g)
+    return (X, Z, numerator * backend.invert(denominator, n) % n, 1)
+
+
+def ecm_curve(n, sigma, b1=ECM_B1, b2=ECM_B2):
+    '''
+    Returns a non-trivial factor of the odd composite number n found on
+    the curve of Suyama parameter sigma (6 <= sigma < n) with stage 1
+    bound b1 and stage 2 bound b2, or None if this curve finds none.
+    '''
+    n = backend.mpz(n)
+    (X, Z, a24, g) = _suyama(n, sigma)
+    if g != 1:
+        return int(g) if g != n else None
+    (X, Z) = _ladder(prime_power_product(b1), X, Z, n, a24)
+    g = gcd(Z, n)
+    if g != 1 or b2 <= b1:
+        return int(g) if 1 < g < n else None
+
+    # Stage 2: baby steps j*Q (j < D/2 coprime to D) and giant steps m*D*Q
+    D = GIANT_STEP
+    babies = {1: (X, Z)}
+    (X2, Z2) = _double(X, Z, n, a24)
+    (Xj, Zj) = _add(X2, Z2, X, Z, X, Z, n)     # 3Q
+    (Xp, Zp) = (X, Z)
+    for j in range(3, D // 2, 2):
+        if gcd(j, D) == 1:
+            babies[j] = (Xj, Zj)
+        (Xj, Zj), (Xp, Zp) = _add(Xj, Zj, X2, Z2, Xp, Zp, n), (Xj, Zj)
+    flags = _prime_flags(b2 + D + 1)
+    (XD, ZD) = _ladder(D, X, Z, n, a24)
+    m = max(1, b1 // D)
+    (Xm, Zm) = _ladder(m * D, X, Z, n, a24)
+    (Xn, Zn) = _ladder((m + 1) * D, X, Z, n, a24)
+    values = []
+    while m * D - D // 2 <= b2:
+        for j, (Xj, Zj) in babies.items():
+            if flags[m * D - j] or flags[m * D + j]:
+                values.append((Xm * Zj - Xj * Zm) % n)
+        (Xm, Zm), (Xn, Zn) = (Xn, Zn), _add(Xn, Zn, XD, ZD, Xm, Zm, n)
+        m += 1
+    g = _stage2_gcd(n, values)
+    return int(g) if 1 < g < n else None
+
+
+def ecm(n, curves=ECM_CURVES, b1=ECM_B1, b2=ECM_B2, executor=None):
+    '''
+    Returns a non-trivial factor of the odd composite number n found by
+    trying up to curves random curves, or None if none of them finds one.
+    If a concurrent.futures executor is given, the curves are run by its
+    workers and the remaining ones are cancelled once a factor is found.
+    '''
+    if n % 2 == 0:
+        return 2
+    sigmas = [_random.randrange(6, min(n, 1 << 32)) for i in range(curves)]
+    if executor is None:
+        for sigma in sigmas:
+            f = ecm_curve(n, sigma, b1, b2)
+            if f is not None:
+                return f
+        return None
+
+    from concurrent.futures import wait, FIRST_COMPLETED    # Only needed with an executor
+    pending = {executor.submit(ecm_curve, n, sigma, b1, b2) for sigma in sigmas}
+    try:
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.result() is not None:
+                    return future.result()
+        return None
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def audit(moduli, curves=ECM_CURVES, pm1_bounds=(PM1_B1, PM1_B2),
+          ecm_bounds=(ECM_B1, ECM_B2), executor=None):
+    '''
+    Given an iterable of moduli returns a list with, for each modulus, a
+    tuple (index, N, p, q, method, seconds): the factors found by p-1
+    (method 'p-1') or else by ECM (method 'ECM'), or p = q = None and
+    method None if the key resisted both; seconds is the time spent on it.
+    '''
+    report = []
+    for index, N in enumerate(moduli):
+        start = perf_counter()
+        method = 'p-1'
+        p = pollard_pm1(N, *pm1_bounds)
+        if p is None and curves > 0:
+            method = 'ECM'
+            p = ecm(N, curves, *ecm_bounds, executor=executor)
+        if p is None:
+            report.append((index, N, None, None, None, perf_counter() - start))
+        else:
+            report.append((index, N, p, N // p, method, perf_counter() - start))
+    return report
+
+
+def main(argv):
+    import argparse
+
+    from hybrid_crypto.key_audit import read_moduli
+
+    parser = argparse.ArgumentParser(
+        description='Try to factor RSA moduli by Pollard p-1 and ECM, reporting the time per key.')
+    parser.add_argument('file_name', help='text file with one modulus per line')
+    parser.add_argument('--curves', type=int, default=ECM_CURVES)
+    parser.add_argument('--pm1-bounds', type=int, nargs=2, default=(PM1_B1, PM1_B2))
+    parser.add_argument('--ecm-bounds', type=int, nargs=2, default=(ECM_B1, ECM_B2))
+    parser.add_argument('--workers', type=int, default=1, help='processes running ECM curves')
+    args = parser.parse_args(argv)
+
+    moduli = list(read_moduli(args.file_name))
+    start = perf_counter()
+    if args.workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(args.workers) as executor:
+            report = audit(moduli, args.curves, args.pm1_bounds, args.ecm_bounds, executor)
+    else:
+        report = audit(moduli, args.curves, args.pm1_bounds, args.ecm_bounds)
+    broken = 0
+    for (index, N, p, q, method, seconds) in report:
+        if p is None:
+            print("key {} ({} bits): resisted ({:.2f} s)".format(index, N.bit_length(), seconds))
+        else:
+            broken += 1
+            print("key {} ({} bits): factored by {} ({:.2f} s)\n    p = {}\n    q = {}".format(
+                index, N.bit_length(), method, seconds, p, q))
+    print("{} of {} keys factored ({:.2f} s)".format(broken, len(moduli), perf_counter() - start))
+
+
+if __name__ == '__main__':
+    import sys
+    main(sys.argv[1:])
@@ -0,0 +1,202 @@
+"""
+Module name: vigenere
+Module contains: Caesar and Vigenere ciphers on the 26 letter alphabet,
+                 vectorized with NumPy for the bulk data of the hybrid
+                 system
+Function names: key_to_shifts, letters_to_array, vigenere_array,
+                vigenere_encrypt, vigenere_decrypt,
+                caesar_encrypt, caesar_decrypt, vigenere_stream,
+                vigenere_file
+
+As in the project specification the messages contain alphabetic
+characters only (see extract_alphabetic_content.ipynb). Instead of
+shifting one character at a time the whole message is viewed as a uint8
+array and shifted with a handful of whole-array operations:
+
+    letter index  = (byte & 31) - 1       'A' and 'a' both give 0
+    case bits     = byte & 0xE0           64 for upper case, 96 for lower
+    output byte   = case bits | ((index + shift) % 26 + 1)
+
+with the shifts of the key repeated along the message by np.resize. So
+the case of every letter is preserved through masks, with no branches.
+The % 26 is done as a comparison and a subtraction, and the arrays are
+processed in blocks of BLOCK_SIZE bytes that stay in the CPU cache.
+With preserve_case=False the output is upper case.
+
+vigenere_file works through numpy.memmap views of the input and output
+files, chunk_size bytes at a time, so files larger than RAM can be
+enciphered.
+"""
+
+import os
+
+import numpy as np
+
+CHUNK_SIZE = 1 << 24            # Bytes per chunk in vigenere_file
+BLOCK_SIZE = 1 << 18            # Bytes per block of whole-array operations
+
+
+def key_to_shifts(key):
+    '''
+    Given a key (a string of letters, or a sequence of integer shifts)
+    returns the uint8 array of shifts 0,...,25 ('a' or 'A' is shift 0),
+    or None with a message if the string has characters other than the
+    26 letters.
+    '''
+    if isinstance(key, str):
+        if key and not (key.isascii() and key.isalpha()):
+            print('The key must consist of the letters a-z and A-Z only.')
+            return None
+        return (np.frombuffer(key.encode('ascii'), dtype=np.uint8) & 31) - 1
+    return (np.asarray(key, dtype=np.int64) % 26).astype(np.uint8)
+
+
+def _key_shifts(key):
+    '''
+    Returns key_to_shifts(key), or None with a message if the key is
+    empty (there is nothing to repeat along the message) or has
+    characters that are not letters.
+    '''
+    if len(key) == 0:
+        print('The key must contain at least one letter or shift.')
+        return None
+    return key_to_shifts(key)
+
+
+def letters_to_array(text):
+    '''
+    Returns the alphabetic string (or bytes) text as a uint8 array of
+    its ASCII codes, without copying bytes.
+    '''
+    if isinstance(text, str):
+        text = text.encode('ascii')
+    return np.frombuffer(text, dtype=np.uint8)
+
+
+def vigenere_array(data, shifts, decrypt=False, preserve_case=True, offset=0, out=None):
+    '''
+    Enciphers (or deciphers) the uint8 array data of letters with the
+    array of key shifts, where data[0] is letter number offset of the
+    whole message. Returns the resulting uint8 array (written into out
+    if that is given).
+    '''
+    k = len(shifts)
+    if decrypt:
+        shifts = (26 - shifts) % 26
+    if offset % k:
+        shifts = np.roll(shifts, -(offset % k))
+    # Work through blocks of a whole number of keys, so one copy of the
+    # repeated key fits every block and everything stays in the cache
+    block = k * max(1, BLOCK_SIZE // k)
+    stream = np.resize(shifts.astype(np.uint8), min(block, len(data)))
+    if out is None:
+        out = np.empty(len(data), dtype=np.uint8)
+    temp = np.empty(len(stream), dtype=np.uint8)
+    for start in range(0, len(data), block):
+        source = data[start:start + block]
+        target = out[start:start + block]
+        m = len(source)
+        t = temp[:m]
+        np.bitwise_and(source, 31, out=target)          # Letter index + 1, i.e. 1,...,26
+        target += stream[:m]
+        np.greater(target, 26, out=t.view(np.bool_))    # Reduce 27,...,51 back to 1,...,25
+        t *= 26
+        target -= t
+        if preserve_case:
+            np.bitwise_and(source, 0xE0, out=t)         # The case bits of the input
+            target |= t
+        else:
+            target |= 64
+    return out
+
+
+def vigenere_encrypt(text, key, preserve_case=True):
+    '''
+    Returns the Vigenere encryption of the alphabetic string text with
+    the given key.
+    '''
+    shifts = _key_shifts(key)
+    if shifts is None:
+        return None
+    result = vigenere_array(letters_to_array(text), shifts, preserve_case=preserve_case)
+    return result.tobytes().decode('ascii')
+
+
+def vigenere_decrypt(text, key, preserve_case=True):
+    '''
+    Returns the Vigenere decryption of the alphabetic string text with
+    the given key.
+    '''
+    shifts = _key_shifts(key)
+    if shifts is None:
+        return None
+    result = vigenere_array(letters_to_array(text), shifts, decrypt=True,
+                            preserve_case=preserve_case)
+    return result.tobytes().decode('ascii')
+
+
+def caesar_encrypt(text, shift, preserve_case=True):
+    '''
+    Returns the Caesar encryption of the alphabetic string text with the
+    given shift (0 to 25), i.e. Vigenere with a key of length 1.
+    '''
+    return vigenere_encrypt(text, [shift], preserve_case)
+
+
+def caesar_decrypt(text, shift, preserve_case=True):
+    '''
+    Returns the Caesar decryption of the alphabetic string text.
+    '''
+    return vigenere_decrypt(text, [shift], preserve_case)
+
+
+def vigenere_stream(chunks, key, decrypt=False, preserve_case=True):
+    '''
+    Given an iterable of chunks of letters (bytes, e.g. from
+    alphabetic.extract_file) yields the enciphered (or deciphered)
+    chunks, with the key continuing from one chunk to the next. Returns
+    None (checked before the first chunk is read) if the key is empty.
+    '''
+    shifts = _key_shifts(key)
+    if shifts is None:
+        return None
+    return _stream(chunks, shifts, decrypt, preserve_case)
+
+
+def _stream(chunks, shifts, decrypt, preserve_case):
+    '''
+    The generator behind vigenere_stream.
+    '''
+    offset = 0
+    for chunk in chunks:
+        result = vigenere_array(letters_to_array(chunk), shifts, decrypt, preserve_case,
+                                offset=offset)
+        offset += len(chunk)
+        yield result.tobytes()
+
+
+def vigenere_file(in_name, out_name, key, decrypt=False, preserve_case=True,
+                  chunk_size=CHUNK_SIZE, in_offset=0):
+    '''
+    Enciphers (or deciphers) the file in_name, which must contain letters
+    only from byte in_offset on, and writes the result to out_name. Both
+    files are accessed through memory maps one chunk at a time. Returns
+    the number of bytes, or None if the key is empty.
+    '''
+    shifts = _key_shifts(key)
+    if shifts is None:
+        return None
+    size = os.path.getsize(in_name) - in_offset
+    with open(out_name, 'wb') as f:
+        f.truncate(size)
+    if size <= 0:
+        return 0
+    source = np.memmap(in_name, dtype=np.uint8, mode='r', offset=in_offset)
+    target = np.memmap(out_name, dtype=np.uint8, mode='r+')
+    for start in range(0, size, chunk_size):
+        stop = min(start + chunk_size, size)
+        vigenere_array(source[start:stop], shifts, decrypt, preserve_case,
+                       offset=start, out=target[start:stop])
+    target.flush()
+    del source, target
+    return size
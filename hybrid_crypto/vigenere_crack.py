@@ -0,0 +1,215 @@
+"""
+Module name: vigenere_crack
+Module contains: breaking the Vigenere cipher (the project extension):
+                 key length estimation and frequency analysis, vectorized
+                 with NumPy
+Function names: corpus_frequencies, to_indices, column_counts,
+                coincidence_indices, kasiski_scores, estimate_key_length,
+                solve_shifts, crack
+
+The ciphertext is turned into an array x of letter indices 0,...,25 once.
+For a key length k the letters enciphered with the same key letter are
+the columns of x[:m].reshape(-1, k) (m a multiple of k), a strided view
+of x, and the letter counts of all k columns come from a single
+np.bincount of x + 26 * column. From these counts:
+
+  - the index of coincidence of each column is sum c(c-1) / (n(n-1)); its
+    average over the columns is about 0.066 (English) for the right k and
+    its multiples, and about 1/26 = 0.038 for every other k;
+  - each column is a Caesar cipher, solved by the shift s minimizing the
+    chi-squared distance between the counts and English letter
+    frequencies shifted by s (all 26 shifts of all k columns at once).
+
+Kasiski: the distances between repeated trigrams of the ciphertext are
+mostly multiples of the key length. With counts = np.bincount(distances),
+the number of distances divisible by k is the sum of the strided view
+counts[::k]. Key lengths 1,...,max_length are shared out between the
+processes of a pool when workers > 1.
+"""
+
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from hybrid_crypto.alphabetic import extract_file
+
+MAX_KEY_LENGTH = 500
+MIN_COLUMN_LENGTH = 20          # Fewer letters per column make the statistics meaningless
+RANDOM_IOC = 1 / 26             # Index of coincidence of uniformly random letters
+CORPUS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                      'message_*.txt')
+# Standard English letter frequencies, used when the corpus is not found
+ENGLISH_FREQUENCIES = (
+    0.0817, 0.0149, 0.0278, 0.0425, 0.1270, 0.0223, 0.0202, 0.0609, 0.0697,
+    0.0015, 0.0077, 0.0403, 0.0241, 0.0675, 0.0751, 0.0193, 0.0010, 0.0599,
+    0.0633, 0.0906, 0.0276, 0.0098, 0.0236, 0.0015, 0.0197, 0.0007)
+
+_frequencies = None             # corpus_frequencies() once computed
+_worker_indices = None          # The ciphertext indices in a worker process
+
+
+def corpus_frequencies(pattern=CORPUS):
+    '''
+    Returns the array of the 26 letter frequencies of the files matching
+    pattern (the message_*.txt corpus by default).
+    '''
+    global _frequencies
+    if pattern == CORPUS and _frequencies is not None:
+        return _frequencies
+    counts = np.zeros(26, dtype=np.int64)
+    for file_name in sorted(glob.glob(pattern)):
+        for letters in extract_file(file_name):
+            counts += np.bincount(to_indices(letters), minlength=26)
+    if counts.sum() == 0:
+        frequencies = np.array(ENGLISH_FREQUENCIES)
+    else:
+        frequencies = counts / counts.sum()
+    if pattern == CORPUS:
+        _frequencies = frequencies
+    return frequencies
+
+
+def to_indices(text):
+    '''
+    Returns the letters of text (an alphabetic string, bytes or uint8
+    array) as a uint8 array of the indices 0,...,25 ('a' and 'A' are 0).
+    '''
+    if isinstance(text, str):
+        text = text.encode('ascii')
+    if isinstance(text, (bytes, bytearray, memoryview)):
+        text = np.frombuffer(text, dtype=np.uint8)
+    return (text & 31) - 1
+
+
+def column_counts(indices, k):
+    '''
+    Returns the k x 26 array whose row j holds the letter counts of the
+    column j, i.e. of indices[j], indices[j+k], indices[j+2k], ...
+    '''
+    m = len(indices) - len(indices) % k
+    offsets = np.arange(0, 26 * k, 26, dtype=np.int32)
+    labels = (indices[:m].reshape(-1, k) + offsets).ravel()
+    counts = np.bincount(labels, minlength=26 * k)
+    counts += np.bincount(indices[m:] + offsets[:len(indices) - m], minlength=26 * k)
+    return counts.reshape(k, 26)
+
+
+def _coincidence_range(lengths):
+    '''
+    Worker: returns the list of average indices of coincidence of the
+    ciphertext for each key length in lengths.
+    '''
+    result = []
+    for k in lengths:
+        counts = column_counts(_worker_indices, k).astype(np.float64)
+        n = counts.sum(axis=1)
+        n = n[n > 1]
+        counts = counts[:len(n)]
+        result.append(float(((counts * (counts - 1)).sum(axis=1) / (n * (n - 1))).mean()))
+    return result
+
+
+def _set_worker_indices(indices):
+    '''
+    Pool initializer: stores the ciphertext once in each worker process.
+    '''
+    global _worker_indices
+    _worker_indices = indices
+
+
+def coincidence_indices(indices, max_length=MAX_KEY_LENGTH, workers=1):
+    '''
+    Returns the array ioc with ioc[k] the average index of coincidence of
+    the columns for key length k, 1 <= k <= max_length (ioc[0] = 0).
+    '''
+    max_length = max(1, min(max_length, len(indices) // MIN_COLUMN_LENGTH))
+    lengths = list(range(1, max_length + 1))
+    if workers <= 1:
+        _set_worker_indices(indices)
+        values = _coincidence_range(lengths)
+    else:
+        # Interleave the lengths, as a larger k costs a little more
+        parts = [lengths[i::workers] for i in range(workers)]
+        with ProcessPoolExecutor(workers, initializer=_set_worker_indices,
+                                 initargs=(indices,)) as executor:
+            results = list(executor.map(_coincidence_range, parts))
+        values = [0.0] * max_length
+        for i, part in enumerate(results):
+            values[i::workers] = part
+    return np.array([0.0] + values)
+
+
+def kasiski_scores(indices, max_length=MAX_KEY_LENGTH):
+    '''
+    Returns the array score with score[k] the fraction of the distances
+    between consecutive repeats of a trigram that are divisible by k,
+    divided by the fraction 1/k expected by chance (score[0] = 0).
+    '''
+    x = indices.astype(np.int32)
+    trigrams = x[:-2] * 676 + x[1:-1] * 26 + x[2:]
+    order = np.argsort(trigrams, kind='stable')     # Positions of each trigram in order
+    repeated = trigrams[order[1:]] == trigrams[order[:-1]]
+    distances = (order[1:] - order[:-1])[repeated]
+    score = np.zeros(max_length + 1)
+    if len(distances) == 0:
+        return score
+    counts = np.bincount(distances)
+    for k in range(1, min(max_length, len(counts) - 1) + 1):
+        score[k] = counts[::k].sum() * k / len(distances)
+    return score
+
+
+def estimate_key_length(indices, max_length=MAX_KEY_LENGTH, workers=1):
+    '''
+    Returns the most likely key length of the ciphertext indices. This
+    is the smallest k whose index of coincidence is close to the best
+    one (multiples of the key length score just as well), preferring one
+    that the Kasiski test confirms.
+    '''
+    ioc = coincidence_indices(indices, max_length, workers)
+    best = ioc.max()
+    threshold = RANDOM_IOC + 0.8 * (best - RANDOM_IOC)
+    candidates = np.flatnonzero(ioc >= threshold).tolist()
+    kasiski = kasiski_scores(indices, len(ioc) - 1)
+    for k in candidates:
+        if k == 1 or kasiski[k] >= 2:
+            return k
+    return candidates[0]
+
+
+def solve_shifts(indices, k, frequencies=None):
+    '''
+    Returns the array of the k shifts (the key) that minimize the
+    chi-squared distance of each column from the English frequencies.
+    '''
+    if frequencies is None:
+        frequencies = corpus_frequencies()
+    counts = column_counts(indices, k).astype(np.float64)
+    # shifted[j, s, i] = count of the letter i + s in column j, i.e. of the
+    # letter i of the plaintext if the shift of column j is s
+    rolls = (np.arange(26)[:, None] + np.arange(26)[None, :]) % 26
+    shifted = counts[:, rolls]
+    expected = counts.sum(axis=1)[:, None, None] * frequencies[None, None, :]
+    chi_squared = ((shifted - expected) ** 2 / expected).sum(axis=2)
+    return chi_squared.argmin(axis=1).astype(np.uint8)
+
+
+def crack(ciphertext, max_length=MAX_KEY_LENGTH, workers=1):
+    '''
+    Given a Vigenere ciphertext (an alphabetic string, bytes or uint8
+    array) returns the most likely key, as a string of lower case letters.
+    '''
+    indices = to_indices(ciphertext)
+    if len(indices) < 2:
+        print('The ciphertext is too short to crack.')
+        return None
+    k = estimate_key_length(indices, max_length, workers)
+    shifts = solve_shifts(indices, k)
+    for d in range(1, k):
+        # A multiple of the key length gives the key repeated k/d times
+        if k % d == 0 and (shifts.reshape(-1, d) == shifts[:d]).all():
+            shifts = shifts[:d]
+            break
+    return (shifts + ord('a')).tobytes().decode('ascii')
@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+"""
+The conversion_functions module (imported by Lecture9_2) containing
+the functions: char_to_byte, convert_to_integer, convert_to_text
+
+The functions now live once in hybrid_crypto.lecture; this module keeps
+the old name importable for the notebooks.
+"""
+
+try:
+    import hybrid_crypto
+except ImportError:             # Not installed: use the copy in this repository
+    import os
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hybrid_crypto.lecture import (char_to_byte, convert_to_integer, convert_to_text)